@@ -0,0 +1,174 @@
+# app/ai/backends.py
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Type
+
+logger = logging.getLogger("ai-backends")
+
+# Directory for the exported ONNX model (created on first use if empty)
+ONNX_DIR = os.getenv("NORMALIZER_ONNX_DIR", "models/flan-t5-onnx")
+
+
+class NormalizerBackend:
+    """
+    Seq2seq inference backend used by the command normalizer.
+
+    Subclasses implement `_load()` (returning tokenizer, model) and may
+    override `generate()`. Backends must produce the same commands as the
+    reference `TorchBackend` on the parity corpus (see app/ai/parity.py).
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.tokenizer = None
+        self.model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> "NormalizerBackend":
+        if self.loaded:
+            return self
+
+        with self._lock:
+            if not self.loaded:
+                logger.info(f"📦 Loading normalizer backend '{self.name}' ({self.model_name})")
+                self.tokenizer, self.model = self._load()
+        return self
+
+    def _load(self):
+        raise NotImplementedError
+
+    def generate(
+        self,
+        prompts: List[str],
+        num_beams: int = 5,
+        max_length: int = 24,
+        prefix_allowed_tokens_fn: Optional[Callable] = None,
+    ) -> List[str]:
+        """
+        Decode a batch of prompts. Returns lowercased, stripped outputs.
+        """
+        self.load()
+
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True, truncation=True)
+
+        decoding = {"num_beams": num_beams}
+        if num_beams > 1:
+            decoding["early_stopping"] = True
+        if prefix_allowed_tokens_fn is not None:
+            decoding["prefix_allowed_tokens_fn"] = prefix_allowed_tokens_fn
+
+        outputs = self.model.generate(
+            **inputs,
+            max_length=max_length,
+            do_sample=False,
+            **decoding,
+        )
+
+        commands = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [command.lower().strip() for command in commands]
+
+
+# -----------------------------
+# PyTorch (reference)
+# -----------------------------
+class TorchBackend(NormalizerBackend):
+    """
+    Eager PyTorch fp32 — the reference implementation.
+    """
+
+    name = "torch"
+
+    def _load(self):
+        from app.ai.weights import has_normalizer_cache, load_normalizer_mmap
+
+        # Pre-converted safetensors cache (python -m app.ai.weights convert)
+        if has_normalizer_cache(self.model_name):
+            return load_normalizer_mmap(self.model_name)
+
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        model.eval()
+        return tokenizer, model
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """
+    PyTorch with dynamic int8 quantization of all Linear layers.
+    Roughly 4x smaller matmul weights and faster CPU inference.
+    """
+
+    name = "int8"
+
+    def _load(self):
+        import torch
+
+        tokenizer, model = super()._load()
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        model.eval()
+        return tokenizer, model
+
+
+# -----------------------------
+# ONNX Runtime
+# -----------------------------
+class OnnxBackend(NormalizerBackend):
+    """
+    ONNX Runtime encoder/decoder via `optimum`. The model is exported to
+    NORMALIZER_ONNX_DIR on first use and loaded from there afterwards.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, onnx_dir: str = ONNX_DIR):
+        super().__init__(model_name)
+        self.onnx_dir = onnx_dir
+
+    def _load(self):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError(
+                "ONNX backend requires `optimum[onnxruntime]` to be installed"
+            ) from e
+
+        from transformers import AutoTokenizer
+
+        if os.path.isdir(self.onnx_dir) and os.listdir(self.onnx_dir):
+            tokenizer = AutoTokenizer.from_pretrained(self.onnx_dir)
+            model = ORTModelForSeq2SeqLM.from_pretrained(self.onnx_dir)
+        else:
+            logger.info(f"📤 Exporting {self.model_name} to ONNX at {self.onnx_dir}")
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = ORTModelForSeq2SeqLM.from_pretrained(self.model_name, export=True)
+            os.makedirs(self.onnx_dir, exist_ok=True)
+            model.save_pretrained(self.onnx_dir)
+            tokenizer.save_pretrained(self.onnx_dir)
+
+        return tokenizer, model
+
+
+BACKENDS: Dict[str, Type[NormalizerBackend]] = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def create_backend(name: str, model_name: str) -> NormalizerBackend:
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown normalizer backend '{name}'. Choose one of: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name](model_name)
@@ -0,0 +1,168 @@
+# app/ai/batching.py
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger("ai-batching")
+
+# Queued by close(): wakes the worker, which then fails what is still queued
+_STOP = object()
+
+
+class BatchingQueue:
+    """
+    Dynamic micro-batcher.
+
+    Callers `submit()` single items and block until their result is ready.
+    A worker thread collects items for up to `window_ms` (or until
+    `max_batch_size` items are queued) and runs them through `batch_fn`
+    in one call. `batch_fn` must return one result per input, in order.
+
+    `close()` lets a running batch finish and fails the items still
+    queued behind it with RuntimeError.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        window_ms: float = 5.0,
+        name: str = "batcher",
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[tuple[Any, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes: Counter = Counter()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Queue one item and wait for its result.
+        """
+        future: Future = Future()
+
+        # Nothing is queued behind the stop marker
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            self._ensure_worker()
+            self._queue.put((item, future))
+
+        return future.result(timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            batches = self._batches
+            items = self._items
+            sizes = dict(sorted(self._batch_sizes.items()))
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "batch_size_histogram": sizes,
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window * 1000.0,
+        }
+
+    def close(self) -> None:
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._worker and self._worker.is_alive():
+                self._queue.put((_STOP, None))
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def _ensure_worker(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+
+        with self._start_lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._worker.start()
+
+    def _collect(self) -> list:
+        # Block for the first item, then wait at most `window` for more
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch_size and batch[-1][0] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if self._closed:
+                self._fail_pending(batch)
+                return
+
+            items = [item for item, _ in batch]
+
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: batch_fn returned {len(results)} results "
+                        f"for {len(items)} inputs"
+                    )
+            except Exception as e:
+                logger.exception(f"{self.name}: batch of {len(items)} failed")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                with self._stats_lock:
+                    self._batches += 1
+                    self._items += len(items)
+                    self._batch_sizes[len(items)] += 1
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _fail_pending(self, batch: list) -> None:
+        # Everything up to the stop marker was queued before close()
+        error = RuntimeError(f"{self.name} is closed")
+        while True:
+            for item, future in batch:
+                if item is _STOP:
+                    return
+                future.set_exception(error)
+            batch = [self._queue.get()]
@@ -0,0 +1,169 @@
+# app/ai/cache.py
+
+import hashlib
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from app.utils.lru import LRUCache
+from app.utils.metrics import counter_group
+
+logger = logging.getLogger("ai-cache")
+
+# Normalized commands are cached in-process first, then in Redis so
+# all workers share results.
+CACHE_SIZE = int(os.getenv("NORMALIZER_CACHE_SIZE", "2048"))
+CACHE_TTL = int(os.getenv("NORMALIZER_CACHE_TTL", "86400"))  # 1 day
+REDIS_ENABLED = os.getenv("NORMALIZER_CACHE_REDIS", "1") == "1"
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCT = re.compile(r"[\s.!?,]+$")
+
+
+def canonicalize(text: str) -> str:
+    """
+    Canonical form used as the cache key: lowercase, single spaces,
+    no trailing punctuation.
+    """
+    text = _WHITESPACE.sub(" ", (text or "").lower()).strip()
+    return _TRAILING_PUNCT.sub("", text)
+
+
+class NormalizerCache:
+    """
+    Two-tier cache for normalize_command results.
+
+    Keys embed a `version` string (model + prompt + decoding settings),
+    so changing any of them starts from an empty keyspace and old
+    entries simply age out via TTL.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        maxsize: int = CACHE_SIZE,
+        ttl: int = CACHE_TTL,
+        use_redis: bool = REDIS_ENABLED,
+    ):
+        self.version = version
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.use_redis = use_redis
+        self._redis = None
+        self._redis_checked = False
+        self.stats = counter_group("normalizer_cache")
+
+    # -----------------------------
+    # Keys
+    # -----------------------------
+    def key(self, text: str) -> str:
+        digest = hashlib.sha1(canonicalize(text).encode("utf-8")).hexdigest()
+        return f"norm:{self.version}:{digest}"
+
+    # -----------------------------
+    # Redis tier
+    # -----------------------------
+    def _get_redis(self):
+        if not self.use_redis:
+            return None
+
+        if not self._redis_checked:
+            self._redis_checked = True
+            try:
+                from app.cache.redis_client import redis_client
+                self._redis = redis_client
+            except Exception as e:
+                logger.warning(f"⚠️ Normalizer cache running without Redis: {e}")
+                self._redis = None
+
+        return self._redis
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def get(self, text: str) -> Optional[str]:
+        key = self.key(text)
+
+        value = self.local.get(key)
+        if value is not None:
+            self.stats.inc("local_hit")
+            return value
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                value = redis.get(key)
+            except Exception as e:
+                self.stats.inc("redis_error")
+                logger.warning(f"⚠️ Normalizer cache Redis get failed: {e}")
+                value = None
+
+            if value is not None:
+                self.stats.inc("redis_hit")
+                self.local.set(key, value)
+                return value
+
+        self.stats.inc("miss")
+        return None
+
+    def set(self, text: str, command: str) -> None:
+        key = self.key(text)
+        self.local.set(key, command)
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                redis.setex(key, self.ttl, command)
+            except Exception as e:
+                self.stats.inc("redis_error")
+                logger.warning(f"⚠️ Normalizer cache Redis set failed: {e}")
+
+    # -----------------------------
+    # Prefetch (one round-trip for a request stage)
+    # -----------------------------
+    def _prefetch_keys(self, texts: Iterable[str]) -> List[str]:
+        if not self.use_redis:
+            return []
+        keys = {self.key(text) for text in texts}
+        return [key for key in keys if self.local.get(key) is None]
+
+    def _fill_local(self, values: Dict[str, Optional[str]]) -> None:
+        for key, value in values.items():
+            if value is not None:
+                self.local.set(key, value)
+
+    def prefetch(self, texts: Iterable[str]) -> None:
+        """
+        Copy the Redis entries for several texts into the local tier with
+        one MGET, so the `get` calls that follow are local. A single key
+        is left to `get`, which costs the same round-trip.
+        """
+        keys = self._prefetch_keys(texts)
+        redis = self._get_redis() if len(keys) > 1 else None
+        if redis is None:
+            return
+
+        try:
+            self._fill_local(dict(zip(keys, redis.mget(keys))))
+        except Exception as e:
+            self.stats.inc("redis_error")
+            logger.warning(f"⚠️ Normalizer cache Redis prefetch failed: {e}")
+
+    async def prefetch_async(self, texts: Iterable[str]) -> None:
+        """
+        `prefetch` on the pooled asyncio client, for async endpoints.
+        """
+        keys = self._prefetch_keys(texts)
+        if len(keys) < 2:
+            return
+
+        try:
+            from app.cache.async_client import mget
+            self._fill_local(await mget(keys))
+        except Exception as e:
+            self.stats.inc("redis_error")
+            logger.warning(f"⚠️ Normalizer cache Redis prefetch failed: {e}")
+
+    def clear_local(self) -> None:
+        self.local.clear()
@@ -0,0 +1,264 @@
+# app/ai/dialog.py
+"""
+Multi-turn slot filling.
+
+When a command is missing a slot ("spent on food"), its intent and slots
+are kept in Redis (app.cache.state_store, expiring after STATE_TTL). A
+follow-up turn that carries no intent of its own ("500", "for food") is
+parsed with the rules tier against the pending intent and merged into the
+saved state server-side, so it skips the classifier and the LLM.
+
+Without Redis every turn is routed on its own, as before.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from app.ai.parser import prefetch_commands_async
+from app.ai.router import REQUIRED_SLOTS, extract_slots, llm_candidates, missing_slots, route_commands
+from app.intent.compound import split_commands
+from app.intent.detector import Intent, detect_intent
+from app.intent.lexicon import CategoryLexicon
+from app.intent.state import is_state_complete
+from app.utils.metrics import counter_group
+
+logger = logging.getLogger("ai-dialog")
+
+TIER_STATE = "state"
+
+_tiers = counter_group("router_tier")
+_turns = counter_group("dialog_turns")
+
+
+def _store():
+    # app.cache needs REDIS_URL at import; a missing or unreachable Redis
+    # only disables multi-turn state
+    from app.cache import state_store
+    return state_store
+
+
+def _pending(state: Optional[Dict]) -> Optional[Dict]:
+    return state if state and state.get("intent") else None
+
+
+def _pending_state(user_id: int) -> Optional[Dict]:
+    try:
+        return _pending(_store().get_state(user_id))
+    except Exception as e:
+        logger.warning(f"⚠️ Conversation state unavailable: {e}")
+        return None
+
+
+def _fill(text: str, state: Dict, lexicon: Optional[CategoryLexicon]) -> Optional[Dict]:
+    """
+    Slots this turn fills in the pending command, or None when it starts a
+    new command or fills nothing.
+    """
+    intent = Intent(state["intent"])
+    cleaned = (text or "").lower().strip()
+
+    if detect_intent(cleaned) != Intent.UNKNOWN:
+        return None
+
+    # Only fill what is still missing, so "500" cannot overwrite a category
+    found = extract_slots(intent, cleaned, lexicon)
+    fill = {name: found.get(name) for name in missing_slots(intent, state["slots"])}
+    if not any(value is not None for value in fill.values()):
+        return None
+    return fill
+
+
+def _follow_up(text: str, merged: Dict) -> Dict:
+    intent = Intent(merged["intent"])
+    _turns.inc("follow_up")
+
+    result = {
+        "text": text,
+        "normalized": (text or "").lower().strip(),
+        "intent": intent,
+        "slots": merged["slots"],
+        "tier": TIER_STATE,
+        "confidence": None,
+    }
+
+    if is_state_complete(merged):
+        _turns.inc("completed")
+    else:
+        result["missing"] = missing_slots(intent, merged["slots"])
+
+    _tiers.inc(TIER_STATE)
+    logger.info(f"💬 Follow-up for {intent.value}: '{text}' → {merged['slots']}")
+    return result
+
+
+def _continue(text: str, user_id: int, state: Dict, lexicon: Optional[CategoryLexicon]) -> Optional[Dict]:
+    fill = _fill(text, state, lexicon)
+    if fill is None:
+        return None
+
+    # A complete command's state is deleted by the merge itself
+    merged = _store().merge_state(user_id, fill, required=REQUIRED_SLOTS[Intent(state["intent"])])
+    if merged is None:
+        return None  # expired since it was read
+    return _follow_up(text, merged)
+
+
+def continue_turn(text: str, user_id: int, lexicon: Optional[CategoryLexicon] = None) -> Optional[Dict]:
+    """
+    Merge a follow-up turn into the user's pending command. Returns the
+    routed result (tier "state"), or None when nothing is pending or the
+    turn does not fill a missing slot.
+    """
+    state = _pending_state(user_id)
+    if not state:
+        return None
+    return _try_continue(text, user_id, state, lexicon)
+
+
+def _try_continue(text: str, user_id: int, state: Dict, lexicon: Optional[CategoryLexicon]) -> Optional[Dict]:
+    try:
+        return _continue(text, user_id, state, lexicon)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not merge conversation state: {e}")
+        return None
+
+
+def _remembered(result: Dict) -> Optional[Dict]:
+    """
+    State to save after a regular turn: a dict for an incomplete command,
+    {} to clear, None to leave as is.
+    """
+    intent = result["intent"]
+    if intent == Intent.UNKNOWN:
+        return None
+    if not missing_slots(intent, result["slots"]):
+        return {}
+    return {"intent": intent.value, "slots": result["slots"]}
+
+
+def _saved(result: Dict) -> None:
+    # Only ask for the rest once the state is actually kept
+    result["missing"] = missing_slots(result["intent"], result["slots"])
+    _turns.inc("incomplete")
+
+
+def remember_turn(user_id: int, result: Dict, pending: Optional[bool] = None) -> None:
+    """
+    Save (incomplete command) or clear (complete command) the user's state
+    after a regular turn. Adds `missing` to incomplete results.
+
+    `pending` is whether the user had a pending command before this turn
+    (looked up when not given); without one there is nothing to clear.
+    """
+    state = _remembered(result)
+
+    try:
+        if state:
+            _store().save_state(user_id, state)
+            _saved(result)
+        elif state is not None:
+            if pending is None:
+                pending = _pending_state(user_id) is not None
+            if pending:
+                _store().clear_state(user_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not save conversation state: {e}")
+
+
+def route_turn(text: str, user_id: int, lexicon: Optional[CategoryLexicon] = None) -> List[Dict]:
+    """
+    `route_commands` with conversation state: follow-ups complete a pending
+    command, and incomplete single commands are remembered. Incomplete
+    results carry a `missing` list of slot names.
+    """
+    state = _pending_state(user_id)
+    if state:
+        result = _try_continue(text, user_id, state, lexicon)
+        if result is not None:
+            return [result]
+
+    results = route_commands(text, lexicon)
+    if len(results) == 1:
+        remember_turn(user_id, results[0], pending=state is not None)
+
+    return results
+
+
+# -----------------------------
+# Async (pooled asyncio Redis client)
+# -----------------------------
+async def _pending_state_async(user_id: int) -> Optional[Dict]:
+    try:
+        return _pending(await _store().get_state_async(user_id))
+    except Exception as e:
+        logger.warning(f"⚠️ Conversation state unavailable: {e}")
+        return None
+
+
+async def continue_turn_async(text: str, user_id: int, lexicon: Optional[CategoryLexicon] = None) -> Optional[Dict]:
+    """
+    `continue_turn` on the asyncio client, for async endpoints.
+    """
+    state = await _pending_state_async(user_id)
+    if not state:
+        return None
+    return await _try_continue_async(text, user_id, state, lexicon)
+
+
+async def _try_continue_async(text: str, user_id: int, state: Dict, lexicon: Optional[CategoryLexicon]) -> Optional[Dict]:
+    try:
+        fill = _fill(text, state, lexicon)
+        if fill is None:
+            return None
+
+        merged = await _store().merge_state_async(
+            user_id, fill, required=REQUIRED_SLOTS[Intent(state["intent"])]
+        )
+        if merged is None:
+            return None
+        return _follow_up(text, merged)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not merge conversation state: {e}")
+        return None
+
+
+async def remember_turn_async(user_id: int, result: Dict, pending: Optional[bool] = None) -> None:
+    state = _remembered(result)
+
+    try:
+        if state:
+            await _store().save_state_async(user_id, state)
+            _saved(result)
+        elif state is not None:
+            if pending is None:
+                pending = await _pending_state_async(user_id) is not None
+            if pending:
+                await _store().clear_state_async(user_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not save conversation state: {e}")
+
+
+async def route_turn_async(text: str, user_id: int, lexicon: Optional[CategoryLexicon] = None) -> List[Dict]:
+    """
+    `route_turn` for async endpoints: state reads and writes go through
+    the pooled asyncio client, and routing (normalizer cache, flan-t5
+    batcher) runs in a worker thread instead of blocking the event loop.
+    """
+    state = await _pending_state_async(user_id)
+    if state:
+        result = await _try_continue_async(text, user_id, state, lexicon)
+        if result is not None:
+            return [result]
+
+    # Normalizer cache reads for the whole utterance in one async
+    # round-trip, so the routing thread finds them locally
+    commands = split_commands(text)
+    if len(commands) > 1:
+        await prefetch_commands_async(llm_candidates(commands, lexicon))
+
+    results = await asyncio.to_thread(route_commands, text, lexicon, False)
+    if len(results) == 1:
+        await remember_turn_async(user_id, results[0], pending=state is not None)
+
+    return results
@@ -0,0 +1,328 @@
+# app/ai/evaluate.py
+"""
+Offline evaluation of the command understanding tiers.
+
+Runs a labelled utterance corpus (JSONL: {"text", "intent", "slots"})
+through each tier and reports intent accuracy, slot precision / recall /
+F1, p50 / p95 / p99 latency and throughput:
+
+    rules       keyword intent detection + slot extraction
+    classifier  n-gram intent classifier + slot extraction
+    llm         flan-t5 normalization, then rules on its output
+    router      the production route_command (all tiers, cheapest first)
+
+    python -m app.ai.evaluate
+    python -m app.ai.evaluate --tiers rules classifier --output runs/today.json
+    python -m app.ai.evaluate --baseline runs/yesterday.json
+
+Caches are cleared before every utterance so latencies are cold: the
+parser memos, the lexicon memos and the normalizer cache (cold runs use
+an empty local-only one instead of the shared cache and Redis). Pass
+--warm to measure with caches as they are in production.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.ai import parser as normalizer
+from app.ai.cache import NormalizerCache
+from app.ai.router import CLASSIFIER_THRESHOLD, REQUIRED_SLOTS, extract_slots, route_command
+from app.ai.sidecar import get_inference_client, is_sidecar_mode
+from app.intent.amounts import normalize_amounts
+from app.intent.classifier import classify_intent, get_classifier
+from app.intent.detector import Intent, _lookup, detect_intent
+from app.intent.lexicon import get_default_lexicon
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "eval_corpus.jsonl")
+
+TIERS = ("rules", "classifier", "llm", "router")
+
+Prediction = Tuple[Intent, Dict]
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict]:
+    examples = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                example = json.loads(line)
+                example["intent"] = Intent(example["intent"])
+                example.setdefault("slots", {})
+                examples.append(example)
+    return examples
+
+
+# -----------------------------
+# Tiers
+# -----------------------------
+def _rules(text: str) -> Prediction:
+    cleaned = text.lower().strip()
+    intent = detect_intent(cleaned)
+    return intent, extract_slots(intent, cleaned)
+
+
+def _classifier(text: str) -> Prediction:
+    cleaned = text.lower().strip()
+    intent = classify_intent(cleaned).intent
+    return intent, extract_slots(intent, cleaned)
+
+
+def _llm(text: str, warm: bool) -> Prediction:
+    if warm:
+        command = normalizer.normalize_command(text)
+    elif is_sidecar_mode():
+        command = get_inference_client().normalize([text])[0]
+    else:
+        # Straight to the model, past the normalizer cache
+        command = normalizer._normalize_batch([text])[0]
+    return _rules(command)
+
+
+def _router(text: str) -> Prediction:
+    result = route_command(text)
+    return result["intent"], result["slots"]
+
+
+def _clear_caches(normalizer_cache: NormalizerCache) -> None:
+    normalize_amounts.cache_clear()
+    _lookup.cache_clear()
+
+    lexicon = get_default_lexicon()
+    lexicon.memos.clear()  # parse memo and the parser's word tables
+    lexicon._word.cache_clear()
+    lexicon._fuzzy.cache_clear()
+
+    normalizer_cache.clear_local()
+
+
+@contextmanager
+def _private_normalizer_cache():
+    """
+    Route normalize_command (the router's flan-t5 tier) through an empty,
+    local-only cache, so cold runs neither read nor write the shared
+    cache and its Redis keys.
+    """
+    cache = NormalizerCache(version=normalizer.CACHE_VERSION, use_redis=False)
+    shared = normalizer._get_cache
+    normalizer._get_cache = lambda: cache
+    try:
+        yield cache
+    finally:
+        normalizer._get_cache = shared
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+def _slot_pairs(intent: Intent, slots: Dict) -> set:
+    pairs = set()
+    for name in REQUIRED_SLOTS.get(intent, ()):
+        value = slots.get(name)
+        if value is not None:
+            pairs.add((name, float(value) if isinstance(value, (int, float)) else value))
+    return pairs
+
+
+def _percentiles(latencies_ms: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(np.mean(latencies_ms)), 3),
+    }
+
+
+def evaluate_tier(
+    predict: Callable[[str], Prediction],
+    corpus: List[Dict],
+    warm: bool = False,
+) -> Dict:
+    correct = 0
+    tp = fp = fn = 0
+    errors = []
+    latencies = []
+    per_intent: Dict[str, List[int]] = {}
+    mistakes = []
+
+    start = time.perf_counter()
+    with (nullcontext() if warm else _private_normalizer_cache()) as private:
+        for example in corpus:
+            if not warm:
+                _clear_caches(private)
+
+            began = time.perf_counter()
+            try:
+                intent, slots = predict(example["text"])
+            except Exception as e:
+                errors.append(f"{example['text']}: {e}")
+                intent, slots = Intent.UNKNOWN, {}
+            latencies.append((time.perf_counter() - began) * 1000.0)
+
+            expected = example["intent"]
+            hit = intent == expected
+            correct += hit
+            per_intent.setdefault(expected.value, [0, 0])
+            per_intent[expected.value][0] += hit
+            per_intent[expected.value][1] += 1
+
+            gold = _slot_pairs(expected, example["slots"])
+            predicted = _slot_pairs(intent, slots)
+            tp += len(gold & predicted)
+            fp += len(predicted - gold)
+            fn += len(gold - predicted)
+
+            if not hit or gold != predicted:
+                mistakes.append({
+                    "text": example["text"],
+                    "expected": expected.value,
+                    "predicted": intent.value,
+                    "missed_slots": sorted(map(list, gold - predicted)),
+                    "wrong_slots": sorted(map(list, predicted - gold)),
+                })
+    elapsed = time.perf_counter() - start
+
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    return {
+        "n": len(corpus),
+        "intent_accuracy": round(correct / len(corpus), 4),
+        "intent_accuracy_by_intent": {
+            intent: round(hits / total, 4) for intent, (hits, total) in sorted(per_intent.items())
+        },
+        "slot_precision": round(precision, 4),
+        "slot_recall": round(recall, 4),
+        "slot_f1": round(f1, 4),
+        **_percentiles(latencies),
+        "throughput_per_s": round(len(corpus) / elapsed, 1) if elapsed else None,
+        "errors": errors,
+        "mistakes": mistakes,
+    }
+
+
+def _classifier_batch_throughput(corpus: List[Dict], repeat: int = 20) -> float:
+    texts = [example["text"].lower().strip() for example in corpus] * repeat
+    classifier = get_classifier()
+
+    start = time.perf_counter()
+    classifier.predict_batch(texts)
+    return round(len(texts) / (time.perf_counter() - start), 1)
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+def run(
+    tiers: Tuple[str, ...] = TIERS,
+    corpus_path: str = CORPUS_PATH,
+    warm: bool = False,
+) -> Dict:
+    corpus = load_corpus(corpus_path)
+    predictors = {
+        "rules": _rules,
+        "classifier": _classifier,
+        "llm": lambda text: _llm(text, warm),
+        "router": _router,
+    }
+
+    # Training / model loading is not part of per-utterance latency
+    if "classifier" in tiers or "router" in tiers:
+        get_classifier()
+
+    results = {}
+    for tier in tiers:
+        if tier == "llm":
+            try:
+                _llm(corpus[0]["text"], warm)
+            except Exception as e:
+                results[tier] = {"skipped": f"normalizer unavailable: {e}"}
+                continue
+
+        results[tier] = evaluate_tier(predictors[tier], corpus, warm)
+
+    if "classifier" in results:
+        results["classifier"]["batch_throughput_per_s"] = _classifier_batch_throughput(corpus)
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "corpus": corpus_path,
+        "size": len(corpus),
+        "warm": warm,
+        "settings": {
+            "model": normalizer.MODEL_NAME,
+            "backend": normalizer.BACKEND,
+            "decoding_ladder": normalizer.DECODING_LADDER,
+            "constrained_decoding": normalizer.CONSTRAINED_DECODING,
+            "classifier_threshold": CLASSIFIER_THRESHOLD,
+        },
+        "tiers": results,
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    print(f"Corpus: {report['corpus']} ({report['size']} utterances, {'warm' if report['warm'] else 'cold'})")
+    print(f"{'tier':<12}{'intent':>8}{'slot_f1':>9}{'p50_ms':>9}{'p95_ms':>9}{'p99_ms':>9}{'per_s':>10}")
+
+    for tier, r in report["tiers"].items():
+        if "skipped" in r:
+            print(f"{tier:<12} skipped: {r['skipped']}")
+            continue
+
+        print(
+            f"{tier:<12}{r['intent_accuracy']:>8.3f}{r['slot_f1']:>9.3f}{r['p50_ms']:>9.3f}"
+            f"{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}{r['throughput_per_s']:>10}"
+        )
+
+        old = (baseline or {}).get("tiers", {}).get(tier)
+        if old and "skipped" not in old:
+            print(
+                f"{'  Δ':<12}{r['intent_accuracy'] - old['intent_accuracy']:>+8.3f}"
+                f"{r['slot_f1'] - old['slot_f1']:>+9.3f}{r['p50_ms'] - old['p50_ms']:>+9.3f}"
+                f"{r['p95_ms'] - old['p95_ms']:>+9.3f}{r['p99_ms'] - old['p99_ms']:>+9.3f}"
+            )
+        if r["errors"]:
+            print(f"  ⚠️ {len(r['errors'])} errors, first: {r['errors'][0]}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evaluate intent / slot tiers on a labelled corpus")
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--tiers", nargs="+", default=list(TIERS), choices=TIERS)
+    parser.add_argument("--warm", action="store_true", help="keep caches between utterances")
+    parser.add_argument("--output", help="write JSON results to this path")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to diff against")
+    args = parser.parse_args()
+
+    report = run(tuple(args.tiers), args.corpus, args.warm)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✅ Results written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+# app/ai/grammar.py
+"""
+Grammar-constrained decoding for the command normalizer.
+
+The four command forms are compiled into a small character-level NFA.
+At each decoder step only vocabulary pieces that keep the output a
+viable prefix of some command are allowed, and EOS is only allowed once
+a command is complete — so generation can only produce valid commands
+and stops as soon as one is finished.
+
+The bare `unknown` form lets the model abstain instead of being forced
+to invent an intent, category or number for text it cannot map.
+"""
+
+import threading
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+# Slot element types (anything else in a form is a literal word)
+WORD = "<word>"      # category: letters
+NUMBER = "<number>"  # amount / day: digits
+NAME = "<name>"      # reminder name: one or more alphanumeric words
+
+# Abstention: the model could not map the text onto a command
+ABSTAIN = "unknown"
+
+COMMAND_FORMS: Tuple[Tuple[str, ...], ...] = (
+    ("set", WORD, "budget", "to", NUMBER),
+    ("add", "expense", NUMBER, WORD),
+    ("remind", "me", "to", NAME, "on", NUMBER),
+    ("check", "balance"),
+    (ABSTAIN,),
+)
+
+SLOTS = (WORD, NUMBER, NAME)
+
+# (form index, element index, characters typed so far in that element)
+Position = Tuple[int, int, str]
+State = FrozenSet[Position]
+
+
+# -----------------------------
+# Character-level NFA
+# -----------------------------
+def _accepts(element: str, partial: str) -> bool:
+    if element == WORD:
+        return partial.isascii() and partial.isalpha()
+    if element == NUMBER:
+        return partial.isascii() and partial.isdigit()
+    if element == NAME:
+        return partial.isascii() and partial.isalnum()
+    return element.startswith(partial)
+
+
+def _complete(element: str, partial: str) -> bool:
+    if element in SLOTS:
+        return partial != ""
+    return partial == element
+
+
+def initial_state() -> State:
+    return frozenset((f, 0, "") for f in range(len(COMMAND_FORMS)))
+
+
+def step(state: State, ch: str) -> State:
+    """
+    Advance every live position by one character. An empty result means
+    the text can no longer become a valid command.
+    """
+    positions = set()
+
+    for f, i, partial in state:
+        form = COMMAND_FORMS[f]
+        element = form[i]
+
+        if ch == " ":
+            if i == 0 and partial == "":
+                positions.add((f, i, partial))  # leading space
+            elif _complete(element, partial):
+                if i + 1 < len(form):
+                    positions.add((f, i + 1, ""))
+                if element == NAME:
+                    positions.add((f, i, ""))   # another name word
+        elif _accepts(element, partial + ch):
+            positions.add((f, i, partial + ch))
+
+    return frozenset(positions)
+
+
+def feed(state: State, text: str) -> State:
+    for ch in text:
+        state = step(state, ch)
+        if not state:
+            break
+    return state
+
+
+def is_complete(state: State) -> bool:
+    return any(
+        i == len(COMMAND_FORMS[f]) - 1 and _complete(COMMAND_FORMS[f][i], partial)
+        for f, i, partial in state
+    )
+
+
+def _signature(state: State) -> State:
+    # Which pieces are allowed only depends on the exact text typed inside
+    # literal elements; for slots it only matters whether one has started.
+    return frozenset(
+        (f, i, partial if COMMAND_FORMS[f][i] not in SLOTS else str(bool(partial)))
+        for f, i, partial in state
+    )
+
+
+# -----------------------------
+# Token-level constraint
+# -----------------------------
+class CommandGrammar:
+    """
+    Maps the NFA onto a tokenizer vocabulary. Allowed-token lists are
+    computed once per distinct NFA signature and reused across requests.
+    """
+
+    def __init__(self, vocab: Sequence[str], eos_token_id: int, pad_token_id: int = 0):
+        self.eos_token_id = eos_token_id
+        self.pad_token_id = pad_token_id
+
+        # Only lowercase/digit pieces can ever appear in a command
+        self.piece_text: Dict[int, str] = {}
+        for token_id, piece in enumerate(vocab):
+            text = piece.replace("▁", " ")
+            body = text[1:] if text.startswith(" ") else text
+            if text == " " or (body and body.isascii() and body.isalnum() and body == body.lower()):
+                self.piece_text[token_id] = text
+
+        self._trie = self._build_trie()
+        self._allowed: Dict[State, List[int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer) -> "CommandGrammar":
+        vocab = tokenizer.convert_ids_to_tokens(list(range(len(tokenizer))))
+        return cls(vocab, tokenizer.eos_token_id, tokenizer.pad_token_id or 0)
+
+    def _build_trie(self) -> dict:
+        root = {"ids": [], "children": {}}
+        for token_id, text in self.piece_text.items():
+            node = root
+            for ch in text:
+                node = node["children"].setdefault(ch, {"ids": [], "children": {}})
+            node["ids"].append(token_id)
+        return root
+
+    def allowed_tokens(self, state: State) -> List[int]:
+        key = _signature(state)
+        allowed = self._allowed.get(key)
+        if allowed is not None:
+            return allowed
+
+        allowed = []
+        stack = [(self._trie, state)]
+        while stack:
+            node, node_state = stack.pop()
+            for ch, child in node["children"].items():
+                child_state = step(node_state, ch)
+                if child_state:
+                    allowed.extend(child["ids"])
+                    stack.append((child, child_state))
+
+        if is_complete(state):
+            allowed.append(self.eos_token_id)
+
+        with self._lock:
+            self._allowed[key] = allowed
+        return allowed
+
+    def prefix_allowed_tokens_fn(self):
+        """
+        Build a `prefix_allowed_tokens_fn` for one generate() call.
+        """
+        states: Dict[tuple, Optional[State]] = {(): initial_state()}
+        finished = [self.pad_token_id, self.eos_token_id]
+
+        def state_for(ids: tuple) -> Optional[State]:
+            if ids in states:
+                return states[ids]
+
+            previous = state_for(ids[:-1])
+            last = ids[-1]
+            if previous is None or last in (self.eos_token_id, self.pad_token_id):
+                state = None  # sequence already finished
+            else:
+                state = feed(previous, self.piece_text.get(last, "\0"))
+            states[ids] = state
+            return state
+
+        def prefix_fn(batch_id: int, input_ids) -> List[int]:
+            ids = tuple(input_ids.tolist())[1:]  # drop decoder start token
+            state = state_for(ids)
+            if not state:
+                return finished
+            return self.allowed_tokens(state)
+
+        return prefix_fn
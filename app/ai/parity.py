@@ -0,0 +1,109 @@
+# app/ai/parity.py
+"""
+Backend parity check for the command normalizer.
+
+Runs a fixed command corpus through the reference backend and a candidate
+backend at every level of the decoding ladder, decoding the way the
+parser does (grammar-constrained unless NORMALIZER_CONSTRAINED=0), and
+reports mismatches and per-backend latency. Each backend is loaded once.
+
+    python -m app.ai.parity --backend int8
+    python -m app.ai.parity --backend onnx --reference torch
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional
+
+from app.ai.backends import BACKENDS, NormalizerBackend, create_backend
+from app.ai.grammar import CommandGrammar
+from app.ai.parser import CONSTRAINED_DECODING, DECODING_LADDER, MODEL_NAME, _build_prompt
+
+PARITY_CORPUS = [
+    "paid 40 for tea",
+    "i spent 250 on food",
+    "spent 300 on fuel",
+    "add expense 120 shopping",
+    "dont let me spend more than 23 on pen",
+    "set food budget to 6000",
+    "limit my travel spending to 2000",
+    "my rent budget is 15000",
+    "how much money is left",
+    "check balance",
+    "what is my balance",
+    "remind me to pay rent on 10",
+    "remind me to pay electricity bill on 5",
+    "set a reminder for internet bill on 3",
+    "bought groceries for 450",
+    "movie tickets 600",
+]
+
+
+def _load(backend_name: str) -> NormalizerBackend:
+    return create_backend(backend_name, MODEL_NAME).load()
+
+
+def _grammar(backend: NormalizerBackend) -> Optional[CommandGrammar]:
+    # Same as parser._get_grammar, for this backend's tokenizer
+    return CommandGrammar.from_tokenizer(backend.tokenizer) if CONSTRAINED_DECODING else None
+
+
+def _run(backend: NormalizerBackend, grammar: Optional[CommandGrammar], corpus: List[str], num_beams: int) -> Dict:
+    prompts = [_build_prompt(text) for text in corpus]
+
+    start = time.perf_counter()
+    outputs = [
+        backend.generate(
+            [prompt],
+            num_beams=num_beams,
+            max_length=24,
+            prefix_allowed_tokens_fn=grammar.prefix_allowed_tokens_fn() if grammar else None,
+        )[0]
+        for prompt in prompts
+    ]
+    elapsed = time.perf_counter() - start
+
+    return {
+        "outputs": outputs,
+        "ms_per_command": elapsed * 1000.0 / len(corpus),
+    }
+
+
+def check_parity(backend: str, reference: str = "torch", corpus: List[str] = PARITY_CORPUS) -> bool:
+    ok = True
+
+    ref_backend = _load(reference)
+    cand_backend = _load(backend)
+    ref_grammar = _grammar(ref_backend)
+    cand_grammar = _grammar(cand_backend)
+
+    for num_beams in DECODING_LADDER:
+        ref = _run(ref_backend, ref_grammar, corpus, num_beams)
+        cand = _run(cand_backend, cand_grammar, corpus, num_beams)
+
+        print(
+            f"num_beams={num_beams}: {reference} {ref['ms_per_command']:.1f} ms/cmd, "
+            f"{backend} {cand['ms_per_command']:.1f} ms/cmd"
+        )
+
+        for text, expected, actual in zip(corpus, ref["outputs"], cand["outputs"]):
+            if expected != actual:
+                ok = False
+                print(f"  ❌ '{text}': {reference}='{expected}' {backend}='{actual}'")
+
+    print("✅ Parity OK" if ok else "❌ Parity FAILED")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Normalizer backend parity check")
+    parser.add_argument("--backend", required=True, choices=sorted(BACKENDS))
+    parser.add_argument("--reference", default="torch", choices=sorted(BACKENDS))
+    args = parser.parse_args()
+
+    return 0 if check_parity(args.backend, args.reference) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
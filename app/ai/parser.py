@@ -1,42 +1,78 @@
 # app/ai/parser.py
 
+import hashlib
+import os
 import re
 from functools import lru_cache
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from typing import List
 
-MODEL_NAME = "google/flan-t5-base"
+from dotenv import load_dotenv
 
-VALID_PATTERNS = [
-    r"^set \w+ budget to \d+$",
-    r"^add expense \d+ \w+$",
-    r"^remind me to .+ on \d+$",
-    r"^check balance$",
-]
+from app.ai.backends import NormalizerBackend, create_backend
+from app.ai.batching import BatchingQueue
+from app.ai.cache import NormalizerCache
+from app.ai.grammar import ABSTAIN, CommandGrammar
+from app.ai.sidecar import get_inference_client, is_sidecar_mode
+from app.intent.amounts import normalize_amounts
+from app.utils.metrics import counter_group, register_gauge
 
-@lru_cache(maxsize=1)
-def _load_model():
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
-    model.eval()
-    return tokenizer, model
+load_dotenv()
 
+MODEL_NAME = "google/flan-t5-base"
 
-def _is_valid_command(cmd: str) -> bool:
-    return any(re.match(p, cmd) for p in VALID_PATTERNS)
+# Inference backend: torch (reference fp32), int8 (dynamic quantization)
+# or onnx (ONNX Runtime via optimum). See app/ai/backends.py.
+BACKEND = os.getenv("NORMALIZER_BACKEND", "torch")
 
+# Micro-batching: concurrent requests are grouped for up to
+# BATCH_WINDOW_MS into a single padded generate() call.
+# NORMALIZER_MAX_BATCH_SIZE=1 disables batching.
+BATCH_WINDOW_MS = float(os.getenv("NORMALIZER_BATCH_WINDOW_MS", "5"))
+MAX_BATCH_SIZE = int(os.getenv("NORMALIZER_MAX_BATCH_SIZE", "8"))
 
-def normalize_command(text: str) -> str:
+
+def _parse_decoding_ladder(value: str) -> List[int]:
     """
-    Normalize natural language into a STRICT finance command.
-    Falls back safely if AI output is invalid.
+    "1,5" → [1, 5]. Every level must be a positive whole number of beams.
     """
+    ladder = []
+    for beams in value.split(","):
+        beams = beams.strip()
+        if not beams:
+            continue
+        if not beams.isdigit() or int(beams) < 1:
+            raise ValueError(
+                f"NORMALIZER_DECODING_LADDER must be comma-separated beam counts "
+                f"of at least 1 (e.g. '1,5'), got {value!r}"
+            )
+        ladder.append(int(beams))
 
-    if not text or len(text.strip()) < 3:
-        return text.lower().strip()
+    if not ladder:
+        raise ValueError("NORMALIZER_DECODING_LADDER needs at least one beam count (e.g. '1,5')")
+    return ladder
+
+
+# Adaptive decoding: each entry is a num_beams setting. Decoding starts
+# with the first (greedy) level and only texts whose output fails
+# VALID_PATTERNS are re-decoded at the next level.
+DECODING_LADDER = _parse_decoding_ladder(os.getenv("NORMALIZER_DECODING_LADDER", "1,5"))
+
+# Grammar-constrained decoding: the model can only emit the four command
+# forms or abstain with "unknown" (see app/ai/grammar.py).
+# NORMALIZER_CONSTRAINED=0 decodes freely.
+CONSTRAINED_DECODING = os.getenv("NORMALIZER_CONSTRAINED", "1") == "1"
+
+VALID_PATTERNS = [
+    r"^set \w+ budget to \d+$",
+    r"^add expense \d+ \w+$",
+    r"^remind me to .+ on \d+$",
+    r"^check balance$",
+]
 
-    tokenizer, model = _load_model()
+_COMMAND_NUMBER = re.compile(r"\d+")
+_STATED_NUMBER = re.compile(r"\d+(?:\.\d+)?")
 
-    prompt = f"""
+PROMPT_TEMPLATE = """
 You are a STRICT command normalizer.
 
 You MUST output EXACTLY ONE command.
@@ -50,6 +86,9 @@ Choose ONE format ONLY:
 2. add expense <amount> <category>
 3. remind me to <name> on <day>
 4. check balance
+5. unknown
+
+If the user does not say the amount, category or day, output: unknown
 
 ### Examples
 
@@ -65,28 +104,204 @@ Command: check balance
 User: remind me to pay rent on 10
 Command: remind me to pay rent on 10
 
+User: spent on groceries
+Command: unknown
+
 ### Now convert:
 
 User: {text}
 Command:
 """.strip()
 
-    inputs = tokenizer(prompt, return_tensors="pt", truncation=True)
+# Cache keys embed the model and a hash of the prompt, so editing either
+# invalidates previously cached normalizations automatically.
+PROMPT_VERSION = hashlib.sha1(PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:10]
+CACHE_VERSION = (
+    f"{MODEL_NAME}:{BACKEND}:{PROMPT_VERSION}:"
+    f"beams-{'-'.join(str(b) for b in DECODING_LADDER)}"
+    f"{':constrained' if CONSTRAINED_DECODING else ''}"
+)
+
+_decode_levels = counter_group("normalizer_decoding")
+
+
+@lru_cache(maxsize=1)
+def _get_backend() -> NormalizerBackend:
+    return create_backend(BACKEND, MODEL_NAME)
+
+
+@lru_cache(maxsize=1)
+def _get_grammar() -> CommandGrammar:
+    return CommandGrammar.from_tokenizer(_get_backend().load().tokenizer)
+
+
+def _is_valid_command(cmd: str) -> bool:
+    return any(re.match(p, cmd) for p in VALID_PATTERNS)
+
+
+def _stated_numbers(text: str) -> set:
+    # Numbers said in the user's text, as digits or number words
+    # ("250.50" also grounds "250", since commands only carry integers)
+    numbers = set()
+    for number in _STATED_NUMBER.findall(normalize_amounts(text.lower())):
+        numbers.add(number)
+        numbers.add(str(int(float(number))))
+    return numbers
+
+
+def _is_grounded(command: str, text: str) -> bool:
+    """
+    True when every amount, limit or day in `command` was actually said
+    in `text`. Constrained decoding always produces *some* number, so an
+    ungrounded one is a hallucination and must not reach the database.
+    """
+    return set(_COMMAND_NUMBER.findall(command)) <= _stated_numbers(text)
+
+
+def _build_prompt(text: str) -> str:
+    return PROMPT_TEMPLATE.format(text=text)
 
-    outputs = model.generate(
-        **inputs,
+
+def _generate_commands(texts: List[str], num_beams: int = 5) -> List[str]:
+    """
+    Run one padded generate() call over a batch of user texts.
+    Returns the raw (lowercased) model output for each text.
+    """
+    prompts = [_build_prompt(text) for text in texts]
+    prefix_fn = _get_grammar().prefix_allowed_tokens_fn() if CONSTRAINED_DECODING else None
+
+    return _get_backend().generate(
+        prompts,
+        num_beams=num_beams,
         max_length=24,
-        do_sample=False,
-        num_beams=5,
-        early_stopping=True,
+        prefix_allowed_tokens_fn=prefix_fn,
     )
 
-    command = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    command = command.lower().strip()
 
-    # 🛑 HARD VALIDATION
-    if _is_valid_command(command):
-        return command
+def _normalize_batch(texts: List[str]) -> List[str]:
+    """
+    Decode a batch up the DECODING_LADDER, escalating only the texts
+    whose output is not a valid command grounded in the text. Returns
+    final commands; abstentions fall back to the raw text so the rules
+    parse (and its missing slots) is what the router sees.
+    """
+    results = [None] * len(texts)
+    pending = list(range(len(texts)))
+
+    for level, num_beams in enumerate(DECODING_LADDER):
+        if not pending:
+            break
+
+        commands = _generate_commands([texts[i] for i in pending], num_beams=num_beams)
+        still_invalid = []
+
+        for i, command in zip(pending, commands):
+            if command == ABSTAIN:
+                results[i] = texts[i].lower().strip()
+                _decode_levels.inc("abstain")
+            # 🛑 HARD VALIDATION
+            elif _is_valid_command(command) and _is_grounded(command, texts[i]):
+                results[i] = command
+                _decode_levels.inc(f"level_{level}_beams_{num_beams}")
+            else:
+                still_invalid.append(i)
+
+        pending = still_invalid
 
     # 🔁 SAFETY FALLBACK (VERY IMPORTANT)
-    return text.lower().strip()
+    for i in pending:
+        results[i] = texts[i].lower().strip()
+        _decode_levels.inc("fallback")
+
+    return results
+
+
+@lru_cache(maxsize=1)
+def _get_batcher() -> BatchingQueue:
+    batcher = BatchingQueue(
+        _normalize_batch,
+        max_batch_size=MAX_BATCH_SIZE,
+        window_ms=BATCH_WINDOW_MS,
+        name="normalizer-batcher",
+    )
+    register_gauge("normalizer_batcher", batcher.stats)
+    return batcher
+
+
+@lru_cache(maxsize=1)
+def _get_cache() -> NormalizerCache:
+    return NormalizerCache(version=CACHE_VERSION)
+
+
+def normalize_command(text: str) -> str:
+    """
+    Normalize natural language into a STRICT finance command.
+    Falls back safely if AI output is invalid.
+    """
+
+    if not text or len(text.strip()) < 3:
+        return text.lower().strip()
+
+    cache = _get_cache()
+    cached = cache.get(text)
+    if cached is not None:
+        return cached
+
+    if is_sidecar_mode():
+        command = get_inference_client().normalize([text])[0]
+    elif MAX_BATCH_SIZE > 1:
+        command = _get_batcher().submit(text)
+    else:
+        command = _normalize_batch([text])[0]
+
+    cache.set(text, command)
+    return command
+
+
+def _cacheable(texts: List[str]) -> List[str]:
+    # Texts normalize_command would look up (shorter ones skip the cache)
+    return [text for text in texts if text and len(text.strip()) >= 3]
+
+
+def prefetch_commands(texts: List[str]) -> None:
+    """
+    Load the cached commands for several texts in one Redis round-trip
+    ahead of their `normalize_command` calls.
+    """
+    _get_cache().prefetch(_cacheable(texts))
+
+
+async def prefetch_commands_async(texts: List[str]) -> None:
+    await _get_cache().prefetch_async(_cacheable(texts))
+
+
+def normalize_commands(texts: List[str]) -> List[str]:
+    """
+    Normalize many texts in one generate() call (offline / bulk use).
+    """
+    cache = _get_cache()
+    cache.prefetch(_cacheable(texts))
+    results = [None] * len(texts)
+    pending = []
+
+    for i, text in enumerate(texts):
+        if not text or len(text.strip()) < 3:
+            results[i] = (text or "").lower().strip()
+            continue
+
+        results[i] = cache.get(text)
+        if results[i] is None:
+            pending.append(i)
+
+    if pending:
+        pending_texts = [texts[i] for i in pending]
+        if is_sidecar_mode():
+            commands = get_inference_client().normalize(pending_texts)
+        else:
+            commands = _normalize_batch(pending_texts)
+
+        for i, command in zip(pending, commands):
+            results[i] = command
+            cache.set(texts[i], command)
+
+    return results
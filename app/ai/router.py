@@ -0,0 +1,178 @@
+# app/ai/router.py
+
+import logging
+import os
+from typing import Dict, List, Optional
+
+from app.ai.parser import normalize_command, prefetch_commands
+from app.intent.classifier import classify_intent
+from app.intent.compound import split_commands
+from app.intent.detector import Intent, parse_utterance
+from app.intent.lexicon import CategoryLexicon
+from app.intent.slots import (
+    extract_budget_slots,
+    extract_reminder_slots,
+    extract_transaction_slots,
+)
+from app.utils.metrics import counter_group
+
+logger = logging.getLogger("ai-router")
+
+TIER_RULES = "rules"
+TIER_CLASSIFIER = "classifier"
+TIER_LLM = "llm"
+
+# Below this confidence the classifier defers to flan-t5 (set above 1
+# to disable the classifier tier)
+CLASSIFIER_THRESHOLD = float(os.getenv("INTENT_CLASSIFIER_THRESHOLD", "0.7"))
+
+# Slots that must be filled before an intent can be executed
+REQUIRED_SLOTS = {
+    Intent.UPDATE_BUDGET: ("category", "limit"),
+    Intent.ADD_EXPENSE: ("category", "amount"),
+    Intent.CREATE_REMINDER: ("name", "day"),
+    Intent.CHECK_BALANCE: (),
+}
+
+SLOT_EXTRACTORS = {
+    Intent.UPDATE_BUDGET: extract_budget_slots,
+    Intent.ADD_EXPENSE: extract_transaction_slots,
+    Intent.CREATE_REMINDER: extract_reminder_slots,
+}
+
+_tiers = counter_group("router_tier")
+
+
+# -----------------------------
+# Slot Helpers
+# -----------------------------
+def extract_slots(intent: Intent, text: str, lexicon: Optional[CategoryLexicon] = None) -> Dict:
+    extractor = SLOT_EXTRACTORS.get(intent)
+    return extractor(text, lexicon) if extractor else {}
+
+
+def missing_slots(intent: Intent, slots: Dict) -> List[str]:
+    if intent not in REQUIRED_SLOTS:
+        return []
+    return [name for name in REQUIRED_SLOTS[intent] if not slots.get(name)]
+
+
+def is_resolved(intent: Intent, slots: Dict) -> bool:
+    return intent in REQUIRED_SLOTS and not missing_slots(intent, slots)
+
+
+def _parse(text: str, lexicon: Optional[CategoryLexicon] = None) -> Dict:
+    # Same parse (and memo entry) as the slot extractors below
+    intent = parse_utterance(text, lexicon).intent if text else Intent.UNKNOWN
+    return {
+        "normalized": text,
+        "intent": intent,
+        "slots": extract_slots(intent, text, lexicon),
+        "confidence": None,
+    }
+
+
+def llm_candidates(commands: List[str], lexicon: Optional[CategoryLexicon] = None) -> List[str]:
+    """
+    Commands the rules tier leaves unresolved, i.e. the ones likely to
+    reach flan-t5 (and so the normalizer cache).
+    """
+    candidates = []
+    for command in commands:
+        parsed = _parse((command or "").lower().strip(), lexicon)
+        if not is_resolved(parsed["intent"], parsed["slots"]):
+            candidates.append(command)
+    return candidates
+
+
+# -----------------------------
+# Router
+# -----------------------------
+def route_command(
+    text: str,
+    lexicon: Optional[CategoryLexicon] = None,
+    previous_intent: Optional[Intent] = None,
+) -> Dict:
+    """
+    Resolve a user utterance into intent + slots, cheapest tier first.
+
+    1. rules      — keyword intent detection + slot extraction on the raw text
+    2. classifier — n-gram intent classifier, when rules find no intent;
+                    a known intent is accepted at or above
+                    CLASSIFIER_THRESHOLD confidence
+    3. llm        — flan-t5 normalization, when neither tier above settles
+                    the intent, or leaves a required slot empty
+
+    `lexicon` is the caller's category lexicon (see `get_user_lexicon`);
+    the shared default is used when omitted. `previous_intent` lets an
+    elliptical follow-up ("... and 300 on fuel") reuse the intent of the
+    command before it when its slots then resolve.
+
+    Returns a dict with `text`, `normalized`, `intent`, `slots`, `tier` and
+    `confidence` (the classifier's score, when it was consulted).
+    """
+    cleaned = (text or "").lower().strip()
+    result = _parse(cleaned, lexicon)
+    result["tier"] = TIER_RULES
+
+    if result["intent"] == Intent.UNKNOWN and previous_intent is not None:
+        slots = extract_slots(previous_intent, cleaned, lexicon)
+        if is_resolved(previous_intent, slots):
+            result.update(intent=previous_intent, slots=slots)
+
+    if result["intent"] == Intent.UNKNOWN and CLASSIFIER_THRESHOLD <= 1:
+        prediction = classify_intent(cleaned)
+        result["confidence"] = prediction.confidence
+
+        # "Not a command" is no answer: the model may still find one
+        if prediction.intent != Intent.UNKNOWN and prediction.confidence >= CLASSIFIER_THRESHOLD:
+            result["intent"] = prediction.intent
+            result["slots"] = extract_slots(prediction.intent, cleaned, lexicon)
+            result["tier"] = TIER_CLASSIFIER
+
+    if not is_resolved(result["intent"], result["slots"]):
+        llm_result = _parse(normalize_command(text), lexicon)
+        llm_result["tier"] = TIER_LLM
+        llm_result["confidence"] = result["confidence"]
+
+        # Keep the rules / classifier parse if the model did not do any better
+        if llm_result["intent"] != Intent.UNKNOWN or result["intent"] == Intent.UNKNOWN:
+            result = llm_result
+        else:
+            result["tier"] = TIER_LLM
+
+    result["text"] = text
+    _tiers.inc(result["tier"])
+    logger.info(f"🧭 Routed via {result['tier']}: '{text}' → '{result['normalized']}'")
+
+    return result
+
+
+def route_commands(text: str, lexicon: Optional[CategoryLexicon] = None, prefetch: bool = True) -> List[Dict]:
+    """
+    Route a possibly compound utterance ("spent 40 on tea and 300 on fuel")
+    as one result per command, in utterance order. Single commands take
+    the exact `route_command` path.
+
+    The normalizer cache entries of the commands that may need flan-t5
+    are fetched in one round-trip first; pass `prefetch=False` when the
+    caller already did (see `dialog.route_turn_async`).
+    """
+    commands = split_commands(text)
+    if len(commands) <= 1:
+        return [route_command(text, lexicon)]
+
+    if prefetch:
+        prefetch_commands(llm_candidates(commands, lexicon))
+
+    results = []
+    previous_intent = None
+
+    for command in commands:
+        result = route_command(command, lexicon, previous_intent)
+        if result["intent"] != Intent.UNKNOWN:
+            previous_intent = result["intent"]
+        results.append(result)
+
+    logger.info(f"🧩 Split into {len(results)} commands: '{text}'")
+    return results
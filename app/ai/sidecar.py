@@ -0,0 +1,249 @@
+# app/ai/sidecar.py
+"""
+Optional inference sidecar.
+
+One model-server process owns Whisper and flan-t5 and serves
+transcription and normalization over a local Unix socket, so API
+workers do not each hold their own copy of the weights.
+
+    python -m app.ai.sidecar                     # start the server
+    INFERENCE_MODE=sidecar uvicorn app.main:app  # workers become clients
+
+Protocol: one JSON object per line in each direction.
+    → {"op": "normalize", "texts": ["paid 40 for tea"]}
+    ← {"ok": true, "result": ["add expense 40 tea"]}
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import socket
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("ai-sidecar")
+
+# inprocess: models live in each worker (default)
+# sidecar:   workers call the model server over SIDECAR_SOCKET
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "inprocess")
+SIDECAR_SOCKET = os.getenv("SIDECAR_SOCKET", "/tmp/voxfin-inference.sock")
+SIDECAR_TIMEOUT = float(os.getenv("SIDECAR_TIMEOUT", "60"))
+
+# Max in-flight calls per operation inside the sidecar
+SIDECAR_CONCURRENCY = {
+    "normalize": int(os.getenv("SIDECAR_NORMALIZE_CONCURRENCY", "16")),
+    "transcribe": int(os.getenv("SIDECAR_TRANSCRIBE_CONCURRENCY", "1")),
+}
+
+Handlers = Dict[str, Callable[..., Any]]
+
+
+class SidecarError(RuntimeError):
+    pass
+
+
+def is_sidecar_mode() -> bool:
+    return INFERENCE_MODE == "sidecar"
+
+
+# -----------------------------
+# Handlers (run inside the model owner)
+# -----------------------------
+def default_handlers() -> Handlers:
+    from app.ai import parser, warmup
+    from app.voice import stt
+
+    def normalize(texts: List[str]) -> List[str]:
+        # Single texts go through the shared batcher so calls from many
+        # workers are batched together
+        if len(texts) == 1 and parser.MAX_BATCH_SIZE > 1:
+            return [parser._get_batcher().submit(texts[0])]
+        return parser._normalize_batch(texts)
+
+    return {
+        "normalize": normalize,
+        "transcribe": lambda path: stt._transcribe_local(path),
+        "ready": lambda: warmup.get_readiness(local=True),
+    }
+
+
+# -----------------------------
+# Clients
+# -----------------------------
+class InProcessClient:
+    """
+    Calls handlers directly in the current process.
+    """
+
+    def __init__(self, handlers: Optional[Handlers] = None):
+        self._handlers = handlers
+
+    @property
+    def handlers(self) -> Handlers:
+        if self._handlers is None:
+            self._handlers = default_handlers()
+        return self._handlers
+
+    def call(self, op: str, **payload) -> Any:
+        if op not in self.handlers:
+            raise SidecarError(f"Unknown operation '{op}'")
+        return self.handlers[op](**payload)
+
+    def normalize(self, texts: List[str]) -> List[str]:
+        return self.call("normalize", texts=texts)
+
+    def transcribe(self, path: str) -> str:
+        return self.call("transcribe", path=path)
+
+
+class SidecarClient(InProcessClient):
+    """
+    Thin client for the model server. One short-lived connection per call.
+    """
+
+    def __init__(self, socket_path: str = SIDECAR_SOCKET, timeout: float = SIDECAR_TIMEOUT):
+        super().__init__()
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def call(self, op: str, **payload) -> Any:
+        request = json.dumps({"op": op, **payload}).encode("utf-8") + b"\n"
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(request)
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+
+        if not line:
+            raise SidecarError("Sidecar closed the connection")
+
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise SidecarError(response.get("error", "Sidecar call failed"))
+        return response["result"]
+
+    def transcribe(self, path: str) -> str:
+        # The sidecar runs on the same host, so it can read the file
+        return self.call("transcribe", path=os.path.abspath(path))
+
+
+@lru_cache(maxsize=1)
+def get_inference_client() -> InProcessClient:
+    if is_sidecar_mode():
+        return SidecarClient()
+    return InProcessClient()
+
+
+# -----------------------------
+# Server
+# -----------------------------
+class InferenceServer:
+    def __init__(
+        self,
+        handlers: Handlers,
+        socket_path: str = SIDECAR_SOCKET,
+        concurrency: Optional[Dict[str, int]] = None,
+    ):
+        self.handlers = handlers
+        self.socket_path = socket_path
+        limits = {**SIDECAR_CONCURRENCY, **(concurrency or {})}
+        self._limits = {op: limits.get(op, 4) for op in handlers}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._started = threading.Event()
+
+    async def _dispatch(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            op = request.pop("op")
+            handler = self.handlers[op]
+        except Exception:
+            return {"ok": False, "error": "Invalid request"}
+
+        try:
+            async with self._semaphores[op]:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(handler, **request)
+                )
+        except Exception as e:
+            logger.exception(f"❌ Sidecar '{op}' failed")
+            return {"ok": False, "error": str(e)}
+
+        return {"ok": True, "result": result}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._dispatch(line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        self._semaphores = {op: asyncio.Semaphore(n) for op, n in self._limits.items()}
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        server = await asyncio.start_unix_server(
+            self._handle, path=self.socket_path, limit=2 ** 20
+        )
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"🧩 Inference sidecar listening on {self.socket_path}")
+        self._started.set()
+
+        async with server:
+            await server.serve_forever()
+
+    # Background helpers (embedding / tests)
+    def start_background(self, timeout: float = 5.0) -> None:
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._task = self._loop.create_task(self.serve_forever())
+            try:
+                self._loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+
+        threading.Thread(target=run, name="inference-sidecar", daemon=True).start()
+        if not self._started.wait(timeout):
+            raise SidecarError("Sidecar did not start")
+
+    def stop(self) -> None:
+        if self._loop and self._task:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="VoxFin inference sidecar")
+    parser.add_argument("--socket", default=SIDECAR_SOCKET)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from app.ai.warmup import warm_up_models
+
+    # The sidecar always owns the models, whatever INFERENCE_MODE says
+    threading.Thread(target=warm_up_models, kwargs={"local": True}, daemon=True).start()
+    asyncio.run(InferenceServer(default_handlers(), args.socket).serve_forever())
+
+
+if __name__ == "__main__":
+    main()
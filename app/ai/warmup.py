@@ -0,0 +1,120 @@
+# app/ai/warmup.py
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+logger = logging.getLogger("ai-warmup")
+
+# Set MODEL_WARMUP=0 to keep lazy loading (readiness then ignores models)
+WARMUP_ENABLED = os.getenv("MODEL_WARMUP", "1") == "1"
+
+WARMUP_TEXT = "check balance"
+
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+_status: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def _set_status(name: str, **fields) -> None:
+    with _lock:
+        _status.setdefault(name, {"state": STATE_PENDING}).update(fields)
+
+
+# -----------------------------
+# Per-model warm-up
+# -----------------------------
+def _load_normalizer():
+    from app.ai import parser
+
+    return parser._get_backend().load()
+
+
+def _warm_normalizer(_backend) -> None:
+    from app.ai import parser
+
+    # Exercise every decoding level once so beam search is warm too
+    for num_beams in parser.DECODING_LADDER:
+        parser._generate_commands([WARMUP_TEXT], num_beams=num_beams)
+
+
+def _load_whisper():
+    from app.voice import stt
+
+    return stt._load_model()
+
+
+def _warm_whisper(model) -> None:
+    import numpy as np
+
+    # One second of silence at 16 kHz
+    model.transcribe(np.zeros(16000, dtype=np.float32), language="en", fp16=False)
+
+
+MODELS: Dict[str, tuple[Callable, Callable]] = {
+    "normalizer": (_load_normalizer, _warm_normalizer),
+    "whisper": (_load_whisper, _warm_whisper),
+}
+
+
+def warm_up_model(name: str) -> None:
+    load, warm = MODELS[name]
+    _set_status(name, state=STATE_LOADING, error=None)
+
+    try:
+        start = time.perf_counter()
+        model = load()
+        loaded = time.perf_counter()
+        warm(model)
+        warmed = time.perf_counter()
+    except Exception as e:
+        logger.exception(f"❌ Warm-up failed for {name}")
+        _set_status(name, state=STATE_FAILED, error=str(e))
+        return
+
+    _set_status(
+        name,
+        state=STATE_READY,
+        load_ms=round((loaded - start) * 1000.0, 1),
+        warmup_ms=round((warmed - loaded) * 1000.0, 1),
+    )
+    logger.info(f"🔥 {name} ready (load {loaded - start:.1f}s, warm-up {warmed - loaded:.2f}s)")
+
+
+def warm_up_models(local: bool = False) -> None:
+    """
+    Load and warm every model. Blocking — run it in a background thread.
+    In sidecar mode the models live in the sidecar, so workers skip this.
+    """
+    from app.ai.sidecar import is_sidecar_mode
+
+    if is_sidecar_mode() and not local:
+        return
+
+    for name in MODELS:
+        warm_up_model(name)
+
+
+# -----------------------------
+# Readiness
+# -----------------------------
+def get_readiness(local: bool = False) -> Dict:
+    from app.ai.sidecar import get_inference_client, is_sidecar_mode
+
+    if is_sidecar_mode() and not local:
+        try:
+            return get_inference_client().call("ready")
+        except Exception as e:
+            return {"ready": False, "warmup_enabled": WARMUP_ENABLED, "error": f"Sidecar unavailable: {e}"}
+
+    with _lock:
+        models = {name: dict(_status.get(name, {"state": STATE_PENDING})) for name in MODELS}
+
+    ready = not WARMUP_ENABLED or all(m["state"] == STATE_READY for m in models.values())
+    return {"ready": ready, "warmup_enabled": WARMUP_ENABLED, "models": models}
@@ -0,0 +1,298 @@
+# app/ai/weights.py
+"""
+Memory-mapped model weights.
+
+Both models can be pre-converted once into a local safetensors cache:
+
+    python -m app.ai.weights convert
+    python -m app.ai.weights report      # startup time + RSS, before/after
+
+When the cache exists, loaders map the safetensors files into memory and
+hand the mapped tensors straight to the model (`load_state_dict(assign=True)`)
+instead of copying them into private heap memory. Cold starts then mostly
+hit the page cache, and the read-only weight pages are shared between all
+worker processes on the host.
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+from typing import Dict
+
+logger = logging.getLogger("ai-weights")
+
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "models/cache")
+
+WEIGHTS_FILE = "model.safetensors"
+WHISPER_DIMS_FILE = "dims.json"
+
+# Tied to the shared embedding: save_pretrained stores them once and
+# tie_weights() restores them, so only these may be missing from a cache
+TIED_KEYS = ("lm_head.weight", "encoder.embed_tokens.weight", "decoder.embed_tokens.weight")
+
+
+# -----------------------------
+# Cache layout
+# -----------------------------
+def normalizer_cache_dir(model_name: str) -> str:
+    return os.path.join(MODEL_CACHE_DIR, model_name.replace("/", "--"))
+
+
+def whisper_cache_dir(model_name: str) -> str:
+    return os.path.join(MODEL_CACHE_DIR, f"whisper-{model_name}")
+
+
+def has_normalizer_cache(model_name: str) -> bool:
+    return os.path.exists(os.path.join(normalizer_cache_dir(model_name), WEIGHTS_FILE))
+
+
+def has_whisper_cache(model_name: str) -> bool:
+    return os.path.exists(os.path.join(whisper_cache_dir(model_name), WEIGHTS_FILE))
+
+
+# -----------------------------
+# Zero-copy safetensors reader
+# -----------------------------
+def load_safetensors_mmap(path: str) -> Dict:
+    """
+    Map a safetensors file and return tensors that view the mapping.
+
+    The mapping is copy-on-write: pages stay shared with the page cache
+    (and other processes) unless a tensor is written to.
+    """
+    import torch
+
+    dtypes = {
+        "F64": torch.float64, "F32": torch.float32, "F16": torch.float16,
+        "BF16": torch.bfloat16, "I64": torch.int64, "I32": torch.int32,
+        "I16": torch.int16, "I8": torch.int8, "U8": torch.uint8, "BOOL": torch.bool,
+    }
+
+    with open(path, "rb") as f:
+        header_len = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_len))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    base = 8 + header_len
+    tensors = {}
+
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+
+        dtype = dtypes[info["dtype"]]
+        start, end = info["data_offsets"]
+        count = (end - start) // torch.empty((), dtype=dtype).element_size()
+
+        if count == 0:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+
+        tensors[name] = torch.frombuffer(
+            mapped, dtype=dtype, count=count, offset=base + start
+        ).view(info["shape"])
+
+    return tensors
+
+
+def _check_keys(result, path: str, tied=()) -> None:
+    """
+    Fail on a `load_state_dict` result with missing (other than `tied`) or
+    unexpected keys, instead of serving a partly random model.
+    """
+    missing = [key for key in result.missing_keys if key not in tied]
+    if missing or result.unexpected_keys:
+        raise RuntimeError(
+            f"Weights in {path} do not match the model: "
+            f"missing {missing}, unexpected {list(result.unexpected_keys)}"
+        )
+
+
+def _skip_init():
+    # Parameters are replaced by mapped tensors right away, so skip the
+    # (slow, memory-touching) random initialisation
+    try:
+        from transformers.modeling_utils import no_init_weights
+        return no_init_weights()
+    except ImportError:
+        return nullcontext()
+
+
+# -----------------------------
+# Loaders
+# -----------------------------
+def load_normalizer_mmap(model_name: str):
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM, AutoTokenizer
+
+    cache_dir = normalizer_cache_dir(model_name)
+    config = AutoConfig.from_pretrained(cache_dir)
+
+    with _skip_init():
+        model = AutoModelForSeq2SeqLM.from_config(config)
+
+    path = os.path.join(cache_dir, WEIGHTS_FILE)
+    state = load_safetensors_mmap(path)
+    # Tied embeddings are stored once; tie_weights() restores the others
+    _check_keys(model.load_state_dict(state, strict=False, assign=True), path, TIED_KEYS)
+    model.tie_weights()
+    model.eval()
+
+    tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+    return tokenizer, model
+
+
+def load_whisper_mmap(model_name: str):
+    from whisper import _ALIGNMENT_HEADS
+    from whisper.model import ModelDimensions, Whisper
+
+    cache_dir = whisper_cache_dir(model_name)
+    with open(os.path.join(cache_dir, WHISPER_DIMS_FILE)) as f:
+        dims = ModelDimensions(**json.load(f))
+
+    with _skip_init():
+        model = Whisper(dims)
+
+    path = os.path.join(cache_dir, WEIGHTS_FILE)
+    state = load_safetensors_mmap(path)
+    _check_keys(model.load_state_dict(state, strict=False, assign=True), path)
+
+    # Not part of the state dict; whisper.load_model sets them the same
+    # way (word timestamps need them)
+    if model_name in _ALIGNMENT_HEADS:
+        model.set_alignment_heads(_ALIGNMENT_HEADS[model_name])
+    model.eval()
+    return model
+
+
+# -----------------------------
+# Conversion
+# -----------------------------
+def convert_normalizer(model_name: str) -> str:
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    cache_dir = normalizer_cache_dir(model_name)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    AutoModelForSeq2SeqLM.from_pretrained(model_name).save_pretrained(
+        cache_dir, safe_serialization=True
+    )
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(cache_dir)
+    return cache_dir
+
+
+def convert_whisper(model_name: str) -> str:
+    import whisper
+    from safetensors.torch import save_file
+
+    cache_dir = whisper_cache_dir(model_name)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    model = whisper.load_model(model_name, device="cpu")
+    state = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    save_file(state, os.path.join(cache_dir, WEIGHTS_FILE))
+
+    with open(os.path.join(cache_dir, WHISPER_DIMS_FILE), "w") as f:
+        json.dump(vars(model.dims), f)
+    return cache_dir
+
+
+# -----------------------------
+# Startup / RSS report
+# -----------------------------
+def _memory() -> Dict[str, float]:
+    """
+    Resident memory of this process in MB, split into private (anon)
+    and file-backed (shareable) pages.
+    """
+    fields = {"VmRSS": "rss_mb", "RssAnon": "rss_anon_mb", "RssFile": "rss_file_mb"}
+    usage = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    usage[fields[key]] = round(int(value.split()[0]) / 1024.0, 1)
+    except OSError:
+        pass
+    return usage
+
+
+def _measure(model: str, mode: str) -> Dict:
+    from app.ai.parser import MODEL_NAME
+    from app.voice.stt import WHISPER_MODEL
+
+    start = time.perf_counter()
+
+    if model == "normalizer":
+        if mode == "mmap":
+            load_normalizer_mmap(MODEL_NAME)
+        else:
+            from transformers import AutoModelForSeq2SeqLM
+            AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+    else:
+        if mode == "mmap":
+            load_whisper_mmap(WHISPER_MODEL)
+        else:
+            import whisper
+            whisper.load_model(WHISPER_MODEL, device="cpu")
+
+    return {
+        "model": model,
+        "mode": mode,
+        "load_s": round(time.perf_counter() - start, 2),
+        **_memory(),
+    }
+
+
+def report() -> None:
+    print(f"{'model':<12}{'mode':<12}{'load_s':>8}{'rss_mb':>10}{'anon_mb':>10}{'file_mb':>10}")
+
+    for model in ("normalizer", "whisper"):
+        for mode in ("pretrained", "mmap"):
+            # Fresh interpreter per measurement so RSS is not shared
+            out = subprocess.run(
+                [sys.executable, "-m", "app.ai.weights", "measure", model, mode],
+                capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                print(f"{model:<12}{mode:<12} failed: {out.stderr.strip().splitlines()[-1:]}")
+                continue
+
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{model:<12}{mode:<12}{r['load_s']:>8}{r.get('rss_mb', '-'):>10}"
+                f"{r.get('rss_anon_mb', '-'):>10}{r.get('rss_file_mb', '-'):>10}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory-mapped model weight cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("convert", help="write both models to MODEL_CACHE_DIR as safetensors")
+    sub.add_parser("report", help="compare startup time and RSS with and without mmap")
+    measure = sub.add_parser("measure")
+    measure.add_argument("model", choices=["normalizer", "whisper"])
+    measure.add_argument("mode", choices=["pretrained", "mmap"])
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        from app.ai.parser import MODEL_NAME
+        from app.voice.stt import WHISPER_MODEL
+
+        print(f"✅ flan-t5 → {convert_normalizer(MODEL_NAME)}")
+        print(f"✅ whisper → {convert_whisper(WHISPER_MODEL)}")
+    elif args.command == "report":
+        report()
+    else:
+        print(json.dumps(_measure(args.model, args.mode)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from app.api.routes.health import router as health_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.transactions import router as transactions_router
 from app.api.routes.voice import router as voice_router
 
 all_routers = [
     health_router,
+    metrics_router,
+    transactions_router,
     voice_router,
 ]
@@ -1,7 +1,19 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.ai.warmup import get_readiness
 
 router = APIRouter()
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    readiness = get_readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content=readiness,
+    )
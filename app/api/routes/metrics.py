@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+
+from app.utils.metrics import snapshot_all
+
+router = APIRouter()
+
+@router.get("/metrics")
+def metrics():
+    return snapshot_all()
@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from supabase import Client
+from datetime import datetime
+from typing import Iterator, Literal, Optional
+import csv
+import io
+import itertools
+import json
+import logging
+
+from app.api.deps import get_db
+from app.db.models import Transaction
+from app.services.transactions import get_transaction_page, iter_transactions
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = ["id", "user_id", "category", "amount", "description", "created_at"]
+EXPORT_PAGE_SIZE = 500
+
+
+def _row(transaction: Transaction) -> dict:
+    return transaction.model_dump(mode="json", include=set(EXPORT_FIELDS))
+
+
+def _ndjson(transactions: Iterator[Transaction]) -> Iterator[str]:
+    for transaction in transactions:
+        yield json.dumps(_row(transaction), ensure_ascii=False) + "\n"
+
+
+def _csv(transactions: Iterator[Transaction]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+
+    writer.writeheader()
+    for transaction in transactions:
+        writer.writerow(_row(transaction))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/transactions")
+def list_transactions(
+    user_id: int = Query(1),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    category: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None, description="inclusive"),
+    end: Optional[datetime] = Query(None, description="exclusive"),
+    format: Literal["json", "ndjson", "csv"] = Query("json"),
+    db: Client = Depends(get_db)
+):
+    """
+    Transaction history, newest first.
+
+    `json` returns one page and a `next_cursor` to pass back for the next
+    one. `ndjson` and `csv` stream the rest of the filtered history (from
+    `cursor`, if given), fetching pages lazily as the response is written.
+    """
+
+    # The first page is fetched up front, so a bad cursor or a database
+    # error is still a proper HTTP error rather than a broken stream
+    try:
+        page = get_transaction_page(
+            supabase=db,
+            user_id=user_id,
+            limit=limit if format == "json" else EXPORT_PAGE_SIZE,
+            cursor=cursor,
+            category=category,
+            start=start,
+            end=end
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing transactions: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error listing transactions: {str(e)}")
+
+    if format != "json":
+        rest = iter_transactions(
+            supabase=db,
+            user_id=user_id,
+            category=category,
+            start=start,
+            end=end,
+            page_size=EXPORT_PAGE_SIZE,
+            cursor=page.next_cursor
+        ) if page.next_cursor else iter(())
+        transactions = itertools.chain(page.items, rest)
+        body = _ndjson(transactions) if format == "ndjson" else _csv(transactions)
+        media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+        )
+
+    return {
+        "items": [_row(t) for t in page.items],
+        "next_cursor": page.next_cursor,
+    }
@@ -4,6 +4,8 @@ from pydantic import BaseModel
 from typing import Optional
 import logging
 
+from app.ai.dialog import continue_turn, remember_turn
+from app.ai.router import extract_slots
 from app.api.deps import get_db
 from app.intent.detector import detect_intent, Intent
 from app.intent.slots import (
@@ -11,9 +13,11 @@ from app.intent.slots import (
     extract_reminder_slots,
     extract_transaction_slots
 )
-from app.services.budgets import set_budget, get_budget, get_all_budgets
+from app.intent.lexicon import get_user_lexicon, invalidate_user_lexicon
+from app.services.balance import get_balance_snapshot
+from app.services.budgets import set_budget
 from app.services.reminders import create_reminder
-from app.services.transactions import add_transaction, get_transactions, get_total_spent
+from app.services.transactions import add_transaction
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -44,17 +48,34 @@ def handle_voice(
     user_id = request.user_id
     
     try:
-        intent = detect_intent(text)
+        lexicon = get_user_lexicon(db, user_id)
+
+        # A follow-up ("500", "for food") completes the pending command
+        turn = continue_turn(text, user_id, lexicon)
+        if turn is None:
+            intent = detect_intent(text)
+            turn = {"intent": intent, "slots": extract_slots(intent, text.lower(), lexicon)}
+            remember_turn(user_id, turn)
+
+        intent, slots = turn["intent"], turn["slots"]
         logger.info(f"Detected intent: {intent.value} for user {user_id}")
 
+        if turn.get("missing"):
+            return VoiceResponse(
+                message=f"Please tell me the {' and '.join(turn['missing'])}",
+                intent=intent.value,
+                success=False,
+                data={"missing": turn["missing"], "slots": slots}
+            )
+
         if intent == Intent.UPDATE_BUDGET:
-            return handle_update_budget(db, user_id, text, intent)
+            return handle_update_budget(db, user_id, text, intent, slots)
         
         elif intent == Intent.ADD_EXPENSE:
-            return handle_add_expense(db, user_id, text, intent)
+            return handle_add_expense(db, user_id, text, intent, slots)
         
         elif intent == Intent.CREATE_REMINDER:
-            return handle_create_reminder(db, user_id, text, intent)
+            return handle_create_reminder(db, user_id, text, intent, slots)
         
         elif intent == Intent.CHECK_BALANCE:
             return handle_check_balance(db, user_id, intent)
@@ -79,10 +100,11 @@ def handle_update_budget(
     db: Client,
     user_id: int,
     text: str,
-    intent: Intent
+    intent: Intent,
+    slots: Optional[dict] = None
 ) -> VoiceResponse:
     """Handle budget update intent."""
-    slots = extract_budget_slots(text)
+    slots = slots or extract_budget_slots(text, get_user_lexicon(db, user_id))
     
     if not slots.get("category") or not slots.get("limit"):
         return VoiceResponse(
@@ -98,6 +120,8 @@ def handle_update_budget(
             category=slots["category"],
             limit=slots["limit"]
         )
+        # A new category must be recognised in the user's next command
+        invalidate_user_lexicon(user_id)
         
         logger.info(f"Budget updated: {budget.category} - ${budget.limit}")
         
@@ -121,10 +145,11 @@ def handle_add_expense(
     db: Client,
     user_id: int,
     text: str,
-    intent: Intent
+    intent: Intent,
+    slots: Optional[dict] = None
 ) -> VoiceResponse:
     """Handle expense addition intent."""
-    slots = extract_transaction_slots(text)
+    slots = slots or extract_transaction_slots(text, get_user_lexicon(db, user_id))
     
     amount = slots.get("amount")
     category = slots.get("category")
@@ -147,16 +172,16 @@ def handle_add_expense(
         
         logger.info(f"Transaction added: {transaction.category} - ${transaction.amount}")
         
-        # Check for budget warnings
-        budget = get_budget(supabase=db, user_id=user_id, category=category)
+        # Check for budget warnings (totals come back with the insert)
+        budget_limit = transaction.budget_limit
         budget_warning = None
         
-        if budget:
-            total_spent = get_total_spent(supabase=db, user_id=user_id, category=category)
-            if total_spent >= budget.limit:
-                budget_warning = f"Warning: You've exceeded your {category} budget of ${budget.limit}!"
-            elif total_spent >= budget.limit * 0.8:
-                remaining = budget.limit - total_spent
+        if budget_limit is not None:
+            total_spent = transaction.category_total
+            if total_spent >= budget_limit:
+                budget_warning = f"Warning: You've exceeded your {category} budget of ${budget_limit}!"
+            elif total_spent >= budget_limit * 0.8:
+                remaining = budget_limit - total_spent
                 budget_warning = f"Note: You have ${remaining:.2f} remaining in your {category} budget"
         
         message = f"Expense of ${transaction.amount} added to {transaction.category}"
@@ -185,10 +210,11 @@ def handle_create_reminder(
     db: Client,
     user_id: int,
     text: str,
-    intent: Intent
+    intent: Intent,
+    slots: Optional[dict] = None
 ) -> VoiceResponse:
     """Handle reminder creation intent."""
-    slots = extract_reminder_slots(text)
+    slots = slots or extract_reminder_slots(text)
     
     if not slots.get("name") or not slots.get("day"):
         return VoiceResponse(
@@ -232,17 +258,16 @@ def handle_check_balance(
 ) -> VoiceResponse:
     """Handle balance check intent."""
     try:
-        budgets = get_all_budgets(supabase=db, user_id=user_id)
-        transactions = get_transactions(supabase=db, user_id=user_id, limit=100)
+        snapshot = get_balance_snapshot(supabase=db, user_id=user_id)
         
-        if not budgets:
+        if not snapshot.budgets:
             return VoiceResponse(
                 message="You don't have any budgets set up yet.",
                 intent=intent.value,
                 success=True,
                 data={
                     "balances": [],
-                    "total_transactions": len(transactions)
+                    "total_transactions": snapshot.transaction_count
                 }
             )
         
@@ -251,9 +276,9 @@ def handle_check_balance(
         total_budget = 0
         total_spent = 0
         
-        for budget in budgets:
-            spent = get_total_spent(supabase=db, user_id=user_id, category=budget.category)
-            remaining = budget.limit - spent
+        for budget in snapshot.budgets:
+            spent = budget.spent
+            remaining = budget.remaining
             percentage_used = (spent / budget.limit * 100) if budget.limit > 0 else 0
             
             balance_info.append({
@@ -271,7 +296,7 @@ def handle_check_balance(
         # Sort by percentage used (highest first)
         balance_info.sort(key=lambda x: x["percentage_used"], reverse=True)
         
-        message = f"You have {len(budgets)} budget(s) set up with {len(transactions)} total transactions"
+        message = f"You have {len(snapshot.budgets)} budget(s) set up with {snapshot.transaction_count} total transactions"
         
         return VoiceResponse(
             message=message,
@@ -282,7 +307,7 @@ def handle_check_balance(
                 "total_budget": float(total_budget),
                 "total_spent": float(total_spent),
                 "total_remaining": float(total_budget - total_spent),
-                "total_transactions": len(transactions)
+                "total_transactions": snapshot.transaction_count
             }
         )
     
@@ -1,5 +1,6 @@
 from supabase import Client
 from datetime import datetime
+from typing import List, Tuple
 from app.db.models import AuditLog
 
 
@@ -21,3 +22,30 @@ def log_action(supabase: Client, user_id: int, action: str, details: str):
         import logging
         logger = logging.getLogger("audit")
         logger.error(f"Failed to write audit log: {str(e)}")
+
+
+def log_actions(supabase: Client, user_id: int, entries: List[Tuple[str, str]]):
+    """
+    Writes several audit log entries in one insert.
+    """
+    if not entries:
+        return
+
+    try:
+        timestamp = datetime.utcnow().isoformat()
+        rows = [
+            {
+                "user_id": user_id,
+                "action": action,
+                "details": details,
+                "timestamp": timestamp
+            }
+            for action, details in entries
+        ]
+
+        supabase.table("audit_logs").insert(rows).execute()
+    except Exception as e:
+        # Log error but don't fail the main operation
+        import logging
+        logger = logging.getLogger("audit")
+        logger.error(f"Failed to write audit logs: {str(e)}")
@@ -2,12 +2,24 @@ from .redis_client import redis_client
 from .state_store import (
     get_state,
     save_state,
+    merge_state,
     clear_state,
+    get_state_async,
+    get_states_async,
+    save_state_async,
+    merge_state_async,
+    clear_state_async,
 )
 
 __all__ = [
     "redis_client",
     "get_state",
     "save_state",
+    "merge_state",
     "clear_state",
+    "get_state_async",
+    "get_states_async",
+    "save_state_async",
+    "merge_state_async",
+    "clear_state_async",
 ]
@@ -0,0 +1,122 @@
+"""
+asyncio Redis client for async endpoints.
+
+The client shares one bounded connection pool per worker. It is created in
+the app lifespan (`init_async_redis`) and closed on shutdown. Scripts and
+sync code keep using `redis_client`.
+
+The helpers below batch many keys into a single round-trip (MGET, or one
+pipeline), so a request stage costs at most one network hop.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+import redis.asyncio as aioredis
+
+from app.cache.redis_client import REDIS_URL
+
+logger = logging.getLogger("redis-async")
+
+POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "32"))
+# Seconds a request waits for a free connection before failing
+POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+SOCKET_TIMEOUT = 5
+
+_client: Optional[aioredis.Redis] = None
+
+
+# -----------------------------
+# Pool lifecycle
+# -----------------------------
+def init_async_redis() -> aioredis.Redis:
+    """
+    Create the pooled client (once per process). Connections are opened
+    lazily, so this does not need Redis to be up.
+    """
+    global _client
+    if _client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=POOL_SIZE,
+            timeout=POOL_TIMEOUT,
+            decode_responses=True,
+            socket_timeout=SOCKET_TIMEOUT,
+            socket_connect_timeout=SOCKET_TIMEOUT,
+        )
+        _client = aioredis.Redis(connection_pool=pool)
+        logger.info(f"✅ Async Redis pool ready (max {POOL_SIZE} connections)")
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    if _client is None:
+        raise RuntimeError("Async Redis pool is not initialized")
+    return _client
+
+
+async def close_async_redis() -> None:
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose(close_connection_pool=True)
+
+
+# -----------------------------
+# Multi-key helpers
+# -----------------------------
+async def mget(keys: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Values for many keys in one MGET (None where a key is missing).
+    """
+    if not keys:
+        return {}
+    values = await get_async_redis().mget(keys)
+    return dict(zip(keys, values))
+
+
+async def mset(mapping: Dict[str, str], ttl: Optional[int] = None) -> None:
+    """
+    Set many keys (each with `ttl` seconds, if given) in one pipeline.
+    """
+    if not mapping:
+        return
+
+    pipe = get_async_redis().pipeline(transaction=False)
+    for key, value in mapping.items():
+        pipe.set(key, value, ex=ttl)
+    await pipe.execute()
+
+
+async def incr_many(counts: Dict[str, int], ttl: Optional[int] = None) -> Dict[str, int]:
+    """
+    INCRBY several counters in one pipeline and return their new values.
+    With `ttl`, each counter expires `ttl` seconds after its last update.
+    """
+    if not counts:
+        return {}
+
+    pipe = get_async_redis().pipeline(transaction=False)
+    for key, amount in counts.items():
+        pipe.incrby(key, amount)
+        if ttl:
+            pipe.expire(key, ttl)
+    results = await pipe.execute()
+
+    step = 2 if ttl else 1
+    return dict(zip(counts, results[::step]))
+
+
+async def hgetall_many(keys: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """
+    HGETALL several hashes in one pipeline.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+
+    pipe = get_async_redis().pipeline(transaction=False)
+    for key in keys:
+        pipe.hgetall(key)
+    return dict(zip(keys, await pipe.execute()))
@@ -0,0 +1,202 @@
+import logging
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, Hashable, Optional
+
+from app.utils.lru import LRUCache
+from app.utils.metrics import counter_group
+
+logger = logging.getLogger("near-cache")
+
+# Returned by NearCache.get on a miss (None is a valid cached value)
+MISSING = object()
+
+# Listener reconnect backoff (seconds), doubling up to the maximum
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+
+
+def _approx_size(value: Any) -> int:
+    """
+    Rough deep size in bytes of a small JSON-like value.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approx_size(v) for v in value)
+    return size
+
+
+class NearCache:
+    """
+    In-process LRU in front of Redis-backed data, kept coherent across
+    workers by pub/sub: every local write or delete publishes
+    "<origin>:<key>" on `channel`, and other workers evict that key.
+
+    If the subscription cannot be established the cache disables itself,
+    since it would no longer hear about other workers' writes. If it drops
+    later, the cache serves nothing while the listener reconnects with
+    backoff, and starts over empty once it is back.
+    """
+
+    def __init__(self, redis, channel: str, name: str, maxsize: int, ttl: float):
+        self.redis = redis
+        self.channel = channel
+        self.name = name
+        self.origin = uuid.uuid4().hex
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.stats = counter_group(name)
+        self.enabled = True
+        self.connected = False
+        self._listener = None
+        self._backoff = RECONNECT_MIN_DELAY
+        self._lock = threading.Lock()
+        # Bumped on every remote invalidation; a read that raced with one
+        # is not cached (see `set`)
+        self._generation = 0
+
+    # -----------------------------
+    # Invalidation
+    # -----------------------------
+    def _on_message(self, message: Dict) -> None:
+        origin, _, key = str(message.get("data", "")).partition(":")
+        if origin and origin != self.origin:
+            self._generation += 1
+            self.local.delete(key)
+            self.stats.inc("remote_invalidation")
+
+    def _ensure_listener(self) -> bool:
+        if self._listener is not None or not self.enabled:
+            return self.enabled
+
+        with self._lock:
+            if self._listener is None and self.enabled:
+                try:
+                    pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(**{self.channel: self._on_message})
+                    self._listener = pubsub.run_in_thread(
+                        sleep_time=1.0,
+                        daemon=True,
+                        exception_handler=self._on_listener_error,
+                    )
+                    self.connected = True
+                    logger.info(f"✅ {self.name} listening on {self.channel}")
+                except Exception as e:
+                    logger.warning(f"⚠️ {self.name} disabled, cannot subscribe to {self.channel}: {e}")
+                    self.enabled = False
+        return self.enabled
+
+    def _on_listener_error(self, error: BaseException, pubsub, thread) -> None:
+        """
+        `run_in_thread` exception handler: the subscription dropped, so
+        invalidations may have been missed. Stop serving local copies,
+        wait (backing off), then reconnect, which resubscribes; after that
+        the local tier is cleared and served again. A failed attempt
+        returns, and the listener loop lands here again.
+        """
+        if self.connected:
+            self.connected = False
+            self.stats.inc("listener_error")
+            logger.warning(f"⚠️ {self.name} lost {self.channel}, reconnecting: {error}")
+
+        time.sleep(self._backoff)
+        self._backoff = min(self._backoff * 2, RECONNECT_MAX_DELAY)
+
+        try:
+            pubsub.connection.connect()
+        except Exception as e:
+            logger.debug(f"{self.name} reconnect failed: {e}")
+            return
+
+        # Reads that started before this point may be stale: don't cache them
+        self._generation += 1
+        self.local.clear()
+        self._backoff = RECONNECT_MIN_DELAY
+        self.connected = True
+        self.stats.inc("reconnect")
+        logger.info(f"✅ {self.name} listening on {self.channel} again")
+
+    def message(self, key: Hashable) -> str:
+        """
+        Invalidation payload for `key`, for callers that publish it in the
+        same round-trip as their write (pipeline or script).
+        """
+        return f"{self.origin}:{key}"
+
+    def _publish(self, key: Hashable) -> None:
+        try:
+            self.redis.publish(self.channel, self.message(key))
+        except Exception as e:
+            # Other workers may serve a stale copy until it expires
+            logger.warning(f"⚠️ {self.name} invalidation publish failed: {e}")
+            self.stats.inc("publish_error")
+
+    # -----------------------------
+    # Cache API
+    # -----------------------------
+    def get(self, key: Hashable) -> Any:
+        """
+        Cached value, or MISSING on a miss, when the cache is disabled or
+        while its listener is reconnecting.
+        """
+        if not self._ensure_listener() or not self.connected:
+            return MISSING
+
+        value = self.local.get(str(key), MISSING)
+        if value is MISSING:
+            self.stats.inc("miss")
+            return MISSING
+
+        self.stats.inc("hit")
+        return value
+
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: int, ttl: Optional[float] = None) -> None:
+        """
+        Cache a value read from Redis. `generation` is `generation()` taken
+        before the read; if an invalidation arrived since, the value may
+        be stale and is not cached.
+        """
+        if self.enabled and self.connected and generation == self._generation:
+            self.local.set(str(key), value, ttl=ttl)
+
+    def written(
+        self,
+        key: Hashable,
+        value: Any = MISSING,
+        ttl: Optional[float] = None,
+        publish: bool = True,
+    ) -> None:
+        """
+        Record a local write (or delete, when no value is given) and tell
+        other workers to drop their copy. Pass `publish=False` when the
+        caller already sent `message(key)` along with the write.
+        """
+        if self.enabled:
+            if value is MISSING:
+                self.local.delete(str(key))
+            else:
+                self.local.set(str(key), value, ttl=ttl)
+        # Publish even when disabled here: other workers may be caching
+        if publish:
+            self._publish(key)
+
+    def report(self) -> Dict:
+        counts = self.stats.snapshot()
+        hits, misses = counts.get("hit", 0), counts.get("miss", 0)
+        entries = self.local.items()
+
+        return {
+            "enabled": self.enabled,
+            "connected": self.connected,
+            "size": len(entries),
+            "maxsize": self.local.maxsize,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+            "approx_bytes": sum(_approx_size(k) + _approx_size(v) for k, v in entries),
+        }
+
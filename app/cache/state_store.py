@@ -1,22 +1,289 @@
 import json
-from typing import Dict, Optional
+import os
+from typing import Dict, Iterable, List, Optional
+from app.cache.near_cache import MISSING, NearCache
 from app.cache.redis_client import redis_client
+from app.utils.metrics import register_gauge
 
 STATE_TTL = 300  # 5 minutes
 
+# In-process near-cache in front of get_state. Writes from any worker are
+# broadcast on INVALIDATION_CHANNEL so other workers drop their copy; set
+# STATE_NEAR_CACHE=0 (on every worker) for strict read-through to Redis.
+NEAR_CACHE_ENABLED = os.getenv("STATE_NEAR_CACHE", "1") == "1"
+NEAR_CACHE_SIZE = int(os.getenv("STATE_NEAR_CACHE_SIZE", "10000"))
+INVALIDATION_CHANNEL = "state:invalidate"
 
+# Conversation state is a hash per user:
+#   intent       → Intent value
+#   slot:<name>  → JSON-encoded slot value
+SLOT_PREFIX = "slot:"
+
+# Field updates, the TTL refresh (or, once the required slots are all
+# set, the delete) and the invalidation broadcast happen in one
+# server-side step, so concurrent turns never overwrite each other's
+# slots. A state that expired (or lost its intent) is not recreated from
+# the follow-up's slots alone: the script returns nil and writes nothing.
+#   KEYS[1] = state key, ARGV[1] = ttl, ARGV[2] = channel,
+#   ARGV[3] = invalidation message ("" to skip), ARGV[4] = n,
+#   ARGV[5..4+n] = required fields, then field, value, ...
+_MERGE_LUA = """
+if redis.call('HEXISTS', KEYS[1], 'intent') == 0 then
+    return nil
+end
+local required = tonumber(ARGV[4])
+for i = 5 + required, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+local fields = redis.call('HGETALL', KEYS[1])
+local complete = required > 0
+for i = 5, 4 + required do
+    if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 0 then
+        complete = false
+    end
+end
+if complete then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+if ARGV[3] ~= '' then
+    redis.call('PUBLISH', ARGV[2], ARGV[3])
+end
+return fields
+"""
+_MERGE_SCRIPT = redis_client.register_script(_MERGE_LUA)
+_async_merge_script = None
+
+
+_near = (
+    NearCache(redis_client, INVALIDATION_CHANNEL, "state_near_cache", NEAR_CACHE_SIZE, STATE_TTL)
+    if NEAR_CACHE_ENABLED
+    else None
+)
+if _near is not None:
+    register_gauge("state_near_cache", _near.report)
+
+
+def _key(user_id: int) -> str:
+    return f"state:{user_id}"
+
+
+def _fields(intent: Optional[str], slots: Dict) -> Dict[str, str]:
+    fields = {}
+    if intent:
+        fields["intent"] = intent
+    for name, value in slots.items():
+        if value is not None:
+            fields[f"{SLOT_PREFIX}{name}"] = json.dumps(value)
+    return fields
+
+
+def _decode(fields: Dict[str, str]) -> Optional[Dict]:
+    if not fields:
+        return None
+
+    return {
+        "intent": fields.get("intent"),
+        "slots": {
+            name[len(SLOT_PREFIX):]: json.loads(value)
+            for name, value in fields.items()
+            if name.startswith(SLOT_PREFIX)
+        },
+    }
+
+
+def _copy(state: Optional[Dict]) -> Optional[Dict]:
+    # Callers get their own dict, never the near-cached one
+    return {"intent": state["intent"], "slots": dict(state["slots"])} if state else None
+
+
+# -----------------------------
+# Commands shared by the sync and async APIs
+# -----------------------------
+# Writes queue their invalidation broadcast in the same pipeline (or
+# script), so each costs a single round-trip.
+def _queue_read(pipe, user_id: int):
+    pipe.hgetall(_key(user_id))
+    pipe.pttl(_key(user_id))
+
+
+def _cache_read(user_id: int, fields: Dict, pttl: int, generation: int) -> Optional[Dict]:
+    # The local copy expires when the Redis key does; "no state" is cached too
+    state = _decode(fields)
+    if _near is not None:
+        ttl = pttl / 1000.0 if pttl and pttl > 0 else STATE_TTL
+        _near.set(user_id, _copy(state), generation, ttl=ttl)
+    return state
+
+
+def _queue_save(pipe, user_id: int, state: Dict) -> Dict[str, str]:
+    key = _key(user_id)
+    fields = _fields(state.get("intent"), state.get("slots", {}))
+
+    pipe.delete(key)
+    if fields:
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, STATE_TTL)
+    if _near is not None:
+        pipe.publish(INVALIDATION_CHANNEL, _near.message(user_id))
+    return fields
+
+
+def _queue_clear(pipe, user_id: int):
+    pipe.delete(_key(user_id))
+    if _near is not None:
+        pipe.publish(INVALIDATION_CHANNEL, _near.message(user_id))
+
+
+def _merge_args(user_id: int, slots: Dict, intent: Optional[str], required: Iterable[str]) -> List:
+    message = _near.message(user_id) if _near is not None else ""
+    required = [f"{SLOT_PREFIX}{name}" for name in required]
+    args = [STATE_TTL, INVALIDATION_CHANNEL, message, len(required), *required]
+    for field, value in _fields(intent, slots).items():
+        args.extend((field, value))
+    return args
+
+
+def _merged(user_id: int, flat: Optional[List], required: Iterable[str]) -> Optional[Dict]:
+    state = _decode(dict(zip(flat[::2], flat[1::2]))) if flat else None
+    complete = state is not None and bool(required) and all(name in state["slots"] for name in required)
+    _written(user_id, None if complete else state)
+    return state
+
+
+def _cached(user_id: int):
+    return _near.get(user_id) if _near is not None else MISSING
+
+
+def _generation() -> int:
+    return _near.generation() if _near is not None else 0
+
+
+def _written(user_id: int, state: Optional[Dict]):
+    if _near is not None:
+        _near.written(user_id, _copy(state), ttl=STATE_TTL, publish=False)
+
+
+# -----------------------------
+# Sync API
+# -----------------------------
 def get_state(user_id: int) -> Optional[Dict]:
-    data = redis_client.get(f"state:{user_id}")
-    return json.loads(data) if data else None
+    cached = _cached(user_id)
+    if cached is not MISSING:
+        return _copy(cached)
+
+    generation = _generation()
+    pipe = redis_client.pipeline(transaction=False)
+    _queue_read(pipe, user_id)
+    fields, pttl = pipe.execute()
+    return _cache_read(user_id, fields, pttl, generation)
 
 
 def save_state(user_id: int, state: Dict):
-    redis_client.setex(
-        f"state:{user_id}",
-        STATE_TTL,
-        json.dumps(state)
+    """
+    Replace the user's state (new intent, fresh slots).
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    fields = _queue_save(pipe, user_id, state)
+    pipe.execute()
+
+    _written(user_id, _decode(fields))
+
+
+def merge_state(
+    user_id: int,
+    slots: Dict,
+    intent: Optional[str] = None,
+    required: Iterable[str] = (),
+) -> Optional[Dict]:
+    """
+    Atomically merge non-empty slots (and optionally the intent) into the
+    user's pending state, refresh its TTL and return the merged state.
+    Once every slot in `required` is set the state is complete and is
+    deleted in the same step. Returns None, writing nothing, when no
+    state is pending any more.
+    """
+    required = tuple(required)
+    flat = _MERGE_SCRIPT(
+        keys=[_key(user_id)], args=_merge_args(user_id, slots, intent, required), client=redis_client
     )
+    return _merged(user_id, flat, required)
 
 
 def clear_state(user_id: int):
-    redis_client.delete(f"state:{user_id}")
+    pipe = redis_client.pipeline(transaction=True)
+    _queue_clear(pipe, user_id)
+    pipe.execute()
+
+    _written(user_id, None)
+
+
+# -----------------------------
+# Async API (pooled client from app.cache.async_client)
+# -----------------------------
+def _async_redis():
+    from app.cache.async_client import get_async_redis
+    return get_async_redis()
+
+
+async def get_state_async(user_id: int) -> Optional[Dict]:
+    return (await get_states_async([user_id]))[user_id]
+
+
+async def get_states_async(user_ids: Iterable[int]) -> Dict[int, Optional[Dict]]:
+    """
+    States for several users; near-cache misses are read in one pipeline.
+    """
+    states = {}
+    missing = []
+    for user_id in user_ids:
+        cached = _cached(user_id)
+        if cached is MISSING:
+            missing.append(user_id)
+        else:
+            states[user_id] = _copy(cached)
+
+    if missing:
+        generation = _generation()
+        pipe = _async_redis().pipeline(transaction=False)
+        for user_id in missing:
+            _queue_read(pipe, user_id)
+        replies = await pipe.execute()
+
+        for user_id, fields, pttl in zip(missing, replies[::2], replies[1::2]):
+            states[user_id] = _cache_read(user_id, fields, pttl, generation)
+
+    return states
+
+
+async def save_state_async(user_id: int, state: Dict):
+    pipe = _async_redis().pipeline(transaction=True)
+    fields = _queue_save(pipe, user_id, state)
+    await pipe.execute()
+
+    _written(user_id, _decode(fields))
+
+
+async def merge_state_async(
+    user_id: int,
+    slots: Dict,
+    intent: Optional[str] = None,
+    required: Iterable[str] = (),
+) -> Optional[Dict]:
+    global _async_merge_script
+    required = tuple(required)
+    client = _async_redis()
+    if _async_merge_script is None or _async_merge_script.registered_client is not client:
+        _async_merge_script = client.register_script(_MERGE_LUA)
+
+    flat = await _async_merge_script(keys=[_key(user_id)], args=_merge_args(user_id, slots, intent, required))
+    return _merged(user_id, flat, required)
+
+
+async def clear_state_async(user_id: int):
+    pipe = _async_redis().pipeline(transaction=True)
+    _queue_clear(pipe, user_id)
+    await pipe.execute()
+
+    _written(user_id, None)
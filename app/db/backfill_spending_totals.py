@@ -0,0 +1,46 @@
+# app/db/backfill_spending_totals.py
+"""
+Recompute spending_totals from the transactions table.
+
+The transactions trigger keeps the running totals current; run this after
+bulk loads that bypassed it (e.g. COPY with triggers disabled) or to repair
+drift:
+
+    python -m app.db.backfill_spending_totals
+    python -m app.db.backfill_spending_totals --user-id 42
+"""
+
+import argparse
+import sys
+from typing import Optional
+
+from supabase import Client
+
+
+def backfill_spending_totals(supabase: Client, user_id: Optional[int] = None) -> int:
+    """
+    Rebuild the totals for one user (everyone when None) and return the
+    number of rows written.
+    """
+    try:
+        response = supabase.rpc("rebuild_spending_totals", {"p_user_id": user_id}).execute()
+        return int(response.data or 0)
+    except Exception as e:
+        raise RuntimeError(f"Failed to backfill spending totals: {str(e)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild spending_totals from transactions")
+    parser.add_argument("--user-id", type=int, help="only rebuild this user's totals")
+    args = parser.parse_args()
+
+    from app.db.session import get_supabase
+
+    rows = backfill_spending_totals(get_supabase(), args.user_id)
+    scope = f"user {args.user_id}" if args.user_id is not None else "all users"
+    print(f"✅ Rebuilt {rows} spending_totals rows for {scope}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# app/db/explain.py
+"""
+Print EXPLAIN plans for the queries the services run, to check that they
+use the indexes from the migrations. Point DATABASE_URL at a local
+Postgres migrated to head (the same variable Alembic uses):
+
+    python -m app.db.explain
+    python -m app.db.explain --user-id 1 --category food --analyze
+    python -m app.db.explain --only transactions_by_category
+
+The SQL mirrors what PostgREST generates for each supabase-py call, plus
+the statements inside the RPC functions.
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+# name → (service call, SQL)
+QUERIES: Dict[str, Tuple[str, str]] = {
+    "budget": (
+        "budgets.get_budget",
+        'SELECT * FROM budgets WHERE user_id = :user_id AND category = :category',
+    ),
+    "budgets": (
+        "budgets.get_all_budgets",
+        "SELECT * FROM budgets WHERE user_id = :user_id",
+    ),
+    "transactions_recent": (
+        "transactions.get_transactions",
+        "SELECT * FROM transactions WHERE user_id = :user_id "
+        "ORDER BY created_at DESC LIMIT 50",
+    ),
+    "transactions_by_category": (
+        "transactions history for one category",
+        "SELECT * FROM transactions WHERE user_id = :user_id AND category = :category "
+        "ORDER BY created_at DESC, id DESC LIMIT 50",
+    ),
+    "transactions_page": (
+        "transactions.get_transaction_page (keyset, after a cursor)",
+        "SELECT id, user_id, category, amount, description, created_at FROM transactions "
+        "WHERE user_id = :user_id AND created_at IS NOT NULL "
+        "AND (created_at < now() OR (created_at = now() AND id < 2147483647)) "
+        "ORDER BY created_at DESC, id DESC LIMIT 51",
+    ),
+    "category_total": (
+        "rebuild_spending_totals (per-category sum)",
+        "SELECT SUM(amount), COUNT(*) FROM transactions "
+        "WHERE user_id = :user_id AND category = :category",
+    ),
+    "spending_summary": (
+        "transactions.get_spending_summary (spending_summary)",
+        "SELECT category, total, count FROM spending_totals "
+        "WHERE user_id = :user_id AND period = 'all'",
+    ),
+    "budget_limit": (
+        "transactions.add_transaction (record_expense budget lookup)",
+        'SELECT "limit" FROM budgets WHERE user_id = :user_id AND category = :category '
+        "ORDER BY id LIMIT 1",
+    ),
+    "reminders": (
+        "reminders.get_reminders",
+        "SELECT * FROM reminders WHERE user_id = :user_id",
+    ),
+    "reminder_count": (
+        "balance.get_balance_snapshot (balance_snapshot)",
+        "SELECT COUNT(*) FROM reminders WHERE user_id = :user_id",
+    ),
+    "audit_recent": (
+        "audit history",
+        "SELECT * FROM audit_logs WHERE user_id = :user_id "
+        'ORDER BY "timestamp" DESC LIMIT 50',
+    ),
+}
+
+
+def explain(conn, sql: str, params: Dict, analyze: bool = False) -> List[str]:
+    from sqlalchemy import text
+
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    rows = conn.execute(text(f"EXPLAIN ({options}) {sql}"), params)
+    return [row[0] for row in rows]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN the service queries against a local Postgres")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--category", default="food")
+    parser.add_argument("--analyze", action="store_true", help="run the queries (EXPLAIN ANALYZE, BUFFERS)")
+    parser.add_argument("--only", nargs="+", choices=sorted(QUERIES), help="only these queries")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("❌ DATABASE_URL not found in environment")
+        return 1
+
+    from sqlalchemy import create_engine
+
+    params = {"user_id": args.user_id, "category": args.category}
+    engine = create_engine(database_url)
+
+    with engine.connect() as conn:
+        for name in args.only or QUERIES:
+            service, sql = QUERIES[name]
+            print(f"\n=== {name} ({service})")
+            print(sql)
+            for line in explain(conn, sql, params, args.analyze):
+                print(f"  {line}")
+            # EXPLAIN ANALYZE executes the statement; never keep its effects
+            conn.rollback()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""add record_expense function
+
+Revision ID: 12bbd8f7445b
+Revises: 40121bf4d3cb
+Create Date: 2026-10-16 13:41:17.550392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '12bbd8f7445b'
+down_revision: Union[str, None] = '40121bf4d3cb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Called through Supabase RPC: supabase.rpc("record_expense", {...}).
+# Inserts the transaction and its audit row in one database transaction
+# and returns
+#   {"transaction": {...row...}, "total": 1250.0, "limit": 1000.0,
+#    "warning": "exceeded" | "approaching" | null}
+#
+# The spending_totals trigger upserts the ('all') row for the category,
+# which holds its lock until commit. Concurrent expenses in a category
+# therefore apply one after another, and each sees the total including
+# the others, so none of them can miss the warning. The thresholds match
+# _warning_status in app/services/transactions.py.
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION record_expense(
+        p_user_id integer,
+        p_category text,
+        p_amount double precision,
+        p_description text DEFAULT NULL,
+        p_created_at timestamptz DEFAULT now()
+    )
+    RETURNS jsonb
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        txn transactions;
+        new_total double precision;
+        budget_limit double precision;
+    BEGIN
+        IF p_amount IS NULL OR p_amount <= 0 THEN
+            RAISE EXCEPTION 'Transaction amount must be positive';
+        END IF;
+
+        INSERT INTO transactions (user_id, category, amount, description, created_at)
+        VALUES (p_user_id, p_category, p_amount, p_description, p_created_at)
+        RETURNING * INTO txn;
+
+        INSERT INTO audit_logs (user_id, action, details, timestamp)
+        VALUES (p_user_id, 'ADD_TRANSACTION', format('%s → %s', p_category, p_amount), now());
+
+        SELECT total INTO new_total
+        FROM spending_totals
+        WHERE user_id = p_user_id AND category = p_category AND period = 'all';
+
+        SELECT b."limit" INTO budget_limit
+        FROM budgets b
+        WHERE b.user_id = p_user_id AND b.category = p_category
+        ORDER BY b.id
+        LIMIT 1;
+
+        RETURN jsonb_build_object(
+            'transaction', to_jsonb(txn),
+            'total', COALESCE(new_total, p_amount),
+            'limit', budget_limit,
+            'warning', CASE
+                WHEN budget_limit IS NULL THEN NULL
+                WHEN COALESCE(new_total, p_amount) > budget_limit THEN 'exceeded'
+                WHEN COALESCE(new_total, p_amount) > budget_limit * 0.9 THEN 'approaching'
+            END
+        );
+    END
+    $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP FUNCTION IF EXISTS record_expense(integer, text, double precision, text, timestamptz)"
+    )
@@ -0,0 +1,74 @@
+"""add record_expenses function
+
+Revision ID: 3c5e8a1d9f27
+Revises: ed128c1fc352
+Create Date: 2026-10-16 23:48:05.214630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e8a1d9f27'
+down_revision: Union[str, None] = 'ed128c1fc352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Batch variant of record_expense, called through Supabase RPC:
+#   supabase.rpc("record_expenses", {"p_user_id": 1, "p_items": [
+#       {"category": "food", "amount": 40, "description": "..."}, ...]})
+# Records the items in order in one database transaction and returns a
+# jsonb array with one record_expense result per item, so each warning
+# includes the earlier items of the batch.
+#
+# The existing ('all') totals rows of the batch's categories are locked
+# in category order first, so two batches for the same user cannot
+# deadlock on them.
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION record_expenses(
+        p_user_id integer,
+        p_items jsonb,
+        p_created_at timestamptz DEFAULT now()
+    )
+    RETURNS jsonb
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        item jsonb;
+        results jsonb := '[]'::jsonb;
+    BEGIN
+        PERFORM 1
+        FROM spending_totals
+        WHERE user_id = p_user_id
+          AND period = 'all'
+          AND category IN (SELECT value->>'category' FROM jsonb_array_elements(p_items))
+        ORDER BY category
+        FOR UPDATE;
+
+        FOR item IN
+            SELECT e.value
+            FROM jsonb_array_elements(p_items) WITH ORDINALITY AS e(value, position)
+            ORDER BY e.position
+        LOOP
+            results := results || jsonb_build_array(record_expense(
+                p_user_id,
+                item->>'category',
+                (item->>'amount')::double precision,
+                item->>'description',
+                p_created_at
+            ));
+        END LOOP;
+
+        RETURN results;
+    END
+    $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS record_expenses(integer, jsonb, timestamptz)")
@@ -0,0 +1,248 @@
+"""add spending_totals running totals
+
+Revision ID: 40121bf4d3cb
+Revises: b0c0d6981e5a
+Create Date: 2026-10-16 12:20:08.903311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '40121bf4d3cb'
+down_revision: Union[str, None] = 'b0c0d6981e5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# spending_totals holds one row per (user_id, category, period), where
+# period is 'all' (all-time, what budgets compare against) or a 'YYYY-MM'
+# month. A row trigger on transactions keeps it current in the same
+# database transaction as every insert, update and delete, so
+# spending_summary and balance_snapshot read a few rows instead of
+# scanning history.
+#
+# rebuild_spending_totals(p_user_id) recomputes the rows from the
+# transactions table (everyone when NULL); see
+# `python -m app.db.backfill_spending_totals`.
+
+_APPLY_DELTA = """
+CREATE OR REPLACE FUNCTION apply_spending_delta(
+    p_user_id integer,
+    p_category text,
+    p_created_at timestamptz,
+    p_amount double precision,
+    p_count integer
+)
+RETURNS void
+LANGUAGE sql
+AS $$
+    INSERT INTO spending_totals AS st (user_id, category, period, total, count, updated_at)
+    VALUES
+        (p_user_id, p_category, 'all', p_amount, p_count, now()),
+        (p_user_id, p_category, to_char(COALESCE(p_created_at, now()) AT TIME ZONE 'UTC', 'YYYY-MM'),
+         p_amount, p_count, now())
+    ON CONFLICT (user_id, category, period) DO UPDATE
+    SET total = st.total + EXCLUDED.total,
+        count = st.count + EXCLUDED.count,
+        updated_at = now()
+$$;
+"""
+
+_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION transactions_spending_totals()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_spending_delta(OLD.user_id, OLD.category, OLD.created_at, -OLD.amount, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_spending_delta(NEW.user_id, NEW.category, NEW.created_at, NEW.amount, 1);
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+_REBUILD = """
+CREATE OR REPLACE FUNCTION rebuild_spending_totals(p_user_id integer DEFAULT NULL)
+RETURNS bigint
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    rebuilt bigint;
+BEGIN
+    -- Block concurrent writes so no delta lands between delete and insert
+    LOCK TABLE transactions IN SHARE MODE;
+
+    DELETE FROM spending_totals WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+    INSERT INTO spending_totals (user_id, category, period, total, count, updated_at)
+    SELECT user_id, category, period, SUM(amount), COUNT(*), now()
+    FROM transactions,
+         LATERAL (VALUES
+             ('all'),
+             (to_char(COALESCE(created_at, now()) AT TIME ZONE 'UTC', 'YYYY-MM'))
+         ) AS periods(period)
+    WHERE p_user_id IS NULL OR user_id = p_user_id
+    GROUP BY user_id, category, period;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END
+$$;
+"""
+
+_SPENDING_SUMMARY = """
+CREATE OR REPLACE FUNCTION spending_summary(
+    p_user_id integer,
+    p_categories text[] DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'total', COALESCE(SUM(total), 0),
+        'count', COALESCE(SUM(count), 0)::bigint,
+        'by_category', COALESCE(jsonb_object_agg(category, total) FILTER (WHERE count > 0), '{}'::jsonb)
+    )
+    FROM spending_totals
+    WHERE user_id = p_user_id
+      AND period = 'all'
+      AND (p_categories IS NULL OR category = ANY(p_categories))
+$$;
+"""
+
+_BALANCE_SNAPSHOT = """
+CREATE OR REPLACE FUNCTION balance_snapshot(p_user_id integer)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH spent AS (
+        SELECT category, total, count AS n
+        FROM spending_totals
+        WHERE user_id = p_user_id AND period = 'all' AND count > 0
+    )
+    SELECT jsonb_build_object(
+        'budgets', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', b.id,
+                'category', b.category,
+                'limit', b."limit",
+                'spent', COALESCE(s.total, 0),
+                'remaining', b."limit" - COALESCE(s.total, 0)
+            ) ORDER BY b.id)
+            FROM budgets b
+            LEFT JOIN spent s ON s.category = b.category
+            WHERE b.user_id = p_user_id
+        ), '[]'::jsonb),
+        'total_spent', (SELECT COALESCE(SUM(total), 0) FROM spent),
+        'transaction_count', (SELECT COALESCE(SUM(n), 0)::bigint FROM spent),
+        'by_category', (SELECT COALESCE(jsonb_object_agg(category, total), '{}'::jsonb) FROM spent),
+        'reminder_count', (SELECT COUNT(*) FROM reminders WHERE user_id = p_user_id)
+    )
+$$;
+"""
+
+# Definitions from b0c0d6981e5a / f0942abfd60e, restored on downgrade
+_SPENDING_SUMMARY_FROM_TRANSACTIONS = """
+CREATE OR REPLACE FUNCTION spending_summary(
+    p_user_id integer,
+    p_categories text[] DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH per_category AS (
+        SELECT category, SUM(amount) AS total, COUNT(*) AS n
+        FROM transactions
+        WHERE user_id = p_user_id
+          AND (p_categories IS NULL OR category = ANY(p_categories))
+        GROUP BY category
+    )
+    SELECT jsonb_build_object(
+        'total', COALESCE(SUM(total), 0),
+        'count', COALESCE(SUM(n), 0)::bigint,
+        'by_category', COALESCE(jsonb_object_agg(category, total), '{}'::jsonb)
+    )
+    FROM per_category
+$$;
+"""
+
+_BALANCE_SNAPSHOT_FROM_TRANSACTIONS = """
+CREATE OR REPLACE FUNCTION balance_snapshot(p_user_id integer)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH spent AS (
+        SELECT category, SUM(amount) AS total, COUNT(*) AS n
+        FROM transactions
+        WHERE user_id = p_user_id
+        GROUP BY category
+    )
+    SELECT jsonb_build_object(
+        'budgets', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', b.id,
+                'category', b.category,
+                'limit', b."limit",
+                'spent', COALESCE(s.total, 0),
+                'remaining', b."limit" - COALESCE(s.total, 0)
+            ) ORDER BY b.id)
+            FROM budgets b
+            LEFT JOIN spent s ON s.category = b.category
+            WHERE b.user_id = p_user_id
+        ), '[]'::jsonb),
+        'total_spent', (SELECT COALESCE(SUM(total), 0) FROM spent),
+        'transaction_count', (SELECT COALESCE(SUM(n), 0)::bigint FROM spent),
+        'by_category', (SELECT COALESCE(jsonb_object_agg(category, total), '{}'::jsonb) FROM spent),
+        'reminder_count', (SELECT COUNT(*) FROM reminders WHERE user_id = p_user_id)
+    )
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.create_table('spending_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('total', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'category', 'period')
+    )
+
+    op.execute(_APPLY_DELTA)
+    op.execute(_TRIGGER_FUNCTION)
+    op.execute(_REBUILD)
+    op.execute("""
+    CREATE TRIGGER transactions_spending_totals
+    AFTER INSERT OR UPDATE OF user_id, category, amount, created_at OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_spending_totals()
+    """)
+
+    # Backfill existing history, then read totals from the new table
+    op.execute("SELECT rebuild_spending_totals(NULL)")
+    op.execute(_SPENDING_SUMMARY)
+    op.execute(_BALANCE_SNAPSHOT)
+
+
+def downgrade() -> None:
+    op.execute(_SPENDING_SUMMARY_FROM_TRANSACTIONS)
+    op.execute(_BALANCE_SNAPSHOT_FROM_TRANSACTIONS)
+    op.execute("DROP TRIGGER IF EXISTS transactions_spending_totals ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS transactions_spending_totals()")
+    op.execute("DROP FUNCTION IF EXISTS rebuild_spending_totals(integer)")
+    op.execute("DROP FUNCTION IF EXISTS apply_spending_delta(integer, text, timestamptz, double precision, integer)")
+    op.drop_table('spending_totals')
@@ -0,0 +1,61 @@
+"""add balance_snapshot function
+
+Revision ID: b0c0d6981e5a
+Revises: f0942abfd60e
+Create Date: 2026-10-16 11:03:54.217630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0c0d6981e5a'
+down_revision: Union[str, None] = 'f0942abfd60e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Called through Supabase RPC: supabase.rpc("balance_snapshot", {...}).
+# Everything a balance check shows, in one round-trip:
+#   {"budgets": [{"id", "category", "limit", "spent", "remaining"}, ...],
+#    "total_spent", "transaction_count", "by_category", "reminder_count"}
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION balance_snapshot(p_user_id integer)
+    RETURNS jsonb
+    LANGUAGE sql
+    STABLE
+    AS $$
+        WITH spent AS (
+            SELECT category, SUM(amount) AS total, COUNT(*) AS n
+            FROM transactions
+            WHERE user_id = p_user_id
+            GROUP BY category
+        )
+        SELECT jsonb_build_object(
+            'budgets', COALESCE((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'id', b.id,
+                    'category', b.category,
+                    'limit', b."limit",
+                    'spent', COALESCE(s.total, 0),
+                    'remaining', b."limit" - COALESCE(s.total, 0)
+                ) ORDER BY b.id)
+                FROM budgets b
+                LEFT JOIN spent s ON s.category = b.category
+                WHERE b.user_id = p_user_id
+            ), '[]'::jsonb),
+            'total_spent', (SELECT COALESCE(SUM(total), 0) FROM spent),
+            'transaction_count', (SELECT COALESCE(SUM(n), 0)::bigint FROM spent),
+            'by_category', (SELECT COALESCE(jsonb_object_agg(category, total), '{}'::jsonb) FROM spent),
+            'reminder_count', (SELECT COUNT(*) FROM reminders WHERE user_id = p_user_id)
+        )
+    $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS balance_snapshot(integer)")
@@ -0,0 +1,35 @@
+"""unique budget per user and category
+
+Revision ID: bf9faef7d579
+Revises: 12bbd8f7445b
+Create Date: 2026-10-16 14:52:40.118264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bf9faef7d579'
+down_revision: Union[str, None] = '12bbd8f7445b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of each duplicate set: it is the one set_budget
+    # updated and budget warnings compared against
+    op.execute("""
+    DELETE FROM budgets b
+    USING budgets keep
+    WHERE b.user_id = keep.user_id
+      AND b.category = keep.category
+      AND b.id > keep.id
+    """)
+    op.create_unique_constraint('uq_budgets_user_category', 'budgets', ['user_id', 'category'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_budgets_user_category', 'budgets', type_='unique')
@@ -0,0 +1,69 @@
+"""add composite indexes for service queries
+
+Revision ID: ed128c1fc352
+Revises: bf9faef7d579
+Create Date: 2026-10-16 15:36:02.774915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ed128c1fc352'
+down_revision: Union[str, None] = 'bf9faef7d579'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Access paths (check with `python -m app.db.explain`):
+#   transactions  user_id [+ category] ordered by created_at, id; amount
+#                 is included so per-category sums are index-only scans
+#   reminders     user_id
+#   audit_logs    user_id ordered by timestamp
+# budgets (user_id, category) is already served by uq_budgets_user_category
+# and spending_totals by its primary key.
+#
+# Built CONCURRENTLY (outside the migration transaction) so writes are
+# not blocked on large tables.
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_user_category_created',
+            'transactions',
+            ['user_id', 'category', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_include=['amount'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_transactions_user_created',
+            'transactions',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_reminders_user_id',
+            'reminders',
+            ['user_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_audit_logs_user_timestamp',
+            'audit_logs',
+            ['user_id', sa.text('timestamp DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_audit_logs_user_timestamp', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_reminders_user_id', table_name='reminders', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_transactions_user_created', table_name='transactions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_transactions_user_category_created', table_name='transactions', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,53 @@
+"""add spending_summary function
+
+Revision ID: f0942abfd60e
+Revises: fa61fc6c8435
+Create Date: 2026-10-16 10:12:31.482107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0942abfd60e'
+down_revision: Union[str, None] = 'fa61fc6c8435'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Called through Supabase RPC: supabase.rpc("spending_summary", {...}).
+# Aggregates in one pass per category and returns
+#   {"total": 1234.5, "count": 17, "by_category": {"food": 800.0, ...}}
+# p_categories = NULL means every category.
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION spending_summary(
+        p_user_id integer,
+        p_categories text[] DEFAULT NULL
+    )
+    RETURNS jsonb
+    LANGUAGE sql
+    STABLE
+    AS $$
+        WITH per_category AS (
+            SELECT category, SUM(amount) AS total, COUNT(*) AS n
+            FROM transactions
+            WHERE user_id = p_user_id
+              AND (p_categories IS NULL OR category = ANY(p_categories))
+            GROUP BY category
+        )
+        SELECT jsonb_build_object(
+            'total', COALESCE(SUM(total), 0),
+            'count', COALESCE(SUM(n), 0)::bigint,
+            'by_category', COALESCE(jsonb_object_agg(category, total), '{}'::jsonb)
+        )
+        FROM per_category
+    $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS spending_summary(integer, text[])")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -25,11 +25,51 @@ class Transaction(BaseModel):
     amount: float
     description: Optional[str] = None
     created_at: Optional[datetime] = None
+    # Set by the service layer, not stored
+    budget_warning: Optional[str] = None
+    category_total: Optional[float] = None
+    budget_limit: Optional[float] = None
 
     class Config:
         from_attributes = True
 
 
+# -----------------------------
+# Transaction History Page
+# -----------------------------
+class TransactionPage(BaseModel):
+    items: List[Transaction] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+# -----------------------------
+# Spending Summary (spending_summary RPC)
+# -----------------------------
+class SpendingSummary(BaseModel):
+    total: float = 0.0
+    count: int = 0
+    by_category: Dict[str, float] = Field(default_factory=dict)
+
+
+# -----------------------------
+# Balance Snapshot (balance_snapshot RPC)
+# -----------------------------
+class BudgetBalance(BaseModel):
+    id: Optional[int] = None
+    category: str
+    limit: float
+    spent: float = 0.0
+    remaining: float
+
+
+class BalanceSnapshot(BaseModel):
+    budgets: List[BudgetBalance] = Field(default_factory=list)
+    total_spent: float = 0.0
+    transaction_count: int = 0
+    by_category: Dict[str, float] = Field(default_factory=dict)
+    reminder_count: int = 0
+
+
 # -----------------------------
 # Budget Model
 # -----------------------------
@@ -0,0 +1,184 @@
+# app/intent/amounts.py
+"""
+Amount normalizer: rewrites spoken and written amounts into plain numbers
+before slot extraction.
+
+    "two thousand five hundred"  → "2500"
+    "₹1,500" / "rs 1,50,000"     → "1500" / "150000"
+    "₹250.50 rupees"             → "250.5"
+    "2.5k" / "3 lakh"            → "2500" / "300000"
+    "12 hundred" / "2.5 thousand" → "1200" / "2500"
+    "two point five lakh"        → "250000"
+    "one fifty" / "twelve ninety nine" → "150" / "1299"
+
+Everything is driven by the tables below, compiled into two regexes at
+import. Text without digits, currency symbols or number words is
+returned untouched, and results are memoized.
+"""
+
+import re
+from functools import lru_cache
+
+# -----------------------------
+# Tables
+# -----------------------------
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19,
+}
+
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+
+HUNDRED = "hundred"
+
+# Multipliers accepted after number words and after digits
+MULTIPLIERS = {
+    "thousand": 1_000,
+    "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000,
+    "million": 1_000_000,
+    "crore": 10_000_000, "crores": 10_000_000,
+}
+
+# Multipliers only accepted right after digits ("12 hundred", "2.5k", "3 cr")
+DIGIT_MULTIPLIERS = {**MULTIPLIERS, HUNDRED: 100, "k": 1_000, "cr": 10_000_000}
+
+CURRENCY_PREFIXES = ("₹", "$", "rs.", "rs", "inr")
+CURRENCY_SUFFIXES = ("rupees", "rupee", "rs", "inr", "bucks", "/-")
+
+
+def _alternation(words) -> str:
+    # Longest first so "lakhs" wins over "lakh"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_NUMBER_WORDS = _alternation([*UNITS, *TENS, HUNDRED, *MULTIPLIERS])
+_SCALE_WORDS = _alternation([HUNDRED, *MULTIPLIERS])
+_GROUP_WORDS = _alternation([*UNITS, *TENS])
+
+# A run starts with a unit or tens word, or with a scale word that is
+# preceded by "a" or followed by more number words ("thousand two
+# hundred"), and continues through scale words, "and" and "point"
+_WORD_AMOUNT = re.compile(
+    rf"\b(?:a[\s-]+(?={_SCALE_WORDS})|(?={_GROUP_WORDS})"
+    rf"|(?=(?:{_SCALE_WORDS})[\s-]+(?:and[\s-]+)?(?:{_GROUP_WORDS})\b))"
+    rf"(?:{_NUMBER_WORDS})\b"
+    rf"(?:(?:[\s-]+(?:and[\s-]+)?)(?:{_NUMBER_WORDS}|point)\b)*"
+)
+
+_DIGIT_AMOUNT = re.compile(
+    rf"(?<![\w.])(?<!\d,)(?:(?:{_alternation(CURRENCY_PREFIXES)})\s*)?"
+    r"(\d{1,3}(?:,\d{3})+|\d{1,2}(?:,\d{2})+,\d{3}|\d+)(?!,\d)(\.\d+)?"
+    rf"(?:\s*({_alternation(DIGIT_MULTIPLIERS)})\b)?"
+    rf"(?:\s*(?:{_alternation(CURRENCY_SUFFIXES)})(?!\w))?"
+    r"(?!\w)"
+)
+
+_MAYBE_AMOUNT = re.compile(rf"[\d₹$]|\b(?:{_NUMBER_WORDS})\b")
+
+# Words that can start or extend an amount. Text made only of lowercase
+# ASCII words and bare integers, none of them in this set, is returned
+# unchanged by `normalize_amounts` (the parser's fast path relies on it).
+AMOUNT_WORDS = frozenset([
+    *UNITS, *TENS, HUNDRED, *DIGIT_MULTIPLIERS,
+    *(w for w in (*CURRENCY_PREFIXES, *CURRENCY_SUFFIXES) if w.isalpha()),
+])
+
+
+# -----------------------------
+# Conversion
+# -----------------------------
+def _format(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def words_to_number(words) -> float:
+    """
+    Value of a run of number words, e.g. ["two", "thousand", "five",
+    "hundred"] → 2500. "and" is ignored and "a" counts as one.
+
+    Groups below one hundred that do not combine are read as digits
+    side by side, the way prices are said: "one fifty" → 150, "twelve
+    ninety nine" → 1299.
+    """
+    total = 0.0
+    current = 0.0
+    group = None  # number below one hundred being said ("ninety nine")
+    place = None  # decimal place after "point"
+
+    for word in words:
+        if word == "and":
+            continue
+        value = UNITS.get(word, TENS.get(word))
+        if word == "a":
+            group = 1.0
+        elif word == "point":
+            place = 0.1
+        elif place is not None and UNITS.get(word, 10) < 10:
+            current += UNITS[word] * place
+            place /= 10
+        elif value is not None:
+            if group is None:
+                group = value
+            elif group in TENS.values() and 0 < value < 10:
+                group += value
+            else:
+                current = (current + group) * (10 if value < 10 else 100)
+                group = value
+        elif word == HUNDRED:
+            current = (current + (group or 0)) or 1.0
+            current *= 100
+            group = None
+        else:
+            total += ((current + (group or 0)) or 1.0) * MULTIPLIERS[word]
+            current = 0.0
+            group = None
+            place = None
+
+    return round(total + current + (group or 0), 2)
+
+
+def _replace_words(match: re.Match) -> str:
+    words = re.split(r"[\s-]+", match.group(0))
+    # A lone "one" is usually not an amount ("one coffee for 50")
+    if words == ["one"]:
+        return "one"
+
+    # A trailing "point" is not part of the number ("five point")
+    suffix = ""
+    if words[-1] == "point":
+        words.pop()
+        suffix = " point"
+    return _format(words_to_number(words)) + suffix
+
+
+def _replace_digits(match: re.Match) -> str:
+    integer, fraction, multiplier = match.groups()
+    if not (fraction or multiplier):
+        # Plain (possibly comma-grouped) integer: drop symbols and commas
+        return integer.replace(",", "")
+
+    value = float(integer.replace(",", "") + (fraction or ""))
+    if multiplier:
+        value *= DIGIT_MULTIPLIERS[multiplier]
+    return _format(round(value, 2))
+
+
+@lru_cache(maxsize=4096)
+def normalize_amounts(text: str) -> str:
+    """
+    Rewrite every amount in lowercase `text` as a plain number.
+    """
+    if not text or not _MAYBE_AMOUNT.search(text):
+        return text
+
+    # Digits first, so "3 lakh" is read as one amount
+    text = _DIGIT_AMOUNT.sub(_replace_digits, text)
+    return _WORD_AMOUNT.sub(_replace_words, text)
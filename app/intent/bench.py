@@ -0,0 +1,310 @@
+# app/intent/bench.py
+"""
+Micro-benchmarks: single-pass compiled parser vs the original
+keyword-chain implementation (kept below as `legacy_*`), lexicon
+scaling, and how much traffic the amount normalizer keeps off the LLM.
+
+    python -m app.intent.bench
+"""
+
+import random
+import re
+import string
+import timeit
+from typing import Dict, Optional
+from unittest import mock
+
+from app.intent import detector
+from app.intent.amounts import normalize_amounts
+from app.intent.detector import Intent, clear_parse_cache, detect_intent
+from app.intent.lexicon import CategoryLexicon
+from app.intent.slots import (
+    extract_budget_slots,
+    extract_reminder_slots,
+    extract_transaction_slots,
+)
+
+CORPUS = [
+    "i spent 250 on food",
+    "paid 40 for tea",
+    "spent 300 on fuel",
+    "set food budget to 6000",
+    "set my entertainment limit to 1500 please",
+    "remind me to pay electricity bill on 5",
+    "remind me to pay credit card bill weekly on 12",
+    "how much balance left",
+    "how much money left this month",
+    "add expense 120 shopping",
+    "hello how are you",
+    "my rent is 15000 and due on the 1st",
+]
+
+# Amounts as people say and type them
+AMOUNT_CORPUS = [
+    "spent two thousand five hundred on groceries",
+    "paid fifty for tea",
+    "i spent 1,500 on food",
+    "paid ₹250.50 for coffee",
+    "spent 2.5k on shopping",
+    "paid rs 300 for petrol",
+    "spent 500 rupees on uber",
+    "set food budget to six thousand",
+    "set travel budget to 3k",
+    "set rent budget to 1,20,000",
+    "set shopping limit to ₹5,000",
+    "paid twelve hundred for the doctor",
+    "spent a hundred and fifty on snacks",
+    "paid 99.99 for netflix",
+    "spent forty-five on milk",
+    "set entertainment budget to two point five thousand",
+    "paid 1.2 lakh rent",
+    "spent three hundred on books",
+    "paid $20 for spotify",
+    "spent 750/- on movie",
+]
+
+
+# -----------------------------
+# Legacy implementation
+# -----------------------------
+def legacy_detect_intent(text: str) -> Intent:
+    if not text:
+        return Intent.UNKNOWN
+
+    text = text.lower()
+
+    if "remind" in text or "reminder" in text:
+        return Intent.CREATE_REMINDER
+
+    if "budget" in text or "limit" in text:
+        return Intent.UPDATE_BUDGET
+
+    if "spent" in text or "expense" in text or "paid" in text:
+        return Intent.ADD_EXPENSE
+
+    if "balance" in text or "money left" in text:
+        return Intent.CHECK_BALANCE
+
+    return Intent.UNKNOWN
+
+
+def legacy_extract_budget_slots(text: str) -> Dict[str, Optional[float | str]]:
+    text = text.lower()
+
+    category = None
+    limit = None
+
+    if "food" in text:
+        category = "food"
+    elif "travel" in text:
+        category = "travel"
+    elif "shopping" in text:
+        category = "shopping"
+    elif "rent" in text:
+        category = "rent"
+    elif "entertainment" in text:
+        category = "entertainment"
+
+    match = re.search(r"\b(\d{1,7})\b", text)
+    if match:
+        limit = float(match.group(1))
+
+    return {"category": category, "limit": limit}
+
+
+def legacy_extract_transaction_slots(text: str) -> Dict[str, Optional[float | str]]:
+    text = text.lower()
+
+    category = None
+    amount = None
+
+    if "food" in text or "tea" in text:
+        category = "food"
+    elif "fuel" in text or "petrol" in text:
+        category = "travel"
+    elif "shopping" in text:
+        category = "shopping"
+    elif "rent" in text:
+        category = "rent"
+
+    match = re.search(r"\b(\d{1,7})\b", text)
+    if match:
+        amount = float(match.group(1))
+
+    return {"category": category, "amount": amount, "description": text}
+
+
+def legacy_extract_reminder_slots(text: str) -> Dict[str, Optional[str | int]]:
+    text = text.lower()
+
+    name = None
+    day = None
+    frequency = "monthly"
+
+    if "electricity" in text:
+        name = "electricity bill"
+    elif "credit card" in text:
+        name = "credit card bill"
+    elif "rent" in text:
+        name = "rent"
+    elif "internet" in text:
+        name = "internet bill"
+
+    match = re.search(r"\b(\d{1,2})\b", text)
+    if match:
+        day = int(match.group(1))
+
+    if "weekly" in text:
+        frequency = "weekly"
+
+    return {"name": name, "day": day, "frequency": frequency}
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+LEGACY_EXTRACTORS = {
+    Intent.UPDATE_BUDGET: legacy_extract_budget_slots,
+    Intent.ADD_EXPENSE: legacy_extract_transaction_slots,
+    Intent.CREATE_REMINDER: legacy_extract_reminder_slots,
+}
+
+EXTRACTORS = {
+    Intent.UPDATE_BUDGET: extract_budget_slots,
+    Intent.ADD_EXPENSE: extract_transaction_slots,
+    Intent.CREATE_REMINDER: extract_reminder_slots,
+}
+
+
+def _legacy_request(text: str):
+    intent = legacy_detect_intent(text)
+    extractor = LEGACY_EXTRACTORS.get(intent)
+    return intent, extractor(text) if extractor else {}
+
+
+def _compiled_request(text: str):
+    intent = detect_intent(text)
+    extractor = EXTRACTORS.get(intent)
+    return intent, extractor(text) if extractor else {}
+
+
+def _time(fn, number: int, before_pass=None) -> float:
+    """
+    µs per utterance, best of 5 runs. `before_pass` runs ahead of every
+    pass over the corpus.
+    """
+    def one_pass():
+        if before_pass is not None:
+            before_pass()
+        for text in CORPUS:
+            fn(text)
+
+    seconds = min(timeit.repeat(one_pass, number=number, repeat=5))
+    return seconds / (number * len(CORPUS)) * 1e6
+
+
+def run(number: int = 2000) -> Dict[str, float]:
+    # The corpus has no repeats: with the memo cleared before each pass,
+    # every utterance is parsed from scratch
+    results = {
+        "legacy": _time(_legacy_request, number),
+        "compiled": _time(_compiled_request, number, before_pass=clear_parse_cache),
+        "compiled_cached": _time(_compiled_request, number),
+    }
+
+    for name, us in results.items():
+        print(f"{name:<16} {us:8.2f} µs/utterance  ({results['legacy'] / us:.2f}x vs legacy)")
+
+    return results
+
+
+def run_scaling(sizes=(10, 100, 1000), number: int = 500) -> None:
+    """
+    Cost of category matching as the category table grows: one substring
+    check per category (legacy) vs one dict lookup per word (compiled).
+    """
+    rng = random.Random(0)
+    text = "i spent 250 on groceries at the market yesterday"
+    words = re.findall(r"[a-z]+", text)
+
+    for size in sizes:
+        keywords = [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+            for _ in range(size)
+        ]
+        table = {kw: kw for kw in keywords}
+
+        chain = timeit.timeit(lambda: [kw for kw in keywords if kw in text], number=number)
+        lookup = timeit.timeit(lambda: [table.get(w) for w in words], number=number)
+
+        print(
+            f"{size:>5} categories: substring chain {chain / number * 1e6:8.2f} µs, "
+            f"word lookup {lookup / number * 1e6:6.2f} µs"
+        )
+
+
+def run_lexicon_scaling(sizes=(100, 1000, 5000), number: int = 200) -> None:
+    """
+    Per-tenant lexicon cost: exact lookups and cold (unmemoized) fuzzy
+    lookups against lexicons of growing size.
+    """
+    rng = random.Random(0)
+
+    for size in sizes:
+        terms = [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+            for _ in range(size)
+        ]
+        lexicon = CategoryLexicon({term: [] for term in terms})
+        typos = [term[:2] + term[3:] for term in terms[:number]]
+
+        exact = timeit.timeit(lambda: [lexicon.exact(t) for t in terms[:number]], number=1)
+        fuzzy = timeit.timeit(lambda: [lexicon.fuzzy(t) for t in typos], number=1)
+
+        print(
+            f"{size:>5} categories: exact {exact / number * 1e6:6.2f} µs, "
+            f"fuzzy (cold) {fuzzy / number * 1e6:8.2f} µs"
+        )
+
+
+def run_amounts(number: int = 2000) -> Dict[str, int]:
+    """
+    LLM calls on AMOUNT_CORPUS with and without the amount normalizer,
+    plus its per-utterance cost.
+    """
+    from app.ai import router
+
+    def llm_calls() -> int:
+        calls = []
+
+        def fake_llm(text):
+            calls.append(text)
+            return text
+
+        clear_parse_cache()
+        with mock.patch.object(router, "normalize_command", fake_llm):
+            for text in AMOUNT_CORPUS:
+                router.route_command(text)
+        return len(calls)
+
+    with mock.patch.object(detector, "normalize_amounts", lambda text: text):
+        without = llm_calls()
+    with_normalizer = llm_calls()
+
+    cost = timeit.timeit(
+        lambda: [normalize_amounts.__wrapped__(text) for text in AMOUNT_CORPUS], number=number
+    ) / (number * len(AMOUNT_CORPUS)) * 1e6
+
+    total = len(AMOUNT_CORPUS)
+    print(f"LLM calls without amount normalizer: {without}/{total}")
+    print(f"LLM calls with amount normalizer:    {with_normalizer}/{total}")
+    print(f"amount normalizer: {cost:.2f} µs/utterance (uncached)")
+
+    return {"total": total, "llm_without": without, "llm_with": with_normalizer}
+
+
+if __name__ == "__main__":
+    run()
+    run_scaling()
+    run_lexicon_scaling()
+    run_amounts()
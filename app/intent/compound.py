@@ -0,0 +1,53 @@
+# app/intent/compound.py
+"""
+Split compound utterances into separate commands:
+
+    "spent 40 on tea and 300 on fuel and set travel budget to 5000"
+        → ["spent 40 on tea", "300 on fuel", "set travel budget to 5000"]
+
+A conjunction only splits when the text before it already reads as a
+finished command (it has an amount, or is a balance check) and the text
+after it starts a new one (it has an amount or an intent keyword). So
+"spent 40 on bread and butter" and "remind me to pay rent and internet
+on 5" stay whole.
+"""
+
+import re
+from typing import List
+
+from app.intent.amounts import normalize_amounts
+from app.intent.detector import Intent, parse_utterance
+
+# Separators are captured so merged segments keep their original text
+_SEPARATORS = re.compile(r"(\s*[,;]\s*(?:and then\s+|and\s+|then\s+)?|\s+(?:and then|and also|and|then|also|plus)\s+)")
+
+
+def _is_complete(segment: str) -> bool:
+    parsed = parse_utterance(segment)
+    return parsed.amount is not None or parsed.intent == Intent.CHECK_BALANCE
+
+
+def _starts_command(segment: str) -> bool:
+    parsed = parse_utterance(segment)
+    return parsed.amount is not None or parsed.intent != Intent.UNKNOWN
+
+
+def split_commands(text: str) -> List[str]:
+    """
+    Lowercased, amount-normalized commands in utterance order. Amounts are
+    normalized first so "a hundred and fifty" is not split.
+    """
+    text = normalize_amounts((text or "").lower().strip())
+    if not text:
+        return []
+
+    parts = _SEPARATORS.split(text)
+    commands = [parts[0]]
+
+    for separator, part in zip(parts[1::2], parts[2::2]):
+        if part and _is_complete(commands[-1]) and _starts_command(part):
+            commands.append(part)
+        else:
+            commands[-1] = f"{commands[-1]}{separator}{part}"
+
+    return [command.strip(" ,;") for command in commands if command.strip(" ,;")]
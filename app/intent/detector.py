@@ -1,4 +1,10 @@
+import re
 from enum import Enum
+from functools import lru_cache, partial
+from typing import NamedTuple, Optional
+
+from app.intent.amounts import AMOUNT_WORDS, normalize_amounts
+from app.intent.lexicon import CategoryLexicon, get_default_lexicon
 
 
 class Intent(str, Enum):
@@ -9,22 +15,344 @@ class Intent(str, Enum):
     UNKNOWN = "UNKNOWN"
 
 
-def detect_intent(text: str) -> Intent:
-    if not text:
-        return Intent.UNKNOWN
+# -----------------------------
+# Keyword tables (first match wins, in order)
+# -----------------------------
+INTENT_KEYWORDS = (
+    (Intent.CREATE_REMINDER, ("remind",)),  # also covers "reminder"
+    (Intent.UPDATE_BUDGET, ("budget", "limit")),
+    (Intent.ADD_EXPENSE, ("spent", "expense", "paid")),
+    (Intent.CHECK_BALANCE, ("balance", "money left")),
+)
+
+REMINDER_NAMES = (
+    ("electricity", "electricity bill"),
+    ("credit card", "credit card bill"),
+    ("rent", "rent"),
+    ("internet", "internet bill"),
+)
+
+FREQUENCY_KEYWORDS = (
+    ("weekly", "weekly"),
+)
+
+# Slot tables, compiled below into one keyword → [(slot, rank, value)] map.
+# Categories come from the lexicon (app/intent/lexicon.py) instead.
+_SLOT_TABLES = {
+    "intent": tuple((kw, intent) for intent, kws in INTENT_KEYWORDS for kw in kws),
+    "reminder_name": REMINDER_NAMES,
+    "frequency": FREQUENCY_KEYWORDS,
+}
+_SLOTS = tuple(_SLOT_TABLES)
+
+_LOOKUP: dict = {}
+for _slot, _table in enumerate(_SLOT_TABLES.values()):
+    for _rank, (_keyword, _value) in enumerate(_table):
+        _LOOKUP.setdefault(_keyword, []).append((_slot, _rank, _value))
+
+# First words of multi-word keywords ("money left", "credit card")
+_BIGRAM_HEADS = {kw.split()[0] for kw in _LOOKUP if " " in kw}
+
+# Inflections tolerated on a keyword ("expenses", "reminder", "limited")
+_SUFFIXES = ("s", "es", "er", "ers", "ed", "ing")
+
+# Single scan: standalone numbers (same boundaries as the old
+# `\b(\d+)\b` searches, plus decimals; badly grouped "1,00" is not a
+# number) and lowercase words
+_TOKENIZER = re.compile(r"(?<![\w.])(?<!\d,)(\d+(?:\.\d+)?)(?!\w|[.,]\d)|([a-z]+)")
+
+# Normalizer output names the category explicitly; accept words the
+# lexicon does not know yet ("add expense 20 stickers")
+_CANONICAL_CATEGORY = re.compile(
+    r"^(?:set ([a-z]+) budget to \d+(?:\.\d+)?|add expense \d+(?:\.\d+)? ([a-z]+))$"
+)
+_NOT_CATEGORIES = {"my", "the", "a", "an", "total", "monthly", "overall", "this"}
+
+
+@lru_cache(maxsize=8192)
+def _lookup(word: str):
+    matches = _LOOKUP.get(word)
+    if matches is not None:
+        return matches
+
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            matches = _LOOKUP.get(word[: -len(suffix)])
+            if matches is not None:
+                return matches
+    return None
+
+
+class ParsedUtterance(NamedTuple):
+    intent: Intent
+    category: Optional[str]              # budget / expense category
+    reminder_name: Optional[str]
+    amount: Optional[float]              # first amount below 10 million
+    day: Optional[int]                   # first whole number of up to 2 digits
+    frequency: str
+
+
+def _scan(text: str, lexicon: CategoryLexicon):
+    """
+    Resolve intent and slots in one pass over the tokenized text.
+    """
+    values = [None] * len(_SLOTS)
+    ranks = [len(_LOOKUP)] * len(_SLOTS)
+    amount = None
+    day = None
+    category = None
+    unknown = []
+    previous = None
+
+    for number, word in _TOKENIZER.findall(text):
+        if number:
+            whole, _, fraction = number.partition(".")
+            if amount is None and len(whole) <= 7:
+                amount = float(number)
+            if day is None and not fraction and len(whole) <= 2:
+                day = int(whole)
+            previous = None
+            continue
+
+        matches = _lookup(word)
+        if previous in _BIGRAM_HEADS:
+            matches = (matches or []) + (_LOOKUP.get(f"{previous} {word}") or [])
+
+        if category is None:
+            category = lexicon.exact(word, previous)
+            if category is None and not matches:
+                unknown.append(word)
+        previous = word
+
+        if matches:
+            # Keep the highest-priority (lowest rank) match per slot
+            for slot, rank, value in matches:
+                if rank < ranks[slot]:
+                    ranks[slot] = rank
+                    values[slot] = value
+
+    if category is None:
+        for word in unknown:
+            category = lexicon.fuzzy(word)
+            if category:
+                break
+
+    return values, category, amount, day
+
+
+# -----------------------------
+# Fast path: plain utterances
+# -----------------------------
+# Every single word `_lookup` resolves (keywords and their inflections)
+_KEYWORD_FORMS = {
+    form: _lookup.__wrapped__(form)
+    for form in (
+        *(kw for kw in _LOOKUP if " " not in kw),
+        *(kw + suffix for kw in _LOOKUP if " " not in kw and len(kw) >= 3 for suffix in _SUFFIXES),
+    )
+    if _lookup.__wrapped__(form)
+}
+
+# Ordinals the full scan reads as a bare word ("on the 1st" → "st")
+_ORDINALS = frozenset(("st", "nd", "rd", "th"))
+
+# Table entries of the amount words ("two", "hundred", "k", ...) and of
+# words with nothing to resolve
+_AMOUNT_WORD = (None, None, False)
+_NO_ENTRY = (None, (), False)
 
-    text = text.lower()
+_NO_VALUES = (None,) * len(_SLOTS)
+_NO_RANKS = (len(_LOOKUP),) * len(_SLOTS)
 
-    if "remind" in text or "reminder" in text:
-        return Intent.CREATE_REMINDER
+# Words remembered per lexicon as having no fuzzy category
+_MAX_FUZZY_MISSES = 8192
 
-    if "budget" in text or "limit" in text:
-        return Intent.UPDATE_BUDGET
 
-    if "spent" in text or "expense" in text or "paid" in text:
-        return Intent.ADD_EXPENSE
+def _plain_table(lexicon: CategoryLexicon) -> dict:
+    """
+    Per lexicon: word → (category, keyword matches, starts a two-word
+    term) for every word that has any of them, plus the amount words.
+    """
+    table = lexicon.memos.get("plain_table")
+    if table is None:
+        forms = lexicon.word_forms()
+        heads = _BIGRAM_HEADS | lexicon.bigram_heads
+        table = {
+            word: (forms.get(word), _KEYWORD_FORMS.get(word, ()), word in heads)
+            for word in (*forms, *_KEYWORD_FORMS, *heads)
+        }
+        table.update(dict.fromkeys(AMOUNT_WORDS, _AMOUNT_WORD))
+        table = lexicon.memos.setdefault("plain_table", table)
+    return table
 
-    if "balance" in text or "money left" in text:
-        return Intent.CHECK_BALANCE
 
-    return Intent.UNKNOWN
+def _scan_plain(text: str, lexicon: CategoryLexicon):
+    """
+    `_scan` for the common case of lowercase ASCII words and bare integers
+    with no amount words: the known words are found with one set
+    intersection against the lexicon's plain table instead of a per-token
+    loop, and the amount normalizer is skipped. Returns None when the text
+    needs the full scan.
+    """
+    tokens = text.split()
+    joined = "".join(tokens)
+    if not joined.isascii():
+        return None
+
+    amount = None
+    day = None
+    if not joined.isalpha():
+        for word in tokens:
+            if word.isalpha():
+                continue
+            if word.isdigit():
+                if amount is None and len(word) <= 7:
+                    amount = float(word)
+                if day is None and len(word) <= 2:
+                    day = int(word)
+            elif word[-2:] in _ORDINALS and word[:-2].isdigit():
+                tokens[tokens.index(word)] = word[-2:]
+            else:
+                return None  # "abc123", punctuation
+
+    table = lexicon.memos.get("plain_table") or _plain_table(lexicon)
+    category = None
+    position = len(tokens)
+    found = []
+    heads = False
+
+    for word in table.keys() & tokens:
+        word_category, matches, head = table[word]
+        if matches is None:
+            return None  # amounts in words need the normalizer
+        if word_category is not None:
+            # First category in the utterance wins
+            index = tokens.index(word)
+            if index < position:
+                category, position = word_category, index
+        if matches:
+            found.append(matches)
+        heads = heads or head
+
+    paired = ()
+    if heads:
+        # Two-word terms ("money left", "house rent") count at their
+        # second word and win over that word on its own
+        paired = set()
+        for index, (head, word) in enumerate(zip(tokens, tokens[1:]), 1):
+            if not table.get(head, _NO_ENTRY)[2]:
+                continue
+            bigram = f"{head} {word}"
+            matches = _LOOKUP.get(bigram)
+            if matches:
+                found.append(matches)
+                paired.add(word)
+            bigram_category = lexicon.terms.get(bigram)
+            if bigram_category and index <= position:
+                category, position = bigram_category, index
+
+    values = list(_NO_VALUES)
+    if found:
+        ranks = list(_NO_RANKS)
+        for matches in found:
+            for slot, rank, value in matches:
+                if rank < ranks[slot]:
+                    ranks[slot] = rank
+                    values[slot] = value
+
+    if category is None:
+        category = _fuzzy_category(tokens, table, paired, lexicon)
+
+    return values, category, amount, day
+
+
+def _fuzzy_category(tokens, table: dict, paired, lexicon: CategoryLexicon) -> Optional[str]:
+    """
+    First fuzzy category among the words `_scan` treats as unknown (no
+    keyword matches, not completing a two-word keyword). Words without
+    one are remembered per lexicon, so text made only of them costs one
+    set check.
+    """
+    misses = lexicon.memos.get("fuzzy_misses")
+    if misses is None or len(misses) > _MAX_FUZZY_MISSES:
+        misses = lexicon.memos["fuzzy_misses"] = set(_KEYWORD_FORMS)
+    elif misses.issuperset(tokens):
+        return None
+
+    for word in tokens:
+        if word in misses or word in paired:
+            continue
+        if not table.get(word, _NO_ENTRY)[1]:
+            category = lexicon.fuzzy(word)
+            if category:
+                return category
+        misses.add(word)
+    return None
+
+
+def _parse(lexicon: CategoryLexicon, text: str) -> ParsedUtterance:
+    text = (text or "").lower()
+
+    scanned = _scan_plain(text, lexicon)
+    if scanned is None:
+        # "two thousand", "₹1,500", "2.5k" → plain numbers
+        text = normalize_amounts(text)
+        scanned = _scan(text, lexicon)
+
+    (intent, reminder_name, frequency), category, amount, day = scanned
+
+    if category is None:
+        match = _CANONICAL_CATEGORY.match(text.strip())
+        if match:
+            word = match.group(1) or match.group(2)
+            if word not in _NOT_CATEGORIES:
+                category = word
+
+    return ParsedUtterance(
+        intent or Intent.UNKNOWN,
+        category,
+        reminder_name,
+        amount,
+        day,
+        frequency or "monthly",
+    )
+
+
+def parse_utterance(text: str, lexicon: Optional[CategoryLexicon] = None) -> ParsedUtterance:
+    """
+    Tokenize an utterance once and resolve intent and every slot from it.
+    `detect_intent` and the `extract_*_slots` functions are thin wrappers.
+
+    The category is the first word (or two-word term) the lexicon knows,
+    falling back to a fuzzy match for typos. Pass a per-user lexicon
+    (`get_user_lexicon`) to include the user's own budget categories.
+
+    Results are memoized per lexicon, so a per-user lexicon and its
+    parses are freed together.
+    """
+    if lexicon is None:
+        lexicon = get_default_lexicon()
+    parse = lexicon.memos.get("parse_utterance")
+    if parse is None:
+        parse = lexicon.memos.setdefault(
+            "parse_utterance", lru_cache(maxsize=2048)(partial(_parse, lexicon))
+        )
+    return parse(text)
+
+
+def clear_parse_cache(lexicon: Optional[CategoryLexicon] = None) -> None:
+    """
+    Forget the memoized parses of `lexicon` (the default lexicon if None).
+    """
+    if lexicon is None:
+        lexicon = get_default_lexicon()
+    parse = lexicon.memos.get("parse_utterance")
+    if parse is not None:
+        parse.cache_clear()
+
+
+def detect_intent(text: str) -> Intent:
+    if not text:
+        return Intent.UNKNOWN
+
+    return parse_utterance(text).intent
@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.utils.lru import LRUCache
+
+logger = logging.getLogger("intent-lexicon")
+
+# Category → synonyms. Per-user budget categories are added on top.
+LEXICON_PATH = os.getenv(
+    "CATEGORY_LEXICON_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "categories.json"),
+)
+USER_LEXICON_TTL = int(os.getenv("USER_LEXICON_TTL", "600"))  # 10 minutes
+USER_LEXICON_CACHE_SIZE = int(os.getenv("USER_LEXICON_CACHE_SIZE", "1024"))
+# Budget changes on any worker are broadcast here so every worker drops
+# its copy of that user's lexicon (see app.cache.near_cache)
+LEXICON_INVALIDATION_CHANNEL = "lexicon:invalidate"
+
+# Fuzzy matching: trigram Dice shortlist, then an edit-distance check
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_DICE = 0.5
+
+# Inflections tolerated on a term ("groceries" → "grocery" handled by synonyms)
+_SUFFIXES = ("s", "es", "ing", "ed")
+
+
+def _singulars(category: str) -> List[str]:
+    # "pets" → "pet", "groceries" → "grocery", so a user's own category
+    # also claims the singular the user is likely to say
+    if category.endswith("ies") and len(category) > 4:
+        return [category[:-3] + "y"]
+    return [
+        category[: -len(suffix)]
+        for suffix in ("es", "s")
+        if category.endswith(suffix) and len(category) - len(suffix) >= 3
+    ]
+
+
+def _trigrams(term: str) -> set:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, giving up (returns limit + 1) once it exceeds limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class CategoryLexicon:
+    """
+    In-memory category index: exact synonym lookup (single and two-word
+    terms) plus trigram-indexed fuzzy matching for typos.
+    """
+
+    def __init__(self, synonyms: Dict[str, Iterable[str]]):
+        self.terms: Dict[str, str] = {}
+        for category, words in synonyms.items():
+            category = category.lower().strip()
+            self.terms[category] = category
+            for word in words:
+                self.terms.setdefault(word.lower().strip(), category)
+
+        self.categories = sorted(set(self.terms.values()))
+        self.bigram_heads = {term.split()[0] for term in self.terms if " " in term}
+
+        self._index: Dict[str, List[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        for term in self.terms:
+            if " " not in term and len(term) >= FUZZY_MIN_LENGTH:
+                grams = _trigrams(term)
+                self._gram_counts[term] = len(grams)
+                for gram in grams:
+                    self._index.setdefault(gram, []).append(term)
+
+        self._word = lru_cache(maxsize=8192)(self._resolve_word)
+        self._fuzzy = lru_cache(maxsize=4096)(self._resolve_fuzzy)
+        self._forms: Optional[Dict[str, str]] = None
+        # Caches other modules keep per lexicon (the parser's memo), so
+        # they are dropped together with a per-user lexicon
+        self.memos: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def exact(self, word: str, previous: Optional[str] = None) -> Optional[str]:
+        if previous in self.bigram_heads:
+            category = self.terms.get(f"{previous} {word}")
+            if category:
+                return category
+        return self._word(word)
+
+    def _resolve_word(self, word: str) -> Optional[str]:
+        category = self.terms.get(word)
+        if category:
+            return category
+
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                category = self.terms.get(word[: -len(suffix)])
+                if category:
+                    return category
+        return None
+
+    def word_forms(self) -> Dict[str, str]:
+        """
+        Every single word `exact` resolves without a preceding word (terms
+        and their inflections) → category. Built on first use.
+        """
+        if self._forms is None:
+            candidates = [term for term in self.terms if " " not in term]
+            candidates += [
+                term + suffix
+                for term in candidates if len(term) >= 3
+                for suffix in _SUFFIXES
+            ]
+            forms = {}
+            for word in candidates:
+                category = self._resolve_word(word)
+                if category:
+                    forms[word] = category
+            self._forms = forms
+        return self._forms
+
+    def fuzzy(self, word: str) -> Optional[str]:
+        if len(word) < FUZZY_MIN_LENGTH:
+            return None
+        return self._fuzzy(word)
+
+    def _resolve_fuzzy(self, word: str) -> Optional[str]:
+        grams = _trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._index.get(gram, ()))
+
+        best = None
+        best_score = FUZZY_MIN_DICE
+        limit = max(1, len(word) // 4)
+
+        for term, overlap in shared.items():
+            score = 2.0 * overlap / (len(grams) + self._gram_counts[term])
+            # Typos rarely touch the first letter; this also stops
+            # "parent" from matching "rent"
+            if score >= best_score and term[0] == word[0]:
+                if _edit_distance(word, term, limit) <= limit:
+                    best, best_score = term, score
+
+        return self.terms[best] if best else None
+
+    def with_categories(self, categories: Iterable[str]) -> "CategoryLexicon":
+        """
+        New lexicon that also knows the given (user-defined) categories.
+        They take priority over existing synonyms, so a user with a
+        "groceries" budget books groceries there rather than under "food".
+        """
+        # Listed first: the constructor keeps the first category per term
+        synonyms: Dict[str, List[str]] = {}
+        for category in categories:
+            category = category.lower().strip()
+            synonyms.setdefault(category, []).extend(_singulars(category))
+        for term, category in self.terms.items():
+            synonyms.setdefault(category, []).append(term)
+        return CategoryLexicon(synonyms)
+
+
+# -----------------------------
+# Default + per-user lexicons
+# -----------------------------
+@lru_cache(maxsize=1)
+def get_default_lexicon() -> CategoryLexicon:
+    try:
+        with open(LEXICON_PATH) as f:
+            synonyms = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Could not load category lexicon from {LEXICON_PATH}: {e}")
+        synonyms = {}
+
+    return CategoryLexicon(synonyms)
+
+
+# Per-worker fallback when Redis (and so cross-worker invalidation) is
+# unavailable; entries then go stale for at most USER_LEXICON_TTL
+_user_lexicons = LRUCache(maxsize=USER_LEXICON_CACHE_SIZE, ttl=USER_LEXICON_TTL)
+
+
+@lru_cache(maxsize=1)
+def _near_cache():
+    # app.cache needs REDIS_URL at import
+    try:
+        from app.cache.near_cache import NearCache
+        from app.cache.redis_client import redis_client
+    except Exception as e:
+        logger.warning(f"⚠️ User lexicons cached per worker only: {e}")
+        return None
+
+    return NearCache(
+        redis_client,
+        LEXICON_INVALIDATION_CHANNEL,
+        "user_lexicon_cache",
+        USER_LEXICON_CACHE_SIZE,
+        USER_LEXICON_TTL,
+    )
+
+
+def get_user_lexicon(supabase, user_id: int) -> CategoryLexicon:
+    """
+    Default lexicon plus the user's own budget categories. Cached per user
+    and invalidated on every worker (`invalidate_user_lexicon`) after each
+    budget write.
+    """
+    near = _near_cache()
+    generation = None
+    if near is not None:
+        from app.cache.near_cache import MISSING
+
+        lexicon = near.get(user_id)
+        if lexicon is not MISSING:
+            return lexicon
+        generation = near.generation()
+
+    if near is None or not near.enabled:
+        lexicon = _user_lexicons.get(user_id)
+        if lexicon is not None:
+            return lexicon
+
+    from app.services.budgets import get_all_budgets
+
+    default = get_default_lexicon()
+    try:
+        categories = [b.category for b in get_all_budgets(supabase=supabase, user_id=user_id)]
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load budgets for user {user_id} lexicon: {e}")
+        return default
+
+    defaults = set(default.categories)
+    own = [c for c in categories if c and c.lower().strip() not in defaults]
+    lexicon = default.with_categories(own) if own else default
+
+    if near is not None and near.enabled:
+        near.set(user_id, lexicon, generation)
+    else:
+        _user_lexicons.set(user_id, lexicon)
+    return lexicon
+
+
+def invalidate_user_lexicon(user_id: int) -> None:
+    _user_lexicons.delete(user_id)
+
+    near = _near_cache()
+    if near is not None:
+        near.written(user_id)
@@ -34,7 +34,7 @@ def is_reminder_state_complete(state: Dict) -> bool:
 
 def is_transaction_state_complete(state: Dict) -> bool:
     slots = state.get("slots", {})
-    return slots.get("category") is not None and slots.get("limit") is not None
+    return slots.get("category") is not None and slots.get("amount") is not None
 
 
 def is_state_complete(state: Dict) -> bool:
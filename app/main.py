@@ -1,15 +1,18 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Dict, List, Optional
 
 from fastapi import FastAPI, UploadFile, File, Depends, Query, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from supabase import Client
 from pydantic import BaseModel
 
-# 🧠 AI NORMALIZER
-from app.ai.parser import normalize_command
+# 🧠 AI ROUTER (rules first, flan-t5 fallback)
+from app.ai.dialog import route_turn, route_turn_async
+from app.ai.warmup import WARMUP_ENABLED, warm_up_models
 
 # DB
 from app.db.session import get_supabase
@@ -20,17 +23,15 @@ from app.voice.recorder import save_audio_file
 from app.voice.stt import transcribe_audio
 
 # Intent + slots
-from app.intent.detector import detect_intent, Intent
-from app.intent.slots import (
-    extract_budget_slots,
-    extract_reminder_slots,
-    extract_transaction_slots,
-)
+from app.intent.classifier import get_classifier
+from app.intent.detector import Intent
+from app.intent.lexicon import get_user_lexicon, invalidate_user_lexicon
 
 # Services
-from app.services.budgets import set_budget, get_all_budgets
-from app.services.reminders import create_reminder, get_reminders
-from app.services.transactions import add_transaction, get_total_spent
+from app.services.balance import get_balance_snapshot
+from app.services.budgets import set_budget, set_budgets
+from app.services.reminders import create_reminder, create_reminders
+from app.services.transactions import add_transaction, add_transactions
 
 # Routers
 from app.api.routes import all_routers
@@ -75,7 +76,28 @@ async def lifespan(app: FastAPI):
 
     logger.info("✅ Database initialized")
 
+    # Load + warm flan-t5 and Whisper in the background; /ready reports
+    # progress so traffic only reaches warm workers.
+    if WARMUP_ENABLED:
+        app.state.warmup = asyncio.get_running_loop().run_in_executor(None, warm_up_models)
+
+    # The intent classifier always runs in-process; train it off the event loop
+    asyncio.get_running_loop().run_in_executor(None, get_classifier)
+
+    # Pooled asyncio Redis client for async endpoints (app.cache needs
+    # REDIS_URL at import; without it state is simply not kept)
+    close_redis = None
+    try:
+        from app.cache.async_client import close_async_redis, init_async_redis
+        app.state.redis = init_async_redis()
+        close_redis = close_async_redis
+    except Exception as e:
+        logger.warning(f"⚠️ Async Redis unavailable: {e}")
+
     yield
+
+    if close_redis is not None:
+        await close_redis()
     logger.info("🛑 Shutting down Voice Driven Finance System")
 
 # -------------------------------------------------
@@ -157,19 +179,25 @@ def process_text_get(
 
 
 def _process_text_command(text: str, user_id: int, db: Client):
-    normalized = normalize_command(text)
-    logger.info(f"🧠 AI normalized: '{text}' → '{normalized}'")
+    commands = route_turn(text, user_id, get_user_lexicon(db, user_id))
+    if len(commands) > 1:
+        return _compound_response(_execute_commands(commands, user_id, db))
+
+    routed = commands[0]
+    normalized = routed["normalized"]
+    intent = routed["intent"]
+    slots = routed["slots"]
+    logger.info(f"🧠 Normalized ({routed['tier']}): '{text}' → '{normalized}'")
 
-    intent = detect_intent(normalized)
-    response = {"intent": intent.value, "status": "unknown"}
+    response = {"intent": intent.value, "tier": routed["tier"], "status": "unknown"}
 
     # -------------------------
     # UPDATE BUDGET
     # -------------------------
     if intent == Intent.UPDATE_BUDGET:
-        slots = extract_budget_slots(normalized)
         if slots["category"] and slots["limit"]:
             budget = set_budget(supabase=db, user_id=user_id, category=slots["category"], limit=slots["limit"])
+            invalidate_user_lexicon(user_id)
             response.update({
                 "status": "success",
                 "category": budget.category,
@@ -181,7 +209,6 @@ def _process_text_command(text: str, user_id: int, db: Client):
     # ADD EXPENSE
     # -------------------------
     elif intent == Intent.ADD_EXPENSE:
-        slots = extract_transaction_slots(normalized)
         if slots["category"] and slots["amount"]:
             txn = add_transaction(
                 supabase=db,
@@ -204,11 +231,187 @@ def _process_text_command(text: str, user_id: int, db: Client):
             "voice_response": "Sorry, I did not understand that",
         })
 
+    # Partial command: state is kept, the next turn can fill the rest
+    if routed.get("missing"):
+        response.update({
+            "status": "incomplete",
+            "missing": routed["missing"],
+            "voice_response": f"Please tell me the {' and '.join(routed['missing'])}",
+        })
+
     return response
 
+
+# -------------------------------------------------
+# COMPOUND COMMANDS
+# -------------------------------------------------
+def _balance_summary(db: Client, user_id: int) -> Dict:
+    snapshot = get_balance_snapshot(supabase=db, user_id=user_id)
+
+    return {
+        "total_spent": snapshot.total_spent,
+        "budgets": [
+            {"category": b.category, "limit": b.limit, "spent": b.spent, "remaining": b.remaining}
+            for b in snapshot.budgets
+        ],
+    }
+
+
+def _execute_commands(commands: List[Dict], user_id: int, db: Client) -> List[Dict]:
+    """
+    Run several routed commands with batched writes: every reminder in one
+    insert, every budget update in one upsert (before the expenses, so
+    warnings see them), every expense in one insert, and finally balance
+    checks. Each batch writes its audit rows in one insert as well.
+    """
+    results = [
+        {"text": c["text"], "intent": c["intent"].value, "tier": c["tier"], "status": "error"}
+        for c in commands
+    ]
+    reminders = []
+    budget_updates = []
+    expenses = []
+    balance_checks = []
+
+    for result, command in zip(results, commands):
+        intent, slots = command["intent"], command["slots"]
+
+        if intent == Intent.UPDATE_BUDGET and slots["category"] and slots["limit"]:
+            budget_updates.append((result, slots["category"], slots["limit"]))
+
+        elif intent == Intent.ADD_EXPENSE and slots["category"] and slots["amount"]:
+            expenses.append((result, {
+                "category": slots["category"],
+                "amount": slots["amount"],
+                "description": command["normalized"],
+            }))
+
+        elif intent == Intent.CREATE_REMINDER and slots["name"] and slots["day"]:
+            reminders.append((result, {
+                "name": slots["name"],
+                "day": slots["day"],
+                "frequency": slots.get("frequency", "monthly"),
+            }))
+
+        elif intent == Intent.CHECK_BALANCE:
+            balance_checks.append(result)
+
+    if reminders:
+        created = create_reminders(supabase=db, user_id=user_id, items=[item for _, item in reminders])
+        for (result, _), reminder in zip(reminders, created):
+            result.update({"status": "success", "name": reminder.name})
+
+    if budget_updates:
+        # Later updates to the same category win, as if applied in order
+        limits = {category: limit for _, category, limit in budget_updates}
+        budgets = {b.category: b for b in set_budgets(supabase=db, user_id=user_id, limits=limits)}
+        invalidate_user_lexicon(user_id)
+        for result, category, _ in budget_updates:
+            budget = budgets[category]
+            result.update({"status": "success", "category": budget.category, "limit": budget.limit})
+
+    if expenses:
+        transactions = add_transactions(supabase=db, user_id=user_id, items=[item for _, item in expenses])
+        for (result, _), txn in zip(expenses, transactions):
+            result.update({
+                "status": "success",
+                "category": txn.category,
+                "amount": txn.amount,
+                "budget_warning": txn.budget_warning,
+            })
+
+    if balance_checks:
+        summary = _balance_summary(db, user_id)
+        for result in balance_checks:
+            result.update({"status": "success", **summary})
+
+    return results
+
+
+def _compound_response(results: List[Dict]) -> Dict:
+    succeeded = sum(r["status"] == "success" for r in results)
+
+    if succeeded == len(results):
+        status = "success"
+    elif succeeded:
+        status = "partial"
+    else:
+        status = "error"
+
+    return {
+        "status": status,
+        "commands": results,
+        "voice_response": f"Done {succeeded} of {len(results)} commands",
+    }
+
 # -------------------------------------------------
 # VOICE PIPELINE
 # -------------------------------------------------
+def _execute_voice_command(routed: Dict, user_id: int, db: Client) -> Dict:
+    """
+    Run one routed voice command; returns the fields to add to the response.
+    """
+    normalized = routed["normalized"]
+    intent = routed["intent"]
+    slots = routed["slots"]
+    response = {}
+
+    if intent == Intent.UPDATE_BUDGET:
+        if slots["category"] and slots["limit"]:
+            budget = set_budget(supabase=db, user_id=user_id, category=slots["category"], limit=slots["limit"])
+            invalidate_user_lexicon(user_id)
+            response.update({
+                "status": "success",
+                "action": "Budget updated",
+                "category": budget.category,
+                "limit": budget.limit,
+            })
+
+    elif intent == Intent.ADD_EXPENSE:
+        if slots["category"] and slots["amount"]:
+            txn = add_transaction(
+                supabase=db,
+                user_id=user_id,
+                category=slots["category"],
+                amount=slots["amount"],
+                description=normalized,
+            )
+            response.update({
+                "status": "success",
+                "action": "Expense added",
+                "category": txn.category,
+                "amount": txn.amount,     # ✅ FIXED
+                "budget_warning": getattr(txn, "budget_warning", None),
+            })
+
+    elif intent == Intent.CREATE_REMINDER:
+        if slots["name"] and slots["day"]:
+            reminder = create_reminder(
+                supabase=db,
+                user_id=user_id,
+                name=slots["name"],
+                day=slots["day"],
+                frequency=slots.get("frequency", "monthly"),
+            )
+            response.update({
+                "status": "success",
+                "action": "Reminder created",
+                "name": reminder.name,
+            })
+
+    elif intent == Intent.CHECK_BALANCE:
+        response.update({
+            "status": "success",
+            "action": "Balance checked",
+            **_balance_summary(db, user_id),
+        })
+
+    else:
+        response.update({"status": "error", "message": "Unknown command"})
+
+    return response
+
+
 @app.post("/voice/process")
 async def process_voice(
     file: UploadFile = File(...),
@@ -217,87 +420,35 @@ async def process_voice(
 ):
     try:
         audio_path = await save_audio_file(file)
-        text = transcribe_audio(audio_path)
+        # Whisper, the router (flan-t5 batcher, normalizer cache) and the
+        # Supabase client are all blocking: keep them off the event loop
+        text = await run_in_threadpool(transcribe_audio, audio_path)
+        lexicon = await run_in_threadpool(get_user_lexicon, db, user_id)
 
-        normalized = normalize_command(text)
-        logger.info(f"🧠 AI normalized (voice): '{text}' → '{normalized}'")
+        commands = await route_turn_async(text, user_id, lexicon)
+        if len(commands) > 1:
+            results = await run_in_threadpool(_execute_commands, commands, user_id, db)
+            return JSONResponse(content={"transcribed_text": text, **_compound_response(results)})
 
-        intent = detect_intent(normalized)
+        routed = commands[0]
+        logger.info(f"🧠 Normalized (voice, {routed['tier']}): '{text}' → '{routed['normalized']}'")
 
         response = {
             "transcribed_text": text,
-            "normalized_text": normalized,
-            "intent": intent.value,
+            "normalized_text": routed["normalized"],
+            "intent": routed["intent"].value,
+            "tier": routed["tier"],
             "status": "unknown",
         }
+        response.update(await run_in_threadpool(_execute_voice_command, routed, user_id, db))
 
-        if intent == Intent.UPDATE_BUDGET:
-            slots = extract_budget_slots(normalized)
-            if slots["category"] and slots["limit"]:
-                budget = set_budget(supabase=db, user_id=user_id, category=slots["category"], limit=slots["limit"])
-                response.update({
-                    "status": "success",
-                    "action": "Budget updated",
-                    "category": budget.category,
-                    "limit": budget.limit,
-                })
-
-        elif intent == Intent.ADD_EXPENSE:
-            slots = extract_transaction_slots(normalized)
-            if slots["category"] and slots["amount"]:
-                txn = add_transaction(
-                    supabase=db,
-                    user_id=user_id,
-                    category=slots["category"],
-                    amount=slots["amount"],
-                    description=normalized,
-                )
-                response.update({
-                    "status": "success",
-                    "action": "Expense added",
-                    "category": txn.category,
-                    "amount": txn.amount,     # ✅ FIXED
-                    "budget_warning": getattr(txn, "budget_warning", None),
-                })
-
-        elif intent == Intent.CREATE_REMINDER:
-            slots = extract_reminder_slots(normalized)
-            if slots["name"] and slots["day"]:
-                reminder = create_reminder(
-                    supabase=db,
-                    user_id=user_id,
-                    name=slots["name"],
-                    day=slots["day"],
-                    frequency=slots.get("frequency", "monthly"),
-                )
-                response.update({
-                    "status": "success",
-                    "action": "Reminder created",
-                    "name": reminder.name,
-                })
-
-        elif intent == Intent.CHECK_BALANCE:
-            budgets = get_all_budgets(supabase=db, user_id=user_id)
-            total = get_total_spent(supabase=db, user_id=user_id)
-
+        if routed.get("missing"):
             response.update({
-                "status": "success",
-                "action": "Balance checked",
-                "total_spent": total,
-                "budgets": [
-                    {
-                        "category": b.category,
-                        "limit": b.limit,
-                        "spent": get_total_spent(supabase=db, user_id=user_id, category=b.category),
-                        "remaining": b.limit - get_total_spent(supabase=db, user_id=user_id, category=b.category),
-                    }
-                    for b in budgets
-                ],
+                "status": "incomplete",
+                "missing": routed["missing"],
+                "message": f"Please tell me the {' and '.join(routed['missing'])}",
             })
 
-        else:
-            response.update({"status": "error", "message": "Unknown command"})
-
         return JSONResponse(content=response)
 
     except Exception as e:
@@ -309,14 +460,12 @@ async def process_voice(
 # -------------------------------------------------
 @app.get("/analytics/summary")
 def analytics(user_id: int = 1, db: Client = Depends(get_db)):
+    snapshot = get_balance_snapshot(supabase=db, user_id=user_id)
     return {
         "user_id": user_id,
-        "total_spent": get_total_spent(supabase=db, user_id=user_id),
-        "budgets": [
-            {"category": b.category, "limit": b.limit}
-            for b in get_all_budgets(supabase=db, user_id=user_id)
-        ],
-        "reminders": len(get_reminders(supabase=db, user_id=user_id)),
+        "total_spent": snapshot.total_spent,
+        "budgets": [{"category": b.category, "limit": b.limit} for b in snapshot.budgets],
+        "reminders": snapshot.reminder_count,
     }
 
 # -------------------------------------------------
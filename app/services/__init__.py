@@ -1,5 +1,6 @@
 from .budgets import (
     set_budget,
+    set_budgets,
     get_budget,
     get_all_budgets,
     delete_budget,
@@ -7,6 +8,7 @@ from .budgets import (
 
 __all__ = [
     "set_budget",
+    "set_budgets",
     "get_budget",
     "get_all_budgets",
     "delete_budget",
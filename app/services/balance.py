@@ -0,0 +1,21 @@
+from supabase import Client
+
+from app.db.models import BalanceSnapshot
+
+
+# -----------------------------
+# Balance Snapshot
+# -----------------------------
+def get_balance_snapshot(
+    supabase: Client,
+    user_id: int
+) -> BalanceSnapshot:
+    """
+    Budgets with spent / remaining, total spent, per-category totals,
+    transaction count and reminder count, from one balance_snapshot call.
+    """
+    try:
+        response = supabase.rpc("balance_snapshot", {"p_user_id": user_id}).execute()
+        return BalanceSnapshot(**(response.data or {}))
+    except Exception as e:
+        raise RuntimeError(f"Failed to get balance snapshot: {str(e)}")
@@ -1,9 +1,8 @@
 from supabase import Client
-from typing import Optional
-from datetime import datetime
+from typing import Dict, List, Optional
 
 from app.db.models import Budget
-from app.audit.logger import log_action
+from app.audit.logger import log_action, log_actions
 
 
 # -----------------------------
@@ -19,63 +18,75 @@ def set_budget(
     Create a new budget or update an existing one for a category.
     """
 
+    return set_budgets(supabase=supabase, user_id=user_id, limits={category: limit})[0]
+
+
+# -----------------------------
+# Create or Update Several Budgets
+# -----------------------------
+def set_budgets(
+    supabase: Client,
+    user_id: int,
+    limits: Dict[str, float]
+) -> List[Budget]:
+    """
+    Create or update budgets for several categories ({category: limit})
+    in one upsert on (user_id, category), plus one audit batch.
+
+    Callers invalidate the user's lexicon (`invalidate_user_lexicon`), so
+    a new category is recognised in the user's next command.
+    """
+
+    if not limits:
+        return []
+
     # Validation (service-level safety)
-    if limit <= 0:
+    if any(limit <= 0 for limit in limits.values()):
         raise ValueError("Budget limit must be greater than zero")
 
-    # Check if budget exists
-    existing_response = (
-        supabase.table("budgets")
-        .select("*")
-        .eq("user_id", user_id)
-        .eq("category", category)
-        .execute()
-    )
+    rows = [
+        {"user_id": user_id, "category": category, "limit": limit}
+        for category, limit in limits.items()
+    ]
 
-    existing_budget_data = existing_response.data[0] if existing_response.data else None
+    try:
+        # Only to audit creates and updates apart; the upsert can't tell
+        existing_response = (
+            supabase.table("budgets")
+            .select("category")
+            .eq("user_id", user_id)
+            .in_("category", list(limits))
+            .execute()
+        )
+        existing = {row["category"] for row in existing_response.data or []}
 
-    if existing_budget_data:
-        # Update existing budget
-        updated_response = (
+        response = (
             supabase.table("budgets")
-            .update({"limit": limit})
-            .eq("id", existing_budget_data["id"])
+            .upsert(rows, on_conflict="user_id,category")
             .execute()
         )
-        
-        if not updated_response.data:
-            raise RuntimeError("Failed to update budget")
-        
-        budget_data = updated_response.data[0]
-        budget = Budget(**budget_data)
-        action = "UPDATE_BUDGET"
-    else:
-        # Create new budget
-        data = {
-            "user_id": user_id,
-            "category": category,
-            "limit": limit,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        response = supabase.table("budgets").insert(data).execute()
-        
-        if not response.data:
-            raise RuntimeError("Failed to create budget")
-        
-        budget_data = response.data[0]
-        budget = Budget(**budget_data)
-        action = "CREATE_BUDGET"
+    except Exception as e:
+        raise RuntimeError(f"Failed to set budgets: {str(e)}")
+
+    if len(response.data or []) != len(rows):
+        raise RuntimeError("Failed to set budgets")
+
+    budgets = [Budget(**row) for row in response.data]
 
     # Audit log
-    log_action(
+    log_actions(
         supabase=supabase,
         user_id=user_id,
-        action=action,
-        details=f"{category} budget set to {limit}"
+        entries=[
+            (
+                "UPDATE_BUDGET" if b.category in existing else "CREATE_BUDGET",
+                f"{b.category} budget set to {b.limit}"
+            )
+            for b in budgets
+        ]
     )
 
-    return budget
+    return budgets
 
 
 # -----------------------------
@@ -139,14 +150,13 @@ def delete_budget(
     category: str
 ) -> bool:
     """
-    Delete a budget for a category.
+    Delete a budget for a category. Callers invalidate the user's lexicon.
     """
 
     try:
-        # First find the budget
         response = (
             supabase.table("budgets")
-            .select("*")
+            .delete()
             .eq("user_id", user_id)
             .eq("category", category)
             .execute()
@@ -155,16 +165,6 @@ def delete_budget(
         if not response.data:
             return False
 
-        budget_id = response.data[0]["id"]
-        
-        # Delete the budget
-        delete_response = (
-            supabase.table("budgets")
-            .delete()
-            .eq("id", budget_id)
-            .execute()
-        )
-
         # Audit log
         log_action(
             supabase=supabase,
@@ -1,9 +1,9 @@
 from supabase import Client
-from typing import Optional, List
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from app.db.models import Reminder
-from app.audit.logger import log_action
+from app.audit.logger import log_action, log_actions
 
 
 # -----------------------------
@@ -20,37 +20,62 @@ def create_reminder(
     Create a new reminder.
     """
 
+    items = [{"name": name, "day": day, "frequency": frequency}]
+    return create_reminders(supabase=supabase, user_id=user_id, items=items)[0]
+
+
+# -----------------------------
+# Create Several Reminders
+# -----------------------------
+def create_reminders(
+    supabase: Client,
+    user_id: int,
+    items: List[Dict]
+) -> List[Reminder]:
+    """
+    Create several reminders in one insert, plus one audit batch. Each
+    item has `name`, `day` and an optional `frequency` (monthly).
+    """
+
+    if not items:
+        return []
+
     # Basic validation (service-level safety)
-    if day < 1 or day > 28:
+    if any(item["day"] < 1 or item["day"] > 28 for item in items):
         raise ValueError("Day must be between 1 and 28")
 
-    data = {
-        "user_id": user_id,
-        "name": name,
-        "day": day,
-        "frequency": frequency,
-        "created_at": datetime.utcnow().isoformat()
-    }
+    created_at = datetime.utcnow().isoformat()
+    rows = [
+        {
+            "user_id": user_id,
+            "name": item["name"],
+            "day": item["day"],
+            "frequency": item.get("frequency", "monthly"),
+            "created_at": created_at
+        }
+        for item in items
+    ]
 
     try:
-        response = supabase.table("reminders").insert(data).execute()
-        
-        if not response.data:
-            raise RuntimeError("Failed to create reminder")
-        
-        reminder_data = response.data[0]
-        reminder = Reminder(**reminder_data)
+        response = supabase.table("reminders").insert(rows).execute()
 
-        log_action(
+        if len(response.data or []) != len(rows):
+            raise RuntimeError("Failed to create reminders")
+
+        reminders = [Reminder(**row) for row in response.data]
+
+        log_actions(
             supabase=supabase,
             user_id=user_id,
-            action="CREATE_REMINDER",
-            details=f"{name} on day {day} ({frequency})"
+            entries=[
+                ("CREATE_REMINDER", f"{r.name} on day {r.day} ({r.frequency})")
+                for r in reminders
+            ]
         )
 
-        return reminder
+        return reminders
     except Exception as e:
-        raise RuntimeError(f"Failed to create reminder: {str(e)}")
+        raise RuntimeError(f"Failed to create reminders: {str(e)}")
 
 
 # -----------------------------
@@ -1,10 +1,48 @@
 from supabase import Client
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+import base64
 
-from app.db.models import Transaction
-from app.audit.logger import log_action
-from app.services.budgets import get_budget
+from app.db.models import SpendingSummary, Transaction, TransactionPage
+
+
+def _warning_status(limit: Optional[float], new_total: float) -> Optional[str]:
+    # Same thresholds as the record_expense database function
+    if limit is None:
+        return None
+    if new_total > limit:
+        return "exceeded"
+    if new_total > limit * 0.9:
+        return "approaching"
+    return None
+
+
+def _budget_warning(limit: Optional[float], new_total: float, status: Optional[str] = None) -> Optional[str]:
+    status = status or _warning_status(limit, new_total)
+
+    if status == "exceeded":
+        return (
+            f"WARNING: Budget exceeded! Limit: {limit}, "
+            f"Total spent: {new_total:.2f}"
+        )
+    if status == "approaching":
+        return (
+            f"WARNING: Approaching budget limit. Limit: {limit}, "
+            f"Total spent: {new_total:.2f}"
+        )
+    return None
+
+
+def _recorded(result: Dict) -> Transaction:
+    # One record_expense result → transaction with its budget fields
+    limit = float(result["limit"]) if result.get("limit") is not None else None
+    total = float(result["total"])
+
+    transaction = Transaction(**result["transaction"])
+    transaction.budget_warning = _budget_warning(limit, total, result.get("warning"))
+    transaction.category_total = total
+    transaction.budget_limit = limit
+    return transaction
 
 
 # -----------------------------
@@ -18,62 +56,76 @@ def add_transaction(
     description: Optional[str] = None
 ) -> Transaction:
     """
-    Add a new transaction (expense).
+    Add a new transaction (expense). The insert, the audit row and the
+    budget check happen in one record_expense call.
     """
 
     if amount <= 0:
         raise ValueError("Transaction amount must be positive")
 
-    budget = get_budget(supabase=supabase, user_id=user_id, category=category)
-
-    total_spent = get_total_spent(supabase=supabase, user_id=user_id, category=category)
-    new_total = total_spent + amount
-
-    budget_warning = None
-    if budget:
-        if new_total > budget.limit:
-            budget_warning = (
-                f"WARNING: Budget exceeded! Limit: {budget.limit}, "
-                f"Total spent: {new_total:.2f}"
-            )
-        elif new_total > budget.limit * 0.9:
-            budget_warning = (
-                f"WARNING: Approaching budget limit. Limit: {budget.limit}, "
-                f"Total spent: {new_total:.2f}"
-            )
-
-    # Insert transaction
-    data = {
-        "user_id": user_id,
-        "category": category,
-        "amount": amount,
-        "description": description,
-        "created_at": datetime.utcnow().isoformat()
+    params = {
+        "p_user_id": user_id,
+        "p_category": category,
+        "p_amount": amount,
+        "p_description": description,
+        "p_created_at": datetime.utcnow().isoformat()
     }
 
     try:
-        response = supabase.table("transactions").insert(data).execute()
+        response = supabase.rpc("record_expense", params).execute()
         if not response.data:
             raise RuntimeError("Failed to add transaction")
-        
-        transaction_data = response.data[0]
-        transaction = Transaction(**transaction_data)
-        
-        log_action(
-            supabase=supabase,
-            user_id=user_id,
-            action="ADD_TRANSACTION",
-            details=f"{category} → {amount}"
-        )
-
-        if budget_warning:
-            transaction.budget_warning = budget_warning
 
-        return transaction
+        return _recorded(response.data)
     except Exception as e:
         raise RuntimeError(f"Failed to add transaction: {str(e)}")
 
 
+# -----------------------------
+# Add Several Transactions
+# -----------------------------
+def add_transactions(
+    supabase: Client,
+    user_id: int,
+    items: List[Dict]
+) -> List[Transaction]:
+    """
+    Add several transactions at once in one record_expenses call, which
+    records each item (insert, audit row, budget check) in order within
+    one database transaction. Each item has `category`, `amount` and an
+    optional `description`. Budget warnings account for the earlier items
+    in the same batch.
+    """
+
+    if not items:
+        return []
+
+    if any(item["amount"] <= 0 for item in items):
+        raise ValueError("Transaction amount must be positive")
+
+    params = {
+        "p_user_id": user_id,
+        "p_items": [
+            {
+                "category": item["category"],
+                "amount": item["amount"],
+                "description": item.get("description")
+            }
+            for item in items
+        ],
+        "p_created_at": datetime.utcnow().isoformat()
+    }
+
+    try:
+        response = supabase.rpc("record_expenses", params).execute()
+        if len(response.data or []) != len(items):
+            raise RuntimeError("Failed to add transactions")
+
+        return [_recorded(result) for result in response.data]
+    except Exception as e:
+        raise RuntimeError(f"Failed to add transactions: {str(e)}")
+
+
 # -----------------------------
 # Get Transactions
 # -----------------------------
@@ -97,25 +149,147 @@ def get_transactions(
 
 
 # -----------------------------
-# Get Total Spent
+# Transaction History (keyset pagination)
 # -----------------------------
-def get_total_spent(
+def encode_cursor(transaction: Transaction) -> str:
+    """
+    Opaque cursor pointing just past `transaction` in history order.
+    """
+    raw = f"{transaction.created_at.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, _, txn_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").partition("|")
+        return datetime.fromisoformat(created_at), int(txn_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def get_transaction_page(
     supabase: Client,
     user_id: int,
-    category: Optional[str] = None
-) -> float:
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> TransactionPage:
+    """
+    One page of history, newest first, ordered by (created_at, id).
+    `cursor` is the previous page's `next_cursor`; `start` is inclusive
+    and `end` exclusive. Each page is an index range scan, however deep.
+    Rows without a created_at have no place in the order and are left out.
+    """
+
+    if limit < 1:
+        raise ValueError("Page limit must be positive")
+
+    after = decode_cursor(cursor) if cursor else None
+
     try:
         query = (
             supabase.table("transactions")
-            .select("amount")
+            .select("id, user_id, category, amount, description, created_at")
             .eq("user_id", user_id)
+            .not_.is_("created_at", "null")
         )
-        
+
         if category:
             query = query.eq("category", category)
-        
-        response = query.execute()
-        
-        return sum(float(row["amount"]) for row in response.data)
+        if start:
+            query = query.gte("created_at", start.isoformat())
+        if end:
+            query = query.lt("created_at", end.isoformat())
+        if after:
+            created_at, txn_id = after
+            ts = f'"{created_at.isoformat()}"'
+            query = query.or_(f"created_at.lt.{ts},and(created_at.eq.{ts},id.lt.{txn_id})")
+
+        # One extra row tells whether another page exists
+        response = (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
+            .execute()
+        )
     except Exception as e:
-        raise RuntimeError(f"Failed to get total spent: {str(e)}")
+        raise RuntimeError(f"Failed to get transactions: {str(e)}")
+
+    items = [Transaction(**row) for row in response.data[:limit]]
+    has_more = len(response.data) > limit
+
+    return TransactionPage(
+        items=items,
+        next_cursor=encode_cursor(items[-1]) if has_more else None
+    )
+
+
+def iter_transactions(
+    supabase: Client,
+    user_id: int,
+    category: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    page_size: int = 500,
+    cursor: Optional[str] = None
+) -> Iterator[Transaction]:
+    """
+    Lazily walk the (filtered) history from `cursor` to the end, page by
+    page, holding one page in memory at a time.
+    """
+    while True:
+        page = get_transaction_page(
+            supabase=supabase,
+            user_id=user_id,
+            limit=page_size,
+            cursor=cursor,
+            category=category,
+            start=start,
+            end=end
+        )
+        yield from page.items
+
+        if not page.next_cursor:
+            return
+        cursor = page.next_cursor
+
+
+# -----------------------------
+# Spending Summary
+# -----------------------------
+def get_spending_summary(
+    supabase: Client,
+    user_id: int,
+    categories: Optional[List[str]] = None
+) -> SpendingSummary:
+    """
+    Total, count and per-category totals of the user's transactions
+    (optionally only `categories`). The spending_summary function reads
+    them from the spending_totals running totals, one row per category.
+    """
+    try:
+        response = supabase.rpc(
+            "spending_summary",
+            {"p_user_id": user_id, "p_categories": categories}
+        ).execute()
+        return SpendingSummary(**(response.data or {}))
+    except Exception as e:
+        raise RuntimeError(f"Failed to get spending summary: {str(e)}")
+
+
+# -----------------------------
+# Get Total Spent
+# -----------------------------
+def get_total_spent(
+    supabase: Client,
+    user_id: int,
+    category: Optional[str] = None
+) -> float:
+    summary = get_spending_summary(
+        supabase=supabase,
+        user_id=user_id,
+        categories=[category] if category else None
+    )
+    return summary.total
@@ -0,0 +1,70 @@
+import threading
+from collections import Counter
+from typing import Callable, Dict
+
+
+# -----------------------------
+# Counter Groups
+# -----------------------------
+class CounterGroup:
+    """
+    Thread-safe named counters (e.g. hits per tier, batches per size).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[str(key)] += amount
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            return self._counts.get(str(key), 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_groups: Dict[str, CounterGroup] = {}
+_gauges: Dict[str, Callable[[], dict]] = {}
+_registry_lock = threading.Lock()
+
+
+def counter_group(name: str) -> CounterGroup:
+    """
+    Get (or create) the counter group registered under `name`.
+    """
+    with _registry_lock:
+        if name not in _groups:
+            _groups[name] = CounterGroup(name)
+        return _groups[name]
+
+
+def register_gauge(name: str, fn: Callable[[], dict]) -> None:
+    """
+    Register a callable that reports point-in-time values (queue depth, sizes).
+    """
+    with _registry_lock:
+        _gauges[name] = fn
+
+
+# -----------------------------
+# Snapshot
+# -----------------------------
+def snapshot_all() -> dict:
+    with _registry_lock:
+        groups = dict(_groups)
+        gauges = dict(_gauges)
+
+    return {
+        "counters": {name: group.snapshot() for name, group in groups.items()},
+        "gauges": {name: fn() for name, fn in gauges.items()},
+    }
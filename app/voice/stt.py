@@ -1,17 +1,40 @@
-import whisper
 import os
+from functools import lru_cache
+
+from app.ai.sidecar import get_inference_client, is_sidecar_mode
 from app.voice.audio_preprocess import preprocess_audio
 
-model = whisper.load_model("small")  # small > base for accents
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")  # small > base for accents
+
+
+@lru_cache(maxsize=1)
+def _load_model():
+    # Loaded lazily (and warmed at startup by app.ai.warmup) so importing
+    # this module does not block boot.
+    from app.ai.weights import has_whisper_cache, load_whisper_mmap
+
+    if has_whisper_cache(WHISPER_MODEL):
+        return load_whisper_mmap(WHISPER_MODEL)
+
+    import whisper
+
+    return whisper.load_model(WHISPER_MODEL)
 
 
 def transcribe_audio(audio_path: str) -> str:
     if not audio_path or not os.path.exists(audio_path):
         raise ValueError("Audio file does not exist")
 
+    if is_sidecar_mode():
+        return get_inference_client().transcribe(audio_path)
+
+    return _transcribe_local(audio_path)
+
+
+def _transcribe_local(audio_path: str) -> str:
     clean_audio = preprocess_audio(audio_path)
 
-    result = model.transcribe(
+    result = _load_model().transcribe(
         clean_audio,
         language="en",
         fp16=False,                 # REQUIRED on Windows
@@ -0,0 +1,65 @@
+import pytest
+
+from app.intent.amounts import normalize_amounts
+from app.intent.slots import extract_reminder_slots, extract_transaction_slots
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("two thousand five hundred", "2500"),
+    ("twenty five hundred", "2500"),
+    ("a hundred and fifty", "150"),
+    ("forty-five", "45"),
+    ("two point five lakh", "250000"),
+    ("nine lakh ninety nine thousand", "999000"),
+    ("spent 1,500 on food", "spent 1500 on food"),
+    ("rs 1,50,000", "150000"),
+    ("paid ₹250.50 for tea", "paid 250.5 for tea"),
+    ("paid rs.300 for fuel", "paid 300 for fuel"),
+    ("paid 300/- for fuel", "paid 300 for fuel"),
+    ("spent 500 rupees on food", "spent 500 on food"),
+    ("2.5k on shopping", "2500 on shopping"),
+    ("3 lakh rent", "300000 rent"),
+    ("12 hundred", "1200"),
+    ("2.5 thousand on rent", "2500 on rent"),
+    ("thousand two hundred", "1200"),
+    ("one fifty", "150"),
+    ("twelve ninety nine", "1299"),
+    ("paid one twenty five for lunch", "paid 125 for lunch"),
+    ("two hundred fifty five", "255"),
+    ("one point zero five", "1.05"),
+])
+def test_normalizes_amounts(text, expected):
+    assert normalize_amounts(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "hello how are you",
+    "one coffee for 50",
+    "someone paid 5",
+    "abc123 spent 45",
+    "what is the point",
+    "1,00",
+    "spent 12,345,67",
+    "thousands of reasons",
+])
+def test_leaves_other_text_alone(text):
+    assert normalize_amounts(text) == text
+
+
+def test_amounts_reach_slot_extraction():
+    assert extract_transaction_slots("spent two thousand five hundred on groceries")["amount"] == 2500
+    assert extract_transaction_slots("paid ₹250.50 for tea")["amount"] == 250.5
+    assert extract_transaction_slots("2.5k on shopping")["amount"] == 2500
+    assert extract_transaction_slots("one coffee for 50")["amount"] == 50
+    assert extract_transaction_slots("spent one fifty on tea")["amount"] == 150
+
+
+def test_bad_digit_grouping_is_not_an_amount():
+    assert extract_transaction_slots("spent 1,00 on food")["amount"] is None
+    assert extract_transaction_slots("spent 1,00,000 on rent")["amount"] == 100000
+
+
+def test_decimals_are_not_days():
+    assert extract_reminder_slots("remind me to pay rent on 5.")["day"] == 5
+    assert extract_reminder_slots("remind me to pay 2.5 on rent")["day"] is None
+    assert extract_reminder_slots("remind me to pay rent on fifteen")["day"] == 15
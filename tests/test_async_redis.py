@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+# app.cache builds its (lazily connecting) client at import
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+import pytest
+
+from app.cache import async_client
+
+
+class _Pipeline:
+    """Records queued commands; execute() is the single round-trip."""
+
+    def __init__(self, server):
+        self.server = server
+        self.queued = []
+
+    def set(self, key, value, ex=None):
+        self.queued.append(lambda: self.server.data.__setitem__(key, value) or True)
+
+    def incrby(self, key, amount):
+        def run():
+            self.server.data[key] = int(self.server.data.get(key, 0)) + amount
+            return self.server.data[key]
+        self.queued.append(run)
+
+    def expire(self, key, ttl):
+        self.queued.append(lambda: True)
+
+    async def execute(self):
+        self.server.round_trips += 1
+        return [command() for command in self.queued]
+
+
+class _Server:
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=False):
+        return _Pipeline(self)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = _Server()
+    monkeypatch.setattr(async_client, "_client", fake)
+    return fake
+
+
+def test_multi_key_helpers_use_one_round_trip_each(server):
+    asyncio.run(async_client.mset({"a": "1", "b": "2"}, ttl=60))
+    values = asyncio.run(async_client.mget(["a", "b", "c"]))
+    counts = asyncio.run(async_client.incr_many({"hits": 2, "misses": 1}, ttl=60))
+
+    assert values == {"a": "1", "b": "2", "c": None}
+    assert counts == {"hits": 2, "misses": 1}
+    assert server.round_trips == 3
+
+
+def test_pool_is_created_once_without_connecting(monkeypatch):
+    monkeypatch.setattr(async_client, "_client", None)
+
+    client = async_client.init_async_redis()
+    assert async_client.init_async_redis() is client
+    assert client.connection_pool.max_connections == async_client.POOL_SIZE
+
+    asyncio.run(async_client.close_async_redis())
+    with pytest.raises(RuntimeError):
+        async_client.get_async_redis()
+
+
+def test_normalizer_prefetch_is_one_mget(server):
+    from app.ai.cache import NormalizerCache
+
+    cache = NormalizerCache(version="test", use_redis=True)
+    server.data[cache.key("paid 40 for tea")] = "add expense 40 tea"
+
+    asyncio.run(cache.prefetch_async(["paid 40 for tea", "how much money is left"]))
+
+    assert server.round_trips == 1
+    assert cache.local.get(cache.key("paid 40 for tea")) == "add expense 40 tea"
@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("supabase")
+
+from app.services.balance import get_balance_snapshot
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _FakeSupabase:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return self
+
+    def execute(self):
+        return _Response(self.snapshot)
+
+
+def test_snapshot_is_one_rpc_call():
+    db = _FakeSupabase({
+        "budgets": [
+            {"id": 1, "category": "food", "limit": 1000, "spent": 1200, "remaining": -200},
+            {"id": 2, "category": "travel", "limit": 500, "spent": 0, "remaining": 500},
+        ],
+        "total_spent": 1350,
+        "transaction_count": 4,
+        "by_category": {"food": 1200, "shopping": 150},
+        "reminder_count": 2,
+    })
+
+    snapshot = get_balance_snapshot(supabase=db, user_id=3)
+
+    assert db.calls == [("balance_snapshot", {"p_user_id": 3})]
+    assert [b.category for b in snapshot.budgets] == ["food", "travel"]
+    assert snapshot.budgets[0].remaining == -200
+    assert (snapshot.transaction_count, snapshot.reminder_count) == (4, 2)
+
+
+def test_empty_snapshot():
+    snapshot = get_balance_snapshot(supabase=_FakeSupabase(None), user_id=3)
+
+    assert snapshot.budgets == []
+    assert snapshot.total_spent == 0
+
+
+def test_backfill_rebuilds_through_rpc():
+    from app.db.backfill_spending_totals import backfill_spending_totals
+
+    db = _FakeSupabase(12)
+
+    assert backfill_spending_totals(db, user_id=5) == 12
+    assert db.calls == [("rebuild_spending_totals", {"p_user_id": 5})]
+
+
+def test_expense_is_recorded_in_one_rpc_call():
+    from app.services.transactions import add_transaction
+
+    db = _FakeSupabase({
+        "transaction": {"id": 9, "user_id": 3, "category": "food", "amount": 300, "description": "spent 300 on food"},
+        "total": 1200,
+        "limit": 1000,
+        "warning": "exceeded",
+    })
+
+    txn = add_transaction(supabase=db, user_id=3, category="food", amount=300, description="spent 300 on food")
+
+    assert [name for name, _ in db.calls] == ["record_expense"]
+    assert txn.id == 9 and txn.amount == 300
+    assert txn.budget_warning == "WARNING: Budget exceeded! Limit: 1000.0, Total spent: 1200.00"
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from app.ai.batching import BatchingQueue
+
+
+def test_concurrent_submits_are_batched():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = BatchingQueue(batch_fn, max_batch_size=4, window_ms=50)
+    results = {}
+
+    def worker(n):
+        results[n] = batcher.submit(n)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {n: n * 2 for n in range(8)}
+    assert all(len(batch) <= 4 for batch in calls)
+    assert len(calls) < 8
+
+    stats = batcher.stats()
+    assert stats["items"] == 8
+    assert stats["batches"] == len(calls)
+
+
+def test_batch_errors_propagate_to_callers():
+    def batch_fn(items):
+        raise ValueError("model failed")
+
+    batcher = BatchingQueue(batch_fn, max_batch_size=2, window_ms=1)
+
+    with pytest.raises(ValueError):
+        batcher.submit("x")
+
+
+def test_close_fails_queued_items_and_stops_the_worker():
+    started = threading.Event()
+    release = threading.Event()
+
+    def batch_fn(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    batcher = BatchingQueue(batch_fn, max_batch_size=1, window_ms=0)
+    results = {}
+
+    def worker(n):
+        try:
+            results[n] = batcher.submit(n, timeout=5)
+        except RuntimeError as e:
+            results[n] = e
+
+    first = threading.Thread(target=worker, args=(1,))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=worker, args=(2,))
+    second.start()
+    while batcher.stats()["queue_depth"] < 1:
+        time.sleep(0.001)
+
+    batcher.close()
+    release.set()
+    first.join(5)
+    second.join(5)
+    batcher._worker.join(5)
+
+    assert results[1] == 1
+    assert isinstance(results[2], RuntimeError)
+    assert not batcher._worker.is_alive()
+    with pytest.raises(RuntimeError):
+        batcher.submit(3)
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        BatchingQueue(lambda items: items, max_batch_size=0)
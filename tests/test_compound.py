@@ -0,0 +1,271 @@
+import pytest
+
+from app.intent.compound import split_commands
+from app.intent.detector import Intent
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "spent 40 on tea and 300 on fuel and set travel budget to 5000",
+        ["spent 40 on tea", "300 on fuel", "set travel budget to 5000"],
+    ),
+    ("spent 40 on tea, 30 on coffee", ["spent 40 on tea", "30 on coffee"]),
+    ("spent 40 on tea, and then check balance", ["spent 40 on tea", "check balance"]),
+    ("check balance and spent 40 on tea", ["check balance", "spent 40 on tea"]),
+    # Conjunctions inside a single command are kept
+    ("spent 40 on bread and butter", ["spent 40 on bread and butter"]),
+    ("remind me to pay rent and internet on 5", ["remind me to pay rent and internet on 5"]),
+    ("paid a hundred and fifty for snacks", ["paid 150 for snacks"]),
+    ("", []),
+])
+def test_split_commands(text, expected):
+    assert split_commands(text) == expected
+
+
+def test_follow_up_commands_inherit_the_intent():
+    pytest.importorskip("dotenv")
+    from app.ai import router
+
+    results = router.route_commands("spent 40 on tea and 300 on fuel and set travel budget to 5000")
+
+    assert [r["intent"] for r in results] == [Intent.ADD_EXPENSE, Intent.ADD_EXPENSE, Intent.UPDATE_BUDGET]
+    assert [r["tier"] for r in results] == [router.TIER_RULES] * 3
+    assert results[1]["slots"]["category"] == "travel"
+    assert results[1]["slots"]["amount"] == 300
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.rows = None
+
+    def select(self, *args):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def in_(self, *args):
+        return self
+
+    def insert(self, rows):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, "insert" if self.rows is not None else "select"))
+        if self.rows is not None:
+            self.client.inserted.setdefault(self.table, []).extend(self.rows)
+            return _Response([{"id": i + 1, **row} for i, row in enumerate(self.rows)])
+        return _Response(self.client.data.get(self.table, []))
+
+
+class _FakeSupabase:
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+        self.inserted = {}
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        return _Rpc(self, name, params)
+
+
+class _Rpc:
+    """Evaluates spending_summary and record_expenses over the fake tables."""
+
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.client.calls.append(("rpc", self.name))
+        if self.name == "record_expenses":
+            return _Response([self._record(item) for item in self.params["p_items"]])
+
+        categories = self.params.get("p_categories")
+        rows = [
+            row for row in self.client.data.get("transactions", [])
+            if categories is None or row["category"] in categories
+        ]
+        by_category = {}
+        for row in rows:
+            by_category[row["category"]] = by_category.get(row["category"], 0) + row["amount"]
+        return _Response({"total": sum(by_category.values()), "count": len(rows), "by_category": by_category})
+
+    def _record(self, item):
+        transactions = self.client.data.setdefault("transactions", [])
+        row = {"id": len(transactions) + 1, "user_id": self.params["p_user_id"], **item}
+        transactions.append(row)
+
+        total = sum(t["amount"] for t in transactions if t["category"] == item["category"])
+        limit = next(
+            (b["limit"] for b in self.client.data.get("budgets", []) if b["category"] == item["category"]),
+            None,
+        )
+        warning = "exceeded" if limit is not None and total > limit else None
+        return {"transaction": row, "total": total, "limit": limit, "warning": warning}
+
+
+def test_add_transactions_batches_writes():
+    pytest.importorskip("supabase")
+    from app.services.transactions import add_transactions
+
+    db = _FakeSupabase({
+        "budgets": [{"id": 1, "user_id": 1, "category": "food", "limit": 100}],
+        "transactions": [{"category": "food", "amount": 50}],
+    })
+
+    transactions = add_transactions(supabase=db, user_id=1, items=[
+        {"category": "food", "amount": 30},
+        {"category": "travel", "amount": 300},
+        {"category": "food", "amount": 40},
+    ])
+
+    assert [t.amount for t in transactions] == [30, 300, 40]
+    assert transactions[0].budget_warning is None
+    assert "exceeded" in transactions[2].budget_warning
+    assert transactions[2].category_total == 120
+    assert db.calls == [("rpc", "record_expenses")]
+
+
+def test_total_spent_is_aggregated_by_the_database():
+    pytest.importorskip("supabase")
+    from app.services.transactions import get_spending_summary, get_total_spent
+
+    db = _FakeSupabase({"transactions": [
+        {"category": "food", "amount": 50},
+        {"category": "food", "amount": 25},
+        {"category": "travel", "amount": 300},
+    ]})
+
+    assert get_total_spent(supabase=db, user_id=1, category="food") == 75
+    summary = get_spending_summary(supabase=db, user_id=1)
+    assert (summary.total, summary.count) == (375, 3)
+    assert summary.by_category == {"food": 75, "travel": 300}
+    assert db.calls == [("rpc", "spending_summary")] * 2
+
+
+class _Upsert(_Query):
+    def __init__(self, client, table):
+        super().__init__(client, table)
+        self.upserted = None
+
+    def upsert(self, rows, on_conflict=""):
+        self.upserted = rows
+        return self
+
+    def execute(self):
+        if self.upserted is None:
+            return super().execute()
+        self.client.calls.append((self.table, "upsert"))
+        return _Response([{"id": i + 1, **row} for i, row in enumerate(self.upserted)])
+
+
+def test_set_budgets_is_one_upsert(monkeypatch):
+    pytest.importorskip("supabase")
+    from app.services import budgets
+
+    db = _FakeSupabase({"budgets": [{"category": "food"}]})
+    monkeypatch.setattr(db, "table", lambda name: _Upsert(db, name))
+
+    result = budgets.set_budgets(supabase=db, user_id=1, limits={"food": 5000, "travel": 2000})
+
+    assert [(b.category, b.limit) for b in result] == [("food", 5000), ("travel", 2000)]
+    assert db.calls == [("budgets", "select"), ("budgets", "upsert"), ("audit_logs", "insert")]
+    # Creates and updates keep their audit actions
+    assert [(row["action"], row["details"]) for row in db.inserted["audit_logs"]] == [
+        ("UPDATE_BUDGET", "food budget set to 5000.0"),
+        ("CREATE_BUDGET", "travel budget set to 2000.0"),
+    ]
+
+
+def test_compound_budget_updates_invalidate_the_lexicon_once(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("dotenv")
+    from app import main
+
+    invalidated = []
+    db = _FakeSupabase({})
+    monkeypatch.setattr(db, "table", lambda name: _Upsert(db, name))
+    monkeypatch.setattr(main, "invalidate_user_lexicon", invalidated.append)
+    commands = [
+        {
+            "text": f"set {category} budget to {limit}",
+            "intent": Intent.UPDATE_BUDGET,
+            "tier": "rules",
+            "slots": {"category": category, "limit": limit},
+        }
+        for category, limit in (("food", 5000), ("pets", 800))
+    ]
+
+    results = main._execute_commands(commands, user_id=3, db=db)
+
+    assert [r["status"] for r in results] == ["success", "success"]
+    assert invalidated == [3]
+
+
+def test_create_reminders_is_one_insert():
+    pytest.importorskip("supabase")
+    from app.services.reminders import create_reminders
+
+    db = _FakeSupabase({})
+
+    reminders = create_reminders(supabase=db, user_id=1, items=[
+        {"name": "rent", "day": 5},
+        {"name": "internet bill", "day": 12, "frequency": "weekly"},
+    ])
+
+    assert [(r.name, r.day, r.frequency) for r in reminders] == [
+        ("rent", 5, "monthly"),
+        ("internet bill", 12, "weekly"),
+    ]
+    assert db.calls == [("reminders", "insert"), ("audit_logs", "insert")]
+
+
+def test_create_reminders_validates_every_day_before_writing():
+    pytest.importorskip("supabase")
+    from app.services.reminders import create_reminders
+
+    db = _FakeSupabase({})
+
+    with pytest.raises(ValueError):
+        create_reminders(supabase=db, user_id=1, items=[
+            {"name": "rent", "day": 5},
+            {"name": "internet bill", "day": 30},
+        ])
+    assert db.calls == []
+
+
+def test_compound_reminders_are_created_together():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("dotenv")
+    from app.main import _execute_commands
+
+    db = _FakeSupabase({})
+    commands = [
+        {
+            "text": text,
+            "intent": Intent.CREATE_REMINDER,
+            "tier": "rules",
+            "slots": {"name": name, "day": day, "frequency": "monthly"},
+        }
+        for text, name, day in (
+            ("remind me to pay rent on 5", "rent", 5),
+            ("internet on 12", "internet bill", 12),
+        )
+    ]
+
+    results = _execute_commands(commands, user_id=1, db=db)
+
+    assert [(r["status"], r["name"]) for r in results] == [("success", "rent"), ("success", "internet bill")]
+    assert db.calls == [("reminders", "insert"), ("audit_logs", "insert")]
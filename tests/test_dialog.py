@@ -0,0 +1,182 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app.ai import dialog, router
+from app.intent.detector import Intent
+from app.intent.state import is_state_complete
+from tests.test_grammar import constrained_parser  # noqa: F401
+
+
+class _MemoryStore:
+    """Dict-backed stand-in with the state_store interface."""
+
+    def __init__(self):
+        self.states = {}
+        self.clears = 0
+
+    def get_state(self, user_id):
+        return self.states.get(user_id)
+
+    def save_state(self, user_id, state):
+        self.states[user_id] = {"intent": state["intent"], "slots": dict(state["slots"])}
+
+    def merge_state(self, user_id, slots, intent=None, required=()):
+        state = self.states.get(user_id)
+        if not state or not state.get("intent"):
+            return None
+        state["slots"].update({k: v for k, v in slots.items() if v is not None})
+        if required and all(name in state["slots"] for name in required):
+            del self.states[user_id]
+        return {"intent": state["intent"], "slots": dict(state["slots"])}
+
+    def clear_state(self, user_id):
+        self.clears += 1
+        self.states.pop(user_id, None)
+
+    async def get_state_async(self, user_id):
+        return self.get_state(user_id)
+
+    async def save_state_async(self, user_id, state):
+        self.save_state(user_id, state)
+
+    async def merge_state_async(self, user_id, slots, intent=None, required=()):
+        return self.merge_state(user_id, slots, intent, required)
+
+    async def clear_state_async(self, user_id):
+        self.clear_state(user_id)
+
+
+@pytest.fixture
+def memory_store(monkeypatch):
+    memory = _MemoryStore()
+    monkeypatch.setattr(dialog, "_store", lambda: memory)
+    return memory
+
+
+@pytest.fixture
+def store(memory_store, monkeypatch):
+    monkeypatch.setattr(router, "normalize_command", lambda text: text)
+    return memory_store
+
+
+def test_follow_up_fills_missing_amount(store):
+    first = dialog.route_turn("spent on groceries", user_id=7)[0]
+
+    assert first["intent"] == Intent.ADD_EXPENSE
+    assert first["missing"] == ["amount"]
+    assert store.states[7]["slots"]["category"] == "food"
+
+    second = dialog.route_turn("500", user_id=7)[0]
+
+    assert second["tier"] == dialog.TIER_STATE
+    assert second["intent"] == Intent.ADD_EXPENSE
+    assert second["slots"]["amount"] == 500
+    assert second["slots"]["category"] == "food"
+    assert "missing" not in second
+    assert 7 not in store.states
+
+
+def test_follow_up_does_not_overwrite_filled_slots(store):
+    dialog.route_turn("set budget to 4000", user_id=8)
+
+    result = dialog.route_turn("for food, 9000", user_id=8)[0]
+
+    assert result["slots"] == {"category": "food", "limit": 4000}
+
+
+def test_new_command_replaces_pending_state(store):
+    dialog.route_turn("spent on groceries", user_id=9)
+
+    result = dialog.route_turn("check balance", user_id=9)[0]
+
+    assert result["intent"] == Intent.CHECK_BALANCE
+    assert 9 not in store.states
+
+
+def test_complete_command_without_pending_state_does_not_clear(store):
+    dialog.route_turn("spent 40 on tea", user_id=14)
+    asyncio.run(dialog.route_turn_async("spent 40 on tea", user_id=14))
+    dialog.remember_turn(14, dialog.route_commands("spent 40 on tea")[0])
+
+    assert store.clears == 0
+
+
+def test_follow_up_through_constrained_parser(memory_store, constrained_parser):
+    first = dialog.route_turn("spent on groceries", user_id=15)[0]
+
+    assert first["tier"] == router.TIER_LLM
+    assert first["missing"] == ["amount"]
+    assert memory_store.states[15]["slots"]["category"] == "food"
+
+    second = dialog.route_turn("500", user_id=15)[0]
+
+    assert second["tier"] == dialog.TIER_STATE
+    assert second["slots"]["category"] == "food"
+    assert second["slots"]["amount"] == 500
+    assert 15 not in memory_store.states
+    assert memory_store.clears == 0  # deleted by the merge
+
+
+def test_follow_up_after_state_expired_is_routed_on_its_own(store, monkeypatch):
+    dialog.route_turn("spent on groceries", user_id=16)
+    pending = store.states[16]
+    monkeypatch.setattr(dialog, "_pending_state", lambda user_id: pending)
+    store.states.pop(16)  # TTL lapsed after the read
+
+    result = dialog.route_turn("500", user_id=16)[0]
+
+    assert result["tier"] != dialog.TIER_STATE
+    assert result["slots"].get("category") != "food"
+
+
+def test_async_turns_share_state_with_sync_turns(store):
+    first = asyncio.run(dialog.route_turn_async("spent on groceries", user_id=11))[0]
+    assert first["missing"] == ["amount"]
+
+    second = dialog.route_turn("500", user_id=11)[0]
+    assert second["tier"] == dialog.TIER_STATE
+    assert second["slots"]["category"] == "food"
+    assert second["slots"]["amount"] == 500
+    assert 11 not in store.states
+
+
+def test_async_routing_does_not_block_the_event_loop(store, monkeypatch):
+    def slow_llm(text):
+        time.sleep(0.2)
+        return text
+
+    monkeypatch.setattr(router, "normalize_command", slow_llm)
+
+    async def two_turns():
+        return await asyncio.gather(
+            dialog.route_turn_async("spent on groceries", user_id=12),
+            dialog.route_turn_async("spent on fuel", user_id=13),
+        )
+
+    start = time.perf_counter()
+    asyncio.run(two_turns())
+
+    assert time.perf_counter() - start < 0.35
+
+
+def test_without_redis_turns_are_stateless(monkeypatch):
+    def unavailable():
+        raise RuntimeError("REDIS_URL is not set")
+
+    monkeypatch.setattr(dialog, "_store", unavailable)
+    monkeypatch.setattr(router, "normalize_command", lambda text: text)
+
+    result = dialog.route_turn("spent on groceries", user_id=10)[0]
+
+    assert result["intent"] == Intent.ADD_EXPENSE
+    assert "missing" not in result
+
+
+def test_transaction_state_needs_amount():
+    state = {"intent": Intent.ADD_EXPENSE, "slots": {"category": "food", "amount": 40}}
+    assert is_state_complete(state)
+    assert not is_state_complete({"intent": Intent.ADD_EXPENSE, "slots": {"category": "food"}})
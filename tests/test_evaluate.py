@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app.ai import evaluate
+from app.intent.detector import Intent
+
+
+CORPUS = [
+    {"text": "spent 40 on tea", "intent": Intent.ADD_EXPENSE, "slots": {"category": "food", "amount": 40}},
+    {"text": "check balance", "intent": Intent.CHECK_BALANCE, "slots": {}},
+]
+
+
+def test_metrics_from_a_fixed_predictor():
+    predictions = {
+        "spent 40 on tea": (Intent.ADD_EXPENSE, {"category": "travel", "amount": 40.0}),
+        "check balance": (Intent.UNKNOWN, {}),
+    }
+
+    result = evaluate.evaluate_tier(lambda text: predictions[text], CORPUS)
+
+    assert result["intent_accuracy"] == 0.5
+    assert result["slot_precision"] == 0.5
+    assert result["slot_recall"] == 0.5
+    assert result["slot_f1"] == 0.5
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert len(result["mistakes"]) == 2
+
+
+def test_predictor_errors_are_counted_not_raised():
+    def broken(text):
+        raise RuntimeError("model missing")
+
+    result = evaluate.evaluate_tier(broken, CORPUS)
+
+    assert result["intent_accuracy"] == 0.0
+    assert len(result["errors"]) == 2
+
+
+def test_bundled_corpus_report():
+    report = evaluate.run(tiers=("rules", "classifier"))
+
+    assert report["size"] == len(evaluate.load_corpus())
+    assert set(report["tiers"]) == {"rules", "classifier"}
+    assert report["tiers"]["classifier"]["batch_throughput_per_s"] > 0
+    assert report["tiers"]["rules"]["throughput_per_s"] > 0
+
+
+def test_cold_runs_bypass_the_normalizer_cache(monkeypatch):
+    from app.ai.cache import NormalizerCache
+
+    shared = NormalizerCache(version="test", use_redis=False)
+    shared.set("spent 40 on tea", "add expense 40 tea")
+
+    def get_cache():
+        return shared
+
+    monkeypatch.setattr(evaluate.normalizer, "_get_cache", get_cache)
+    seen = []
+
+    def predict(text):
+        cache = evaluate.normalizer._get_cache()
+        seen.append((cache, cache.get(text)))
+        cache.set(text, "add expense 40 tea")
+        raise RuntimeError("model missing")
+
+    evaluate.evaluate_tier(predict, CORPUS[:1] * 2)
+
+    assert [hit for _, hit in seen] == [None, None]
+    assert all(cache is not shared and not cache.use_redis for cache, _ in seen)
+    assert evaluate.normalizer._get_cache is get_cache
+    assert shared.version == "test"
+    assert len(shared.local) == 1
+
+
+def test_warm_runs_use_the_shared_normalizer_cache(monkeypatch):
+    from app.ai.cache import NormalizerCache
+
+    shared = NormalizerCache(version="test", use_redis=False)
+    shared.set("spent 40 on tea", "add expense 40 tea")
+    monkeypatch.setattr(evaluate.normalizer, "_get_cache", lambda: shared)
+    seen = []
+
+    def predict(text):
+        seen.append(evaluate.normalizer._get_cache().get(text))
+        return Intent.ADD_EXPENSE, {}
+
+    evaluate.evaluate_tier(predict, CORPUS[:1], warm=True)
+
+    assert seen == ["add expense 40 tea"]
@@ -0,0 +1,153 @@
+import pytest
+
+from app.ai.grammar import CommandGrammar, feed, initial_state, is_complete
+
+VOCAB = [
+    "<pad>", "</s>", "▁set", "▁food", "▁budget", "▁to", "▁6", "000",
+    "▁check", "▁balance", "▁add", "▁expense", "▁40", "▁tea", "▁remind",
+    "▁me", "▁pay", "▁rent", "▁on", "▁10", "Set", "!", "▁", "s", "et",
+    "▁unknown", "▁500",
+]
+IDS = {piece: i for i, piece in enumerate(VOCAB)}
+
+
+class FakeIds:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def tolist(self):
+        return self.ids
+
+
+def _allowed(grammar, *pieces):
+    prefix_fn = grammar.prefix_allowed_tokens_fn()
+    ids = [0] + [IDS[p] for p in pieces]
+    return {VOCAB[i] for i in prefix_fn(0, FakeIds(ids))}
+
+
+def test_complete_commands():
+    for text in [
+        "set food budget to 6000",
+        "add expense 40 tea",
+        "remind me to pay rent on 10",
+        "check balance",
+        "unknown",
+    ]:
+        assert is_complete(feed(initial_state(), text)), text
+
+
+def test_invalid_text_is_rejected():
+    assert not feed(initial_state(), "hello")
+    assert not feed(initial_state(), "set food budget  to")
+    assert not is_complete(feed(initial_state(), "set food budget to"))
+
+
+def test_first_token_must_start_a_command():
+    grammar = CommandGrammar(VOCAB, eos_token_id=1)
+    allowed = _allowed(grammar)
+
+    assert {"▁set", "▁check", "▁add", "▁remind", "▁unknown", "s"} <= allowed
+    assert not {"▁food", "Set", "!", "</s>"} & allowed
+
+
+def test_number_slot_can_continue_or_stop():
+    grammar = CommandGrammar(VOCAB, eos_token_id=1)
+    allowed = _allowed(grammar, "▁set", "▁food", "▁budget", "▁to", "▁6")
+
+    assert {"000", "</s>"} <= allowed
+    assert "▁food" not in allowed
+
+
+def test_generation_stops_when_command_is_complete():
+    grammar = CommandGrammar(VOCAB, eos_token_id=1)
+
+    assert _allowed(grammar, "▁check", "▁balance") == {"</s>"}
+
+
+def test_finished_sequences_only_pad():
+    grammar = CommandGrammar(VOCAB, eos_token_id=1)
+
+    assert _allowed(grammar, "▁check", "▁balance", "</s>") == {"<pad>", "</s>"}
+
+
+# -----------------------------
+# Constrained normalizer path
+# -----------------------------
+class HallucinatingBackend:
+    """
+    Greedy decoder over VOCAB that always prefers committing to an
+    expense with a made-up amount — the worst case for constrained
+    decoding. Only the grammar's allowed tokens can be picked.
+    """
+
+    SCRIPT = ["▁add", "▁expense", "▁500", "▁food", "</s>"]
+
+    def generate(self, prompts, num_beams=5, max_length=24, prefix_allowed_tokens_fn=None):
+        outputs = []
+        for batch_id in range(len(prompts)):
+            ids = [0]
+            while len(ids) < max_length:
+                allowed = prefix_allowed_tokens_fn(batch_id, FakeIds(ids))
+                wanted = IDS[self.SCRIPT[min(len(ids) - 1, len(self.SCRIPT) - 1)]]
+                token = wanted if wanted in allowed else allowed[0]
+                if token in (0, 1):
+                    break
+                ids.append(token)
+            outputs.append("".join(VOCAB[i] for i in ids[1:]).replace("▁", " ").strip())
+        return outputs
+
+
+@pytest.fixture
+def constrained_parser(monkeypatch):
+    pytest.importorskip("dotenv")
+    from app.ai import parser
+    from app.ai.cache import NormalizerCache
+
+    backend = HallucinatingBackend()
+    grammar = CommandGrammar(VOCAB, eos_token_id=1)
+    cache = NormalizerCache(version="test", use_redis=False)
+
+    monkeypatch.setattr(parser, "CONSTRAINED_DECODING", True)
+    monkeypatch.setattr(parser, "MAX_BATCH_SIZE", 1)
+    monkeypatch.setattr(parser, "_get_backend", lambda: backend)
+    monkeypatch.setattr(parser, "_get_grammar", lambda: grammar)
+    monkeypatch.setattr(parser, "_get_cache", lambda: cache)
+    return parser
+
+
+def test_ungrounded_amount_is_rejected(constrained_parser):
+    assert constrained_parser.normalize_command("spent on groceries") == "spent on groceries"
+    assert constrained_parser.normalize_command("spent five hundred on food") == "add expense 500 food"
+
+
+def test_slotless_utterance_keeps_amount_missing(constrained_parser):
+    from app.ai import router
+    from app.intent.detector import Intent
+
+    result = router.route_command("spent on groceries")
+
+    assert result["tier"] == router.TIER_LLM
+    assert result["intent"] == Intent.ADD_EXPENSE
+    assert router.missing_slots(result["intent"], result["slots"]) == ["amount"]
+
+
+def test_flan_t5_abstains_on_slotless_utterance(monkeypatch):
+    pytest.importorskip("dotenv")
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from app.ai import parser
+    from app.ai.cache import NormalizerCache
+
+    try:
+        transformers.AutoConfig.from_pretrained(parser.MODEL_NAME, local_files_only=True)
+    except OSError:
+        pytest.skip(f"{parser.MODEL_NAME} is not downloaded")
+
+    cache = NormalizerCache(version="test", use_redis=False)
+    monkeypatch.setattr(parser, "CONSTRAINED_DECODING", True)
+    monkeypatch.setattr(parser, "MAX_BATCH_SIZE", 1)
+    monkeypatch.setattr(parser, "_get_cache", lambda: cache)
+
+    command = parser.normalize_command("spent on groceries")
+
+    assert not any(ch.isdigit() for ch in command)
@@ -0,0 +1,45 @@
+import numpy as np
+
+from app.intent.classifier import IntentClassifier, get_classifier, load_examples
+from app.intent.detector import Intent
+
+
+def test_bundled_model_fits_its_training_data():
+    texts, labels = load_examples()
+    predictions = get_classifier().predict_batch(texts)
+
+    accuracy = np.mean([p.intent == label for p, label in zip(predictions, labels)])
+    assert accuracy >= 0.95
+
+
+def test_generalises_beyond_keywords():
+    classifier = get_classifier()
+
+    assert classifier.predict("i purchased a book for 250").intent == Intent.ADD_EXPENSE
+    assert classifier.predict("limit groceries to 3000").intent == Intent.UPDATE_BUDGET
+    assert classifier.predict("how much do i have").intent == Intent.CHECK_BALANCE
+    assert classifier.predict("hey there").intent == Intent.UNKNOWN
+
+
+def test_batch_scores_match_single_scores():
+    classifier = get_classifier()
+    texts = ["spent 40 on tea", "remind me to pay rent on 1", "", "what's my balance"]
+
+    batch = classifier.predict_proba_batch(texts)
+    single = np.stack([classifier.predict_proba(text) for text in texts])
+
+    np.testing.assert_allclose(batch, single, rtol=1e-5, atol=1e-6)
+    assert [p.intent for p in classifier.predict_batch(texts)] == [
+        classifier.predict(text).intent for text in texts
+    ]
+
+
+def test_confidence_is_a_probability():
+    classifier = IntentClassifier(n_features=256).fit(
+        ["spent 10 on food", "check my balance"],
+        [Intent.ADD_EXPENSE, Intent.CHECK_BALANCE],
+    )
+    prediction = classifier.predict("spent 20 on food")
+
+    assert prediction.intent == Intent.ADD_EXPENSE
+    assert 0.0 < prediction.confidence <= 1.0
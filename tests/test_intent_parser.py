@@ -0,0 +1,109 @@
+import pytest
+
+from app.intent.bench import (
+    legacy_detect_intent,
+    legacy_extract_budget_slots,
+    legacy_extract_reminder_slots,
+    legacy_extract_transaction_slots,
+)
+from app.intent.detector import Intent, detect_intent, parse_utterance
+from app.intent.slots import (
+    extract_budget_slots,
+    extract_reminder_slots,
+    extract_transaction_slots,
+)
+
+UTTERANCES = [
+    "I spent 250 on food",
+    "paid 40 for tea",
+    "spent 300 on petrol",
+    "set food budget to 6000",
+    "set entertainment limit to 1500",
+    "remind me to pay the internet bill on 3",
+    "reminder for credit card weekly on 15",
+    "how much balance left",
+    "how much money left",
+    "add expense 12345678 rent",
+    "abc123 spent 45 on shopping",
+    "the rent_2 is 99",
+    "",
+    "hello how are you",
+]
+
+
+def _assert_superset(new, legacy):
+    # The lexicon knows more categories than the old if/elif chains, so a
+    # category may now be found where the legacy code found none
+    if legacy["category"] is None:
+        new = {**new, "category": None}
+    assert new == legacy
+
+
+@pytest.mark.parametrize("text", UTTERANCES)
+def test_matches_legacy_implementation(text):
+    assert detect_intent(text) == legacy_detect_intent(text)
+    _assert_superset(extract_budget_slots(text), legacy_extract_budget_slots(text))
+    _assert_superset(extract_transaction_slots(text), legacy_extract_transaction_slots(text))
+    assert extract_reminder_slots(text) == legacy_extract_reminder_slots(text)
+
+
+def test_single_parse_returns_all_slots():
+    parsed = parse_utterance("remind me to pay rent weekly on 10")
+
+    assert parsed.intent == Intent.CREATE_REMINDER
+    assert parsed.reminder_name == "rent"
+    assert parsed.day == 10
+    assert parsed.amount == 10
+    assert parsed.frequency == "weekly"
+
+
+def test_keywords_match_words_not_substrings():
+    # The old substring checks read "instead" as tea and "parent" as rent
+    assert extract_transaction_slots("paid 40 instead")["category"] is None
+    assert extract_reminder_slots("remind me to call my parent on 5")["name"] is None
+
+
+def test_keyword_inflections():
+    assert detect_intent("show my expenses") == Intent.ADD_EXPENSE
+    assert detect_intent("budgets for this month") == Intent.UPDATE_BUDGET
+
+
+def _corpus():
+    import json
+    import os
+
+    from app.intent import bench
+
+    texts = [*UTTERANCES, *bench.CORPUS, *bench.AMOUNT_CORPUS]
+    data = os.path.join(os.path.dirname(bench.__file__), "data", "intents.jsonl")
+    with open(data) as f:
+        texts += [json.loads(line)["text"] for line in f if line.strip()]
+    texts += [
+        "paid 500 for house rent",
+        "how much money left",
+        "remind me about the credit card on 12",
+        "spent 300 on petrols and food",
+        "paid 20 for pencils",
+        "my rent is 15000 and due on the 1st",
+        "paid 40 on the 2nd for petrl",
+        "food and then house rent of 500",
+        "money money left",
+    ]
+    return [text.lower() for text in texts]
+
+
+def test_plain_fast_path_matches_full_scan():
+    from app.intent.detector import _scan, _scan_plain
+    from app.intent.lexicon import get_default_lexicon
+
+    lexicons = [get_default_lexicon(), get_default_lexicon().with_categories(["pets", "house rent"])]
+    fast = 0
+
+    for lexicon in lexicons:
+        for text in _corpus():
+            scanned = _scan_plain(text, lexicon)
+            if scanned is not None:
+                fast += 1
+                assert scanned == _scan(text, lexicon), text
+
+    assert fast > len(_corpus())  # most utterances take the fast path
@@ -0,0 +1,154 @@
+import gc
+import weakref
+
+import pytest
+
+from app.intent import lexicon as lexicon_module
+from app.intent.detector import parse_utterance
+from app.intent.lexicon import CategoryLexicon, get_default_lexicon, get_user_lexicon
+from app.intent.slots import extract_budget_slots, extract_transaction_slots
+
+
+def test_synonyms_resolve_to_categories():
+    assert extract_transaction_slots("bought a pen for 20")["category"] == "education"
+    assert extract_transaction_slots("spent 800 on groceries")["category"] == "food"
+    assert extract_transaction_slots("paid 250 for uber")["category"] == "travel"
+    assert extract_transaction_slots("paid 99 for house rent")["category"] == "rent"
+
+
+def test_first_category_in_utterance_wins():
+    assert parse_utterance("spent 300 on petrol and food").category == "travel"
+
+
+def test_fuzzy_match_tolerates_typos():
+    assert extract_transaction_slots("spent 300 on grocereis")["category"] == "food"
+    assert extract_transaction_slots("paid 500 for petrl")["category"] == "travel"
+    assert extract_transaction_slots("spent 50 on nothing much")["category"] is None
+
+
+def test_canonical_form_accepts_unknown_category():
+    assert extract_transaction_slots("add expense 40 stickers")["category"] == "stickers"
+    assert extract_budget_slots("set my budget to 500")["category"] is None
+
+
+def test_user_categories_extend_the_lexicon():
+    lexicon = get_default_lexicon().with_categories(["gardening"])
+
+    assert extract_budget_slots("set gardening budget to 900")["category"] == "gardening"
+    assert extract_transaction_slots("spent 90 on gardening", lexicon)["category"] == "gardening"
+    assert extract_transaction_slots("spent 90 on gardenng", lexicon)["category"] == "gardening"
+    assert extract_transaction_slots("spent 90 on gardening")["category"] is None
+
+
+def test_user_lexicon_is_freed_with_its_parses():
+    lexicon = get_default_lexicon().with_categories(["gardening"])
+    assert parse_utterance("spent 90 on gardening", lexicon).category == "gardening"
+
+    ref = weakref.ref(lexicon)
+    del lexicon
+    gc.collect()
+    assert ref() is None
+
+
+def test_user_categories_win_over_default_synonyms():
+    lexicon = get_default_lexicon().with_categories(["groceries", "pets", "pen"])
+
+    assert extract_transaction_slots("spent 50 on groceries", lexicon)["category"] == "groceries"
+    assert extract_transaction_slots("spent 50 on pet food", lexicon)["category"] == "pets"
+    assert extract_budget_slots("set pen budget to 23", lexicon)["category"] == "pen"
+    # Other synonyms of the default category are unaffected
+    assert extract_transaction_slots("bought a pencil for 20", lexicon)["category"] == "education"
+
+
+class _Budget:
+    def __init__(self, category):
+        self.category = category
+
+
+def test_user_lexicon_is_cached_until_invalidated(monkeypatch):
+    pytest.importorskip("supabase")
+    import app.services.budgets as budgets
+
+    calls = []
+
+    def fake_get_all_budgets(supabase, user_id):
+        calls.append(user_id)
+        return [_Budget("pets")]
+
+    monkeypatch.setattr(budgets, "get_all_budgets", fake_get_all_budgets)
+    monkeypatch.setattr(lexicon_module, "_near_cache", lambda: None)
+    lexicon_module.invalidate_user_lexicon(42)
+
+    first = get_user_lexicon(None, 42)
+    assert get_user_lexicon(None, 42) is first
+    assert first.exact("pets") == "pets"
+    assert calls == [42]
+
+    lexicon_module.invalidate_user_lexicon(42)
+    get_user_lexicon(None, 42)
+    assert calls == [42, 42]
+
+
+def test_user_lexicon_keeps_colliding_budget_names(monkeypatch):
+    pytest.importorskip("supabase")
+    import app.services.budgets as budgets
+
+    monkeypatch.setattr(
+        budgets, "get_all_budgets",
+        lambda supabase, user_id: [_Budget("groceries"), _Budget("pets"), _Budget("pen"), _Budget("food")],
+    )
+    monkeypatch.setattr(lexicon_module, "_near_cache", lambda: None)
+    lexicon_module.invalidate_user_lexicon(44)
+
+    lexicon = get_user_lexicon(None, 44)
+
+    assert extract_transaction_slots("spent 50 on groceries", lexicon)["category"] == "groceries"
+    assert extract_transaction_slots("spent 50 on pet food", lexicon)["category"] == "pets"
+    assert extract_budget_slots("set pen budget to 23", lexicon)["category"] == "pen"
+    assert extract_transaction_slots("spent 50 on lunch", lexicon)["category"] == "food"
+
+
+def test_invalidation_reaches_other_workers(monkeypatch):
+    pytest.importorskip("supabase")
+    import app.services.budgets as budgets
+    from tests.test_near_cache import _Bus  # sets a (lazy) REDIS_URL first
+    from app.cache.near_cache import NearCache
+
+    calls = []
+
+    def fake_get_all_budgets(supabase, user_id):
+        calls.append(user_id)
+        return [_Budget("pets")]
+
+    bus = _Bus()
+    worker_a = NearCache(bus, lexicon_module.LEXICON_INVALIDATION_CHANNEL, "lexicon_a", 10, 60)
+    worker_b = NearCache(bus, lexicon_module.LEXICON_INVALIDATION_CHANNEL, "lexicon_b", 10, 60)
+    monkeypatch.setattr(budgets, "get_all_budgets", fake_get_all_budgets)
+
+    monkeypatch.setattr(lexicon_module, "_near_cache", lambda: worker_b)
+    first = get_user_lexicon(None, 45)
+    assert get_user_lexicon(None, 45) is first
+
+    # A budget change handled by another worker
+    monkeypatch.setattr(lexicon_module, "_near_cache", lambda: worker_a)
+    lexicon_module.invalidate_user_lexicon(45)
+
+    monkeypatch.setattr(lexicon_module, "_near_cache", lambda: worker_b)
+    assert get_user_lexicon(None, 45) is not first
+    assert calls == [45, 45]
+
+
+def test_lookups_stay_fast_with_thousands_of_categories():
+    import time
+
+    synonyms = {f"category{i}": [f"term{i}x", f"word{i}y"] for i in range(5000)}
+    lexicon = CategoryLexicon(synonyms)
+
+    start = time.perf_counter()
+    for i in range(200):
+        lexicon.exact(f"term{i}x")
+        lexicon.fuzzy(f"wrd{i}y")
+    per_lookup = (time.perf_counter() - start) / 200
+
+    assert lexicon.exact("term7x") == "category7"
+    assert per_lookup < 1e-3
@@ -0,0 +1,161 @@
+import os
+
+# app.cache builds its (lazily connecting) client at import
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+from app.cache import near_cache
+from app.cache.near_cache import MISSING, NearCache
+
+
+class _Bus:
+    """
+    Stands in for Redis pub/sub: publish delivers to every subscriber
+    synchronously.
+    """
+
+    def __init__(self):
+        self.handlers = []
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return _PubSub(self)
+
+    def publish(self, channel, message):
+        for name, handler in self.handlers:
+            if name == channel:
+                handler({"type": "message", "channel": channel, "data": message})
+        return len(self.handlers)
+
+
+class _PubSub:
+    def __init__(self, bus):
+        self.bus = bus
+        self.connection = _Connection()
+        self.exception_handler = None
+
+    def subscribe(self, **handlers):
+        self.bus.handlers.extend(handlers.items())
+
+    def run_in_thread(self, sleep_time=1.0, daemon=True, exception_handler=None):
+        self.exception_handler = exception_handler
+        return object()
+
+    def fail(self, error):
+        """What the listener thread does when get_message raises."""
+        self.exception_handler(error, self, None)
+
+
+class _Connection:
+    def __init__(self):
+        self.failures = 0
+
+    def connect(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection refused")
+
+
+class _RecordingBus(_Bus):
+    def pubsub(self, ignore_subscribe_messages=True):
+        self.last = _PubSub(self)
+        return self.last
+
+
+class _BrokenRedis:
+    def pubsub(self, ignore_subscribe_messages=True):
+        raise ConnectionError("connection refused")
+
+    def publish(self, channel, message):
+        raise ConnectionError("connection refused")
+
+
+def _cache(redis, name="test_near_cache"):
+    cache = NearCache(redis, "state:invalidate", name, maxsize=10, ttl=60)
+    cache.stats.reset()
+    return cache
+
+
+def test_hits_misses_and_negative_entries():
+    cache = _cache(_Bus())
+
+    assert cache.get(1) is MISSING
+    cache.set(1, None, cache.generation())
+    assert cache.get(1) is None
+
+    report = cache.report()
+    assert report["enabled"] and report["size"] == 1
+    assert report["hit_ratio"] == 0.5
+    assert report["approx_bytes"] > 0
+
+
+def test_writes_invalidate_other_workers_only():
+    bus = _Bus()
+    a, b = _cache(bus, "near_a"), _cache(bus, "near_b")
+    a.get(7), b.get(7)
+
+    state = {"intent": "add_transaction", "slots": {"amount": 500}}
+    a.set(7, None, a.generation())
+    b.set(7, None, b.generation())
+    a.written(7, state)
+
+    assert a.get(7) == state
+    assert b.get(7) is MISSING
+    assert b.stats.get("remote_invalidation") == 1
+
+
+def test_read_racing_an_invalidation_is_not_cached():
+    bus = _Bus()
+    a, b = _cache(bus, "near_a"), _cache(bus, "near_b")
+    a.get(7), b.get(7)
+
+    generation = b.generation()
+    a.written(7, {"intent": "check_balance", "slots": {}})
+    b.set(7, None, generation)
+
+    assert b.get(7) is MISSING
+
+
+def test_disables_itself_without_pubsub():
+    cache = _cache(_BrokenRedis())
+
+    assert cache.get(1) is MISSING
+    cache.set(1, {"intent": "check_balance", "slots": {}}, cache.generation())
+    cache.written(1)
+
+    assert cache.get(1) is MISSING
+    assert not cache.report()["enabled"]
+    assert cache.stats.get("publish_error") == 1
+
+
+def test_reconnects_with_backoff_and_starts_over_empty(monkeypatch):
+    delays = []
+    monkeypatch.setattr(near_cache.time, "sleep", delays.append)
+    bus = _RecordingBus()
+    cache = _cache(bus)
+    cache.get(1)
+    cache.set(1, {"intent": "check_balance", "slots": {}}, cache.generation())
+    pubsub = bus.last
+
+    # Redis stays down for two attempts
+    pubsub.connection.failures = 3
+    for _ in range(3):
+        pubsub.fail(ConnectionError("connection lost"))
+        generation = cache.generation()
+        cache.set(2, None, generation)
+        assert cache.get(1) is MISSING
+        assert not cache.report()["connected"]
+
+    pubsub.fail(ConnectionError("connection lost"))
+
+    assert delays == [0.5, 1.0, 2.0, 4.0]
+    assert cache.report()["connected"]
+    # Invalidations sent while disconnected were missed
+    assert cache.report()["size"] == 0
+    assert cache.get(1) is MISSING
+    cache.set(1, None, generation)  # read started before the reconnect
+    assert cache.get(1) is MISSING
+    assert cache.stats.get("listener_error") == 1
+    assert cache.stats.get("reconnect") == 1
+
+    # Backoff starts over after a successful reconnect
+    pubsub.fail(ConnectionError("connection lost"))
+    assert delays[-1] == 0.5
@@ -0,0 +1,87 @@
+import time
+
+from app.ai.cache import NormalizerCache, canonicalize
+from app.utils.lru import LRUCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def mget(self, keys):
+        self.mgets = getattr(self, "mgets", 0) + 1
+        return [self.store.get(key) for key in keys]
+
+
+def _cache(version="v1", redis=None, **kwargs):
+    cache = NormalizerCache(version=version, use_redis=redis is not None, **kwargs)
+    cache._redis = redis
+    cache._redis_checked = True
+    return cache
+
+
+def test_canonicalize():
+    assert canonicalize("  Check   Balance?! ") == "check balance"
+
+
+def test_local_hit_after_set():
+    cache = _cache()
+    assert cache.get("check balance") is None
+
+    cache.set("check balance", "check balance")
+    assert cache.get("Check balance.") == "check balance"
+
+
+def test_redis_tier_is_shared_between_instances():
+    redis = FakeRedis()
+    writer = _cache(redis=redis)
+    reader = _cache(redis=redis)
+
+    writer.set("how much money is left", "check balance")
+
+    assert reader.get("how much money is left") == "check balance"
+    # Promoted into the reader's local tier
+    redis.store.clear()
+    assert reader.get("how much money is left") == "check balance"
+
+
+def test_version_change_invalidates_entries():
+    redis = FakeRedis()
+    _cache(version="v1", redis=redis).set("paid 40 for tea", "add expense 40 tea")
+
+    assert _cache(version="v2", redis=redis).get("paid 40 for tea") is None
+
+
+def test_prefetch_reads_a_stage_in_one_round_trip():
+    redis = FakeRedis()
+    writer = _cache(redis=redis)
+    writer.set("paid 40 for tea", "add expense 40 tea")
+    writer.set("how much money is left", "check balance")
+
+    reader = _cache(redis=redis)
+    reader.prefetch(["paid 40 for tea", "how much money is left", "hello there"])
+    redis.store.clear()
+
+    assert redis.mgets == 1
+    assert reader.get("paid 40 for tea") == "add expense 40 tea"
+    assert reader.get("how much money is left") == "check balance"
+
+
+def test_lru_eviction_and_ttl():
+    lru = LRUCache(maxsize=2, ttl=0.05)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+
+    assert "b" not in lru
+    assert lru.get("a") == 1
+
+    time.sleep(0.06)
+    assert lru.get("a") is None
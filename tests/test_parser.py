@@ -0,0 +1,107 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app.ai import parser
+from app.ai.grammar import ABSTAIN
+
+
+@pytest.fixture
+def generate(monkeypatch):
+    """
+    Stub model: invalid output at greedy decoding for texts containing
+    "hard", a valid command at 5 beams, and nothing valid for "hopeless".
+    """
+    calls = []
+
+    def fake_generate(texts, num_beams=5):
+        calls.append((list(texts), num_beams))
+        outputs = []
+        for text in texts:
+            if "hopeless" in text.lower():
+                outputs.append("add expense lots")
+            elif "nothing" in text:
+                outputs.append(ABSTAIN)
+            elif "hard" in text and num_beams == 1:
+                outputs.append("add expense 40")
+            else:
+                outputs.append("add expense 40 tea")
+        return outputs
+
+    monkeypatch.setattr(parser, "DECODING_LADDER", [1, 5])
+    monkeypatch.setattr(parser, "_generate_commands", fake_generate)
+    return calls
+
+
+def _counts():
+    return parser._decode_levels.snapshot()
+
+
+def _delta(before, key):
+    return _counts().get(key, 0) - before.get(key, 0)
+
+
+def test_only_invalid_outputs_escalate(generate):
+    before = _counts()
+
+    commands = parser._normalize_batch(["spent 40 on tea", "hard: spent 40 on tea"])
+
+    assert commands == ["add expense 40 tea", "add expense 40 tea"]
+    assert generate == [
+        (["spent 40 on tea", "hard: spent 40 on tea"], 1),
+        (["hard: spent 40 on tea"], 5),
+    ]
+    assert _delta(before, "level_0_beams_1") == 1
+    assert _delta(before, "level_1_beams_5") == 1
+    assert _delta(before, "fallback") == 0
+
+
+def test_valid_greedy_output_skips_beam_search(generate):
+    assert parser._normalize_batch(["spent 40 on tea"]) == ["add expense 40 tea"]
+    assert [beams for _, beams in generate] == [1]
+
+
+def test_texts_failing_every_level_fall_back_to_raw_text(generate):
+    before = _counts()
+
+    commands = parser._normalize_batch(["Hopeless 40 On Tea ", "spent 40 on tea"])
+
+    assert commands == ["hopeless 40 on tea", "add expense 40 tea"]
+    assert generate == [
+        (["Hopeless 40 On Tea ", "spent 40 on tea"], 1),
+        (["Hopeless 40 On Tea "], 5),
+    ]
+    assert _delta(before, "fallback") == 1
+    assert _delta(before, "level_0_beams_1") == 1
+
+
+def test_ungrounded_output_escalates(generate):
+    # "add expense 40 tea" is valid but 40 was never said
+    before = _counts()
+
+    assert parser._normalize_batch(["spent on tea"]) == ["spent on tea"]
+    assert [beams for _, beams in generate] == [1, 5]
+    assert _delta(before, "fallback") == 1
+
+
+def test_abstention_does_not_escalate(generate):
+    before = _counts()
+
+    assert parser._normalize_batch(["nothing to see"]) == ["nothing to see"]
+    assert [beams for _, beams in generate] == [1]
+    assert _delta(before, "abstain") == 1
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1,5", [1, 5]),
+    (" 1 , 3 ,5 ", [1, 3, 5]),
+    ("4,", [4]),
+])
+def test_decoding_ladder_setting(value, expected):
+    assert parser._parse_decoding_ladder(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0", "1,0", "1,five", "1.5", "-1", "", " , "])
+def test_decoding_ladder_rejects_bad_settings(value):
+    with pytest.raises(ValueError, match="NORMALIZER_DECODING_LADDER"):
+        parser._parse_decoding_ladder(value)
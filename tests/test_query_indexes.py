@@ -0,0 +1,139 @@
+import importlib.util
+import io
+import os
+import re
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("sqlalchemy")
+
+from app.db import explain
+
+MIGRATION = os.path.join(
+    os.path.dirname(__file__), os.pardir,
+    "app", "db", "migrations", "versions", "ed128c1fc352_add_query_indexes.py",
+)
+
+# explain.py query → index from the migration that should serve it
+SERVED_BY = {
+    "transactions_recent": "ix_transactions_user_created",
+    "transactions_page": "ix_transactions_user_created",
+    "transactions_by_category": "ix_transactions_user_category_created",
+    "category_total": "ix_transactions_user_category_created",
+    "reminders": "ix_reminders_user_id",
+    "reminder_count": "ix_reminders_user_id",
+    "audit_recent": "ix_audit_logs_user_timestamp",
+}
+
+_CREATE = re.compile(r"CREATE INDEX CONCURRENTLY IF NOT EXISTS (\w+) ON (\w+) \(([^)]*)\)(?: INCLUDE \((\w+)\))?")
+
+
+def _render(*steps):
+    """Offline (--sql) Postgres rendering of the migration's upgrade/downgrade."""
+    pytest.importorskip("alembic")
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    spec = importlib.util.spec_from_file_location("add_query_indexes", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    buffer = io.StringIO()
+    context = MigrationContext.configure(
+        dialect_name="postgresql", opts={"as_sql": True, "output_buffer": buffer}
+    )
+    with Operations.context(context):
+        for step in steps:
+            getattr(migration, step)()
+    return [s.strip() for s in buffer.getvalue().split(";") if s.strip()]
+
+
+def _indexes():
+    return {
+        name: (table, [c.strip() for c in columns.split(",")], include)
+        for name, table, columns, include in (
+            _CREATE.match(s).groups() for s in _render("upgrade") if _CREATE.match(s)
+        )
+    }
+
+
+def _access_path(sql: str):
+    """(table, equality columns, ORDER BY columns) of an explain.py query."""
+    table = re.search(r"FROM (\w+)", sql).group(1)
+    equalities = re.findall(r"(\w+) = :\w+", sql)
+    order = re.search(r"ORDER BY (.+?)(?: LIMIT|$)", sql)
+    ordering = [c.strip().replace('"', "") for c in order.group(1).split(",")] if order else []
+    return table, equalities, ordering
+
+
+def test_indexes_are_built_concurrently_outside_the_transaction():
+    statements = _render("upgrade")
+
+    assert statements[0] == "COMMIT" and statements[-1] == "BEGIN"
+    assert len(statements[1:-1]) == 4
+    assert all(_CREATE.match(s) for s in statements[1:-1])
+
+
+def test_downgrade_drops_every_index():
+    dropped = [
+        s.split()[-1]
+        for s in _render("downgrade")
+        if s.startswith("DROP INDEX CONCURRENTLY IF EXISTS")
+    ]
+
+    assert sorted(dropped) == sorted(_indexes())
+
+
+def test_category_sums_are_covered_by_the_index():
+    table, columns, include = _indexes()["ix_transactions_user_category_created"]
+
+    assert table == "transactions"
+    assert columns[:2] == ["user_id", "category"]
+    assert include == "amount"
+
+
+@pytest.mark.parametrize("query, index", sorted(SERVED_BY.items()))
+def test_service_queries_lead_with_the_index_columns(query, index):
+    table, equalities, ordering = _access_path(explain.QUERIES[query][1])
+    index_table, columns, _ = _indexes()[index]
+
+    assert table == index_table
+    # Equality filters first, then the sort, so no sort step is needed
+    assert columns[: len(equalities)] == equalities
+    assert columns[len(equalities): len(equalities) + len(ordering)] == ordering
+
+
+def test_queries_only_bind_the_cli_parameters():
+    for _, sql in explain.QUERIES.values():
+        assert set(re.findall(r":(\w+)", sql)) <= {"user_id", "category"}
+
+
+class _Connection:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params):
+        self.statements.append((str(statement), params))
+        return [("Index Only Scan using ix_transactions_user_category_created",)]
+
+
+@pytest.mark.parametrize("analyze, options", [(False, "COSTS"), (True, "ANALYZE, BUFFERS")])
+def test_explain_wraps_the_query(analyze, options):
+    conn = _Connection()
+    params = {"user_id": 1, "category": "food"}
+    _, sql = explain.QUERIES["category_total"]
+
+    lines = explain.explain(conn, sql, params, analyze=analyze)
+
+    assert lines == ["Index Only Scan using ix_transactions_user_category_created"]
+    assert conn.statements == [(f"EXPLAIN ({options}) {sql}", params)]
+
+
+def test_explain_needs_a_database_url(monkeypatch, capsys):
+    monkeypatch.setattr(explain, "load_dotenv", lambda: None)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr("sys.argv", ["explain"])
+
+    assert explain.main() == 1
+    assert "DATABASE_URL" in capsys.readouterr().out
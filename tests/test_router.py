@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app.ai import router
+from app.intent.classifier import IntentPrediction
+from app.intent.detector import Intent
+
+
+def _fail_llm(text):
+    raise AssertionError("LLM tier should not be called")
+
+
+def test_simple_expense_skips_llm(monkeypatch):
+    monkeypatch.setattr(router, "normalize_command", _fail_llm)
+
+    result = router.route_command("spent 250 on food")
+
+    assert result["tier"] == router.TIER_RULES
+    assert result["intent"] == Intent.ADD_EXPENSE
+    assert result["slots"]["amount"] == 250
+    assert result["slots"]["category"] == "food"
+
+
+def test_check_balance_skips_llm(monkeypatch):
+    monkeypatch.setattr(router, "normalize_command", _fail_llm)
+
+    result = router.route_command("check balance")
+
+    assert result["tier"] == router.TIER_RULES
+    assert result["intent"] == Intent.CHECK_BALANCE
+
+
+def test_confident_classifier_skips_llm(monkeypatch):
+    monkeypatch.setattr(router, "normalize_command", _fail_llm)
+
+    result = router.route_command("bought a pencil for 30")
+
+    assert result["tier"] == router.TIER_CLASSIFIER
+    assert result["intent"] == Intent.ADD_EXPENSE
+    assert result["slots"]["amount"] == 30
+    assert result["slots"]["category"] == "education"
+    assert result["confidence"] >= router.CLASSIFIER_THRESHOLD
+
+
+def test_unsure_classifier_falls_back_to_llm(monkeypatch):
+    monkeypatch.setattr(router, "classify_intent", lambda text: IntentPrediction(Intent.CHECK_BALANCE, 0.3))
+    monkeypatch.setattr(router, "normalize_command", lambda text: "check balance")
+
+    result = router.route_command("how much do i have")
+
+    assert result["tier"] == router.TIER_LLM
+    assert result["intent"] == Intent.CHECK_BALANCE
+
+
+def test_missing_slots_fall_back_to_llm(monkeypatch):
+    monkeypatch.setattr(router, "normalize_command", lambda text: "set food budget to 500")
+
+    result = router.route_command("set a budget for groceries")
+
+    assert result["tier"] == router.TIER_LLM
+    assert result["slots"] == {"category": "food", "limit": 500}
+
+
+def test_classifier_missing_slots_fall_back_to_llm(monkeypatch):
+    monkeypatch.setattr(router, "normalize_command", lambda text: "add expense 20 stickers")
+
+    result = router.route_command("bought stickers for 20")
+
+    assert result["tier"] == router.TIER_LLM
+    assert result["intent"] == Intent.ADD_EXPENSE
+    assert result["slots"]["category"] == "stickers"
+    assert result["slots"]["amount"] == 20
+
+
+def test_classifier_unknown_is_not_accepted(monkeypatch):
+    calls = []
+
+    def llm(text):
+        calls.append(text)
+        return text
+
+    monkeypatch.setattr(router, "classify_intent", lambda text: IntentPrediction(Intent.UNKNOWN, 0.94))
+    monkeypatch.setattr(router, "normalize_command", llm)
+
+    result = router.route_command("hello there")
+
+    assert calls == ["hello there"]
+    assert result["tier"] == router.TIER_LLM
+    assert result["intent"] == Intent.UNKNOWN
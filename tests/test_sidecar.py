@@ -0,0 +1,54 @@
+import pytest
+
+from app.ai.sidecar import (
+    InferenceServer,
+    InProcessClient,
+    SidecarClient,
+    SidecarError,
+)
+
+
+def _fake_handlers():
+    def normalize(texts):
+        return [f"normalized {text}" for text in texts]
+
+    def transcribe(path):
+        if path.endswith("missing.wav"):
+            raise ValueError("Audio file does not exist")
+        return "check balance"
+
+    return {"normalize": normalize, "transcribe": transcribe}
+
+
+@pytest.fixture(params=["inprocess", "sidecar"])
+def client(request, tmp_path):
+    if request.param == "inprocess":
+        yield InProcessClient(_fake_handlers())
+        return
+
+    socket_path = str(tmp_path / "inference.sock")
+    server = InferenceServer(_fake_handlers(), socket_path)
+    server.start_background()
+    yield SidecarClient(socket_path, timeout=5)
+    server.stop()
+
+
+def test_normalize(client):
+    assert client.normalize(["paid 40 for tea", "check balance"]) == [
+        "normalized paid 40 for tea",
+        "normalized check balance",
+    ]
+
+
+def test_transcribe(client):
+    assert client.transcribe("/tmp/voice.wav") == "check balance"
+
+
+def test_errors_propagate(client):
+    with pytest.raises((SidecarError, ValueError)):
+        client.transcribe("/tmp/missing.wav")
+
+
+def test_unknown_operation(client):
+    with pytest.raises(SidecarError):
+        client.call("train")
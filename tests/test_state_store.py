@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+# app.cache builds its (lazily connecting) client at import
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # EVAL support in fakeredis
+
+from app.cache import state_store
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeStrictRedis(decode_responses=True)
+    monkeypatch.setattr(state_store, "redis_client", client)
+    monkeypatch.setattr(state_store, "_near", None)
+    return client
+
+
+def test_merge_fills_pending_state(redis):
+    state_store.save_state(7, {"intent": "ADD_EXPENSE", "slots": {"category": "food"}})
+
+    merged = state_store.merge_state(7, {"amount": 500})
+
+    assert merged == {"intent": "ADD_EXPENSE", "slots": {"category": "food", "amount": 500}}
+    assert state_store.get_state(7) == merged
+    assert 0 < redis.ttl("state:7") <= state_store.STATE_TTL
+
+
+def test_merge_completing_the_command_deletes_the_state(redis):
+    state_store.save_state(7, {"intent": "ADD_EXPENSE", "slots": {"category": "food"}})
+
+    merged = state_store.merge_state(7, {"amount": 500}, required=("category", "amount"))
+
+    assert merged["slots"] == {"category": "food", "amount": 500}
+    assert not redis.exists("state:7")
+
+
+def test_merge_does_not_recreate_expired_state(redis):
+    assert state_store.merge_state(7, {"amount": 500}) is None
+    assert not redis.exists("state:7")
+
+
+def test_merge_needs_an_intent(redis):
+    redis.hset("state:7", "slot:category", '"food"')
+
+    assert state_store.merge_state(7, {"amount": 500}) is None
+    assert redis.hgetall("state:7") == {"slot:category": '"food"'}
@@ -0,0 +1,133 @@
+import math
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("supabase")
+
+from app.services.transactions import decode_cursor, get_transaction_page, iter_transactions
+
+_KEYSET = re.compile(r'\(created_at\.lt\."(.+?)",and\(created_at\.eq\."(.+?)",id\.lt\.(\d+)\)\)')
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _History:
+    """Applies the keyset query the service builds to an in-memory table."""
+
+    def __init__(self, client):
+        self.client = client
+        self.filters = []
+        self.limit_to = None
+        self.negate = False
+
+    def select(self, *args):
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def is_(self, column, value):
+        assert value == "null"
+        negate, self.negate = self.negate, False
+        self.filters.append(lambda row: (row[column] is None) != negate)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= datetime.fromisoformat(value))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row[column] < datetime.fromisoformat(value))
+        return self
+
+    def or_(self, filters):
+        created_at, _, txn_id = _KEYSET.fullmatch(f"({filters})").groups()
+        key = (datetime.fromisoformat(created_at), int(txn_id))
+        self.filters.append(lambda row: (row["created_at"], row["id"]) < key)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, n):
+        self.limit_to = n
+        return self
+
+    def execute(self):
+        self.client.pages += 1
+        rows = [r for r in self.client.rows if all(f(r) for f in self.filters)]
+        rows.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+        return _Response([{**r, "created_at": r["created_at"].isoformat()} for r in rows[:self.limit_to]])
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pages = 0
+
+    def table(self, name):
+        return _History(self)
+
+
+def _ledger():
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Pairs share a timestamp, so pages must break ties on id
+    return [
+        {"id": i, "user_id": 1, "category": "food" if i % 3 else "travel",
+         "amount": float(i), "description": None, "created_at": start + timedelta(days=i // 2)}
+        for i in range(1, 24)
+    ]
+
+
+def test_pages_walk_history_without_gaps_or_repeats():
+    db = _FakeSupabase(_ledger())
+
+    seen, cursor = [], None
+    while True:
+        page = get_transaction_page(supabase=db, user_id=1, limit=5, cursor=cursor)
+        seen.extend(t.id for t in page.items)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+
+    assert seen == sorted(seen, key=lambda i: (i // 2, i), reverse=True)
+    assert sorted(seen) == list(range(1, 24))
+
+
+def test_filters_and_lazy_export():
+    db = _FakeSupabase(_ledger())
+    start = datetime(2026, 1, 3, tzinfo=timezone.utc)
+
+    exported = iter_transactions(supabase=db, user_id=1, category="food", start=start, page_size=4)
+    assert db.pages == 0
+
+    ids = [t.id for t in exported]
+    assert all(i % 3 and i >= 4 for i in ids)
+    assert len(ids) == len([i for i in range(4, 24) if i % 3])
+    assert db.pages == math.ceil(len(ids) / 4)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_rows_without_created_at_are_skipped():
+    rows = _ledger()
+    rows[0]["created_at"] = rows[7]["created_at"] = None
+    db = _FakeSupabase(rows)
+
+    ids = [t.id for t in iter_transactions(supabase=db, user_id=1, page_size=3)]
+
+    assert sorted(ids) == [i for i in range(1, 24) if i not in (1, 8)]
@@ -0,0 +1,28 @@
+from app.ai import warmup
+
+
+def test_readiness_tracks_model_state(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(warmup, "_status", {})
+    monkeypatch.setattr(warmup, "MODELS", {
+        "ok": (lambda: "model", lambda model: None),
+        "broken": (lambda: (_ for _ in ()).throw(RuntimeError("no weights")), lambda model: None),
+    })
+
+    assert warmup.get_readiness()["ready"] is False
+
+    warmup.warm_up_models()
+    readiness = warmup.get_readiness()
+
+    assert readiness["ready"] is False
+    assert readiness["models"]["ok"]["state"] == warmup.STATE_READY
+    assert "warmup_ms" in readiness["models"]["ok"]
+    assert readiness["models"]["broken"]["state"] == warmup.STATE_FAILED
+    assert readiness["models"]["broken"]["error"] == "no weights"
+
+
+def test_ready_when_warmup_disabled(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_ENABLED", False)
+    monkeypatch.setattr(warmup, "_status", {})
+
+    assert warmup.get_readiness()["ready"] is True
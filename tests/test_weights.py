@@ -0,0 +1,39 @@
+import json
+import struct
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.ai.weights import TIED_KEYS, _check_keys, load_safetensors_mmap
+
+
+def test_load_safetensors_mmap(tmp_path):
+    weight = torch.arange(6, dtype=torch.float32).reshape(2, 3)
+    bias = torch.tensor([1, 2], dtype=torch.int64)
+    data = weight.numpy().tobytes() + bias.numpy().tobytes()
+
+    header = json.dumps({
+        "weight": {"dtype": "F32", "shape": [2, 3], "data_offsets": [0, 24]},
+        "bias": {"dtype": "I64", "shape": [2], "data_offsets": [24, 40]},
+    }).encode("utf-8")
+    path = tmp_path / "model.safetensors"
+    path.write_bytes(struct.pack("<Q", len(header)) + header + data)
+
+    tensors = load_safetensors_mmap(str(path))
+
+    assert torch.equal(tensors["weight"], weight)
+    assert torch.equal(tensors["bias"], bias)
+
+
+def test_only_tied_keys_may_be_missing():
+    model = torch.nn.Linear(3, 2)
+
+    result = model.load_state_dict({"weight": torch.zeros(2, 3)}, strict=False)
+    with pytest.raises(RuntimeError, match="bias"):
+        _check_keys(result, "model.safetensors")
+    _check_keys(result, "model.safetensors", tied=("bias",))
+
+    result = model.load_state_dict({"weight": torch.zeros(2, 3), "bias": torch.zeros(2), "extra": torch.zeros(1)}, strict=False)
+    with pytest.raises(RuntimeError, match="extra"):
+        _check_keys(result, "model.safetensors", TIED_KEYS)